@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from codebase.client import CodebaseError
+
+CACHE_TTL = 600
+
+
+class CacheEntry(NamedTuple):
+    body: Path
+    etag: str
+    last_modified: str
+    fetched_at: float
+
+
+def cache_dir():
+    return Path.home() / ".codebase" / "cache"
+
+
+class ResponseCache:
+    """
+    Keeps API response bodies on disk, keyed by account and endpoint.
+
+    Entries younger than ttl seconds are used without asking the server; older
+    ones are revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    listing costs a 304 rather than the whole body.
+    """
+
+    def __init__(self, directory, ttl=CACHE_TTL, clock=time.time):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.clock = clock
+
+    def key(self, account, path):
+        return hashlib.blake2b(f"{account}:{path}".encode(), digest_size=16).hexdigest()
+
+    def load(self, key):
+        try:
+            metadata = json.loads((self.directory / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        body = self.directory / f"{key}.xml"
+        if not body.exists():
+            return None
+        return CacheEntry(
+            body, metadata["etag"], metadata["last_modified"], metadata["fetched_at"]
+        )
+
+    def is_fresh(self, entry):
+        return self.clock() - entry.fetched_at < self.ttl
+
+    def save_metadata(self, key, etag, last_modified):
+        metadata = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": self.clock(),
+        }
+        replace_file(self.directory / f"{key}.json", json.dumps(metadata).encode())
+
+    @contextmanager
+    def stream(self, key, request, refresh=False, offline=False):
+        """
+        Yields a readable file with the response body for key, from the cache
+        when it is fresh enough, otherwise from request(headers), a context
+        manager yielding the HTTP response. New bodies are written to the cache
+        as they are read.
+
+        refresh -- always ask the server, still revalidating the cached copy
+        offline -- never ask the server, using the cached copy however old
+        """
+        entry = self.load(key)
+        if offline or (entry and not refresh and self.is_fresh(entry)):
+            if entry is None:
+                raise CodebaseError("nothing cached yet, run once without --offline")
+            with open(entry.body, "rb") as body:
+                yield body
+            return
+        with request(revalidation_headers(entry)) as response:
+            if response.status == 304:
+                response.read()
+                self.save_metadata(key, entry.etag, entry.last_modified)
+                with open(entry.body, "rb") as body:
+                    yield body
+                return
+            with self.writer(key) as copy:
+                tee = TeeReader(response, copy)
+                yield tee
+                tee.read()
+            self.save_metadata(
+                key,
+                response.getheader("ETag", ""),
+                response.getheader("Last-Modified", ""),
+            )
+
+    @contextmanager
+    def writer(self, key):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                yield file
+            os.replace(temporary, self.directory / f"{key}.xml")
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+class TeeReader:
+    """
+    A readable file that copies everything read from source into copy.
+    """
+
+    def __init__(self, source, copy):
+        self.source = source
+        self.copy = copy
+
+    def read(self, size=-1):
+        data = (
+            self.source.read() if size is None or size < 0 else self.source.read(size)
+        )
+        self.copy.write(data)
+        return data
+
+
+def revalidation_headers(entry):
+    headers = {}
+    if entry and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def replace_file(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
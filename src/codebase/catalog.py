@@ -0,0 +1,132 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from codebase.projects import Project
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokens(text):
+    return TOKEN.findall(text.lower())
+
+
+class CodeTable:
+    """
+    Numbers distinct values in the order they are first seen.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+class ProjectCatalog:
+    """
+    Projects stored column by column, with indexes on status, permalink and
+    the words of their names.
+
+    Numbers live in typed arrays, and statuses and account names as small
+    codes into a CodeTable of their distinct values each, so a project costs
+    little more than its name and permalink strings. Rows are turned back into Project
+    records only when a query returns them.
+    """
+
+    def __init__(self, projects=()):
+        self.project_ids = array("q")
+        self.disk_usage = array("q")
+        self.tickets = array("l")
+        self.names = []
+        self.permalinks = []
+        self.status_codes = array("B")
+        self.account_codes = array("H")
+        self.statuses = CodeTable()
+        self.accounts = CodeTable()
+        self.by_status = defaultdict(list)
+        self.by_permalink = {}
+        self.by_token = defaultdict(list)
+        self._sorted_tokens = None
+        for project in projects:
+            self.add(project)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return (self.row(index) for index in range(len(self)))
+
+    def add(self, project):
+        index = len(self)
+        self.project_ids.append(project.project_id)
+        self.disk_usage.append(project.disk_usage)
+        self.tickets.extend(
+            [project.total_tickets, project.open_tickets, project.closed_tickets]
+        )
+        self.names.append(project.name)
+        self.permalinks.append(project.permalink)
+        self.status_codes.append(self.statuses.code(project.status))
+        self.account_codes.append(self.accounts.code(project.account_name))
+        self.by_status[project.status].append(index)
+        self.by_permalink[project.permalink] = index
+        for token in set(tokens(project.name)):
+            self.by_token[token].append(index)
+        self._sorted_tokens = None
+
+    def row(self, index):
+        total, open_tickets, closed = self.tickets[index * 3 : index * 3 + 3]
+        return Project(
+            self.project_ids[index],
+            self.names[index],
+            self.statuses.values[self.status_codes[index]],
+            self.permalinks[index],
+            self.accounts.values[self.account_codes[index]],
+            self.disk_usage[index],
+            total,
+            open_tickets,
+            closed,
+        )
+
+    def get(self, permalink):
+        index = self.by_permalink.get(permalink)
+        return None if index is None else self.row(index)
+
+    def sorted_tokens(self):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.by_token)
+        return self._sorted_tokens
+
+    def rows_with_prefix(self, prefix):
+        words = self.sorted_tokens()
+        rows = set()
+        for word in words[bisect_left(words, prefix) :]:
+            if not word.startswith(prefix):
+                break
+            rows.update(self.by_token[word])
+        return rows
+
+    def search(self, text="", statuses=None):
+        """
+        Returns the projects, in the order they were added, whose names have
+        a word starting with each word of text and whose status is one of
+        statuses, or any status when statuses is None.
+        """
+        candidates = None
+        if statuses is not None:
+            candidates = set().union(
+                *(self.by_status.get(status, []) for status in statuses)
+            )
+        for word in sorted(tokens(text), key=len, reverse=True):
+            rows = self.rows_with_prefix(word)
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
+                return []
+        if candidates is None:
+            return list(self)
+        return [self.row(index) for index in sorted(candidates)]
@@ -0,0 +1,198 @@
+import base64
+import queue
+import time
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import urlsplit
+
+from codebase.projects import parse_projects, project_statuses
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Requests in flight at once when querying many projects, and so the size of
+# the connection pool serving them.
+CONCURRENCY = 8
+# A keep-alive connection the server has since closed fails on its next use
+# with a ConnectionError (http.client.RemoteDisconnected is one); these are
+# retried on a fresh connection.
+CONNECTION_ERRORS = (ConnectionError,)
+
+
+class CodebaseError(Exception):
+    pass
+
+
+def network_errors():
+    """
+    Everything else a request can fail with, a DNS failure, a timeout or a
+    malformed response, which fails it without retrying.
+    """
+    # http.client is already imported by the time a connection exists, see
+    # ConnectionPool.connect.
+    import http.client
+
+    return (OSError, http.client.HTTPException)
+
+
+class ConnectionPool:
+    """
+    Keeps up to size keep-alive connections to one host for reuse across
+    requests and threads.
+    """
+
+    def __init__(self, url, size=4, timeout=30):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+        self.opened = 0
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            self.opened += 1
+            return self.connect()
+
+    def connect(self):
+        # http.client pulls in email and ssl, so it is only imported once a
+        # connection is needed, keeping answers from the cache quick.
+        import http.client
+
+        connection_class = (
+            http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        )
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def release(self, connection):
+        try:
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def discard(self, connection):
+        connection.close()
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+class CodebaseClient:
+    """
+    Talks XML to the Codebase API over pooled keep-alive connections, retrying
+    with exponential backoff when the server is busy or failing.
+
+    retries -- attempts after the first before giving up
+    backoff -- seconds to wait before the first retry, doubling each time
+    cache -- optional ResponseCache for GET responses
+    refresh -- with a cache, always revalidate with the server
+    offline -- with a cache, only answer from it
+    """
+
+    def __init__(
+        self,
+        credentials,
+        pool_size=4,
+        retries=3,
+        backoff=0.5,
+        sleep=time.sleep,
+        cache=None,
+        refresh=False,
+        offline=False,
+    ):
+        self.credentials = credentials
+        self.cache = cache
+        self.refresh = refresh
+        self.offline = offline
+        self.pool = ConnectionPool(credentials.api_url, pool_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        token = f"{credentials.api_username}:{credentials.api_key}".encode()
+        self.headers = {
+            "Accept": "application/xml",
+            "Content-Type": "application/xml",
+            "Authorization": f"Basic {base64.b64encode(token).decode()}",
+        }
+
+    def close(self):
+        self.pool.close()
+
+    @contextmanager
+    def stream(self, path):
+        """
+        Yields the body of a GET of path as a readable file, from the cache
+        when there is one.
+        """
+        if self.cache is None:
+            with self.request(path) as response:
+                yield response
+            return
+        key = self.cache.key(self.credentials.account, path)
+        request = partial(self.request, path)
+        with self.cache.stream(key, request, self.refresh, self.offline) as body:
+            yield body
+
+    @contextmanager
+    def request(self, path, headers=None):
+        """
+        Yields the HTTP response to a GET of path, returning its connection to
+        the pool once the body has been read.
+        """
+        connection, response = self.send(path, headers)
+        try:
+            yield response
+            response.read()
+        except network_errors() as error:
+            self.pool.discard(connection)
+            raise CodebaseError(f"GET {path} failed: {error}") from error
+        except BaseException:
+            self.pool.discard(connection)
+            raise
+        if response.will_close:
+            self.pool.discard(connection)
+        else:
+            self.pool.release(connection)
+
+    def get(self, path):
+        with self.stream(path) as body:
+            return body.read()
+
+    def send(self, path, headers=None):
+        for attempt in range(self.retries + 1):
+            connection = self.pool.acquire()
+            try:
+                connection.request(
+                    "GET", path, headers={**self.headers, **(headers or {})}
+                )
+                response = connection.getresponse()
+            except CONNECTION_ERRORS as error:
+                self.pool.discard(connection)
+                if attempt == self.retries:
+                    raise CodebaseError(f"GET {path} failed: {error}") from error
+                continue
+            except network_errors() as error:
+                self.pool.discard(connection)
+                raise CodebaseError(f"GET {path} failed: {error}") from error
+            if response.status < 400:
+                return connection, response
+            response.read()
+            self.pool.release(connection)
+            if response.status not in RETRY_STATUSES or attempt == self.retries:
+                raise CodebaseError(
+                    f"GET {path} returned {response.status} {response.reason}"
+                )
+            self.sleep(retry_delay(response, self.backoff * 2**attempt))
+
+    def projects(self, include_archived=False):
+        with self.stream("/projects") as response:
+            yield from parse_projects(response, project_statuses(include_archived))
+
+
+def retry_delay(response, default):
+    retry_after = response.getheader("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    return default
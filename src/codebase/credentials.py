@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+API_URL = "https://api3.codebasehq.com"
+
+
+class Credentials(NamedTuple):
+    account: str
+    username: str
+    api_key: str
+    api_url: str = API_URL
+
+    @property
+    def api_username(self):
+        return f"{self.account}/{self.username}"
+
+
+def credentials_path():
+    return Path.home() / ".codebase" / "credentials.toml"
+
+
+def load_credentials(path=None):
+    """
+    Reads the account, username and api_key of the Codebase API user, and an
+    optional api_url, from ~/.codebase/credentials.toml.
+    """
+    with open(path or credentials_path(), "rb") as file:
+        data = tomllib.load(file)
+    return Credentials(
+        data["account"], data["username"], data["api_key"], data.get("api_url", API_URL)
+    )
@@ -0,0 +1,83 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from codebase.client import CONCURRENCY, CodebaseError
+from codebase.repositories import parse_repositories, repositories_path
+
+
+class FetchResult(NamedTuple):
+    key: object
+    body: bytes = None
+    error: CodebaseError = None
+
+
+class RateLimiter:
+    """
+    Spaces out requests to at most rate per second across every task on
+    one event loop.
+    """
+
+    def __init__(self, rate, clock=time.monotonic):
+        self.interval = 1 / rate
+        self.clock = clock
+        self.next_slot = 0.0
+
+    async def acquire(self):
+        now = self.clock()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def fetch_all(client, requests, concurrency=CONCURRENCY, rate=None):
+    """
+    GETs every (key, path) in requests with at most concurrency in flight,
+    yielding a FetchResult for each as soon as it completes.
+
+    Requests run on the client's pooled keep-alive connections, one worker
+    thread per concurrent request, so the pool should be as large as
+    concurrency.
+
+    rate -- optional limit on requests started per second
+    """
+    limit = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate) if rate else None
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def fetch(key, path):
+        async with limit:
+            if limiter:
+                await limiter.acquire()
+            try:
+                return FetchResult(
+                    key, await loop.run_in_executor(executor, client.get, path)
+                )
+            except CodebaseError as error:
+                return FetchResult(key, error=error)
+
+    tasks = [asyncio.ensure_future(fetch(key, path)) for key, path in requests]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False)
+
+
+async def project_repositories(client, projects, concurrency=CONCURRENCY, rate=None):
+    """
+    Yields (project, repositories, error) for each project as its
+    repositories arrive.
+    """
+    requests = [(project, repositories_path(project)) for project in projects]
+    async for result in fetch_all(client, requests, concurrency, rate):
+        if result.error:
+            yield result.key, [], result.error
+        else:
+            yield result.key, list(parse_repositories(io.BytesIO(result.body))), None
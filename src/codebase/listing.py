@@ -0,0 +1,90 @@
+from codebase.cache import ResponseCache, cache_dir
+from codebase.catalog import ProjectCatalog
+from codebase.client import CONCURRENCY, CodebaseClient, CodebaseError
+from codebase.credentials import credentials_path, load_credentials
+
+
+def format_project(project):
+    return f"* {project.name} ({project.permalink}, {project.status})"
+
+
+def format_repositories(project, repositories, error=None):
+    if error:
+        return f"* {project.permalink}: {error}"
+    names = ", ".join(repository.permalink for repository in repositories)
+    return f"* {project.permalink}: {names or 'no repositories'}"
+
+
+def open_client(refresh=False, offline=False, pool_size=CONCURRENCY):
+    try:
+        credentials = load_credentials()
+    except (OSError, KeyError, ValueError) as error:
+        print(f"could not read Codebase credentials from {credentials_path()}: {error}")
+        return None
+    cache = ResponseCache(cache_dir())
+    return CodebaseClient(
+        credentials, pool_size, cache=cache, refresh=refresh, offline=offline
+    )
+
+
+def list_projects(
+    include_archived=False,
+    refresh=False,
+    offline=False,
+    repositories=False,
+    concurrency=CONCURRENCY,
+    rate=None,
+    search=None,
+    client=None,
+):
+    """
+    Prints the account's active projects, or every project with include_archived,
+    as each one is parsed from the response.
+
+    refresh -- revalidate the cached listing with Codebase even if it is fresh
+    offline -- only use the cached listing, however old
+    repositories -- then print each project's repositories as they arrive
+    concurrency -- number of repository listings to fetch at once
+    rate -- optional limit on repository requests per second
+    search -- only list projects with a name word starting with each of its words
+    """
+    print("listing projects")
+    client = client or open_client(refresh, offline, concurrency)
+    if client is None:
+        return
+    try:
+        projects = print_projects(client, include_archived, search)
+        if repositories and projects:
+            print_repositories(client, projects, concurrency, rate)
+    except CodebaseError as error:
+        print(error)
+    finally:
+        client.close()
+
+
+def print_projects(client, include_archived, search=None):
+    listed = client.projects(include_archived)
+    if search:
+        listed = ProjectCatalog(listed).search(search)
+    projects = []
+    for project in listed:
+        print(format_project(project))
+        projects.append(project)
+    if not projects:
+        print("no projects found")
+    return projects
+
+
+def print_repositories(client, projects, concurrency, rate):
+    import asyncio
+
+    from codebase.fetcher import project_repositories
+
+    async def print_as_completed():
+        async for project, repositories, error in project_repositories(
+            client, projects, concurrency, rate
+        ):
+            print(format_repositories(project, repositories, error))
+
+    print("listing repositories")
+    asyncio.run(print_as_completed())
@@ -0,0 +1,74 @@
+from typing import NamedTuple
+from xml.etree.ElementTree import iterparse
+
+ACTIVE = "active"
+ARCHIVED = "archived"
+
+
+class Project(NamedTuple):
+    project_id: int
+    name: str
+    status: str
+    permalink: str
+    account_name: str = ""
+    disk_usage: int = 0
+    total_tickets: int = 0
+    open_tickets: int = 0
+    closed_tickets: int = 0
+
+
+INTEGER_FIELDS = [
+    "project_id",
+    "disk_usage",
+    "total_tickets",
+    "open_tickets",
+    "closed_tickets",
+]
+TEXT_FIELDS = ["name", "status", "permalink", "account_name"]
+
+
+def parse_projects(source, statuses=None):
+    """
+    Yields a Project for each <project> in a Codebase projects response as
+    soon as its closing tag is read, so nothing but the current project is
+    held in memory.
+
+    source -- file name or binary file object, such as an HTTP response
+    statuses -- statuses to keep, such as {"active"}, or None for all
+    """
+    for element in parse_elements(source, "project"):
+        project = project_from_element(element)
+        if statuses is None or project.status in statuses:
+            yield project
+
+
+def parse_elements(source, tag):
+    """
+    Yields each complete tag element of an XML document, clearing the tree
+    behind it once the caller has moved on.
+    """
+    events = iterparse(source, events=("start", "end"))
+    _, root = next(events)
+    for event, element in events:
+        if event == "end" and element.tag == tag:
+            yield element
+            root.clear()
+
+
+def project_from_element(element):
+    return Project(**record_fields(element, INTEGER_FIELDS, TEXT_FIELDS))
+
+
+def record_fields(element, integer_fields, text_fields):
+    values = {}
+    for child in element:
+        field = child.tag.replace("-", "_")
+        if field in integer_fields:
+            values[field] = int(child.text or 0)
+        elif field in text_fields:
+            values[field] = child.text or ""
+    return values
+
+
+def project_statuses(include_archived=False):
+    return None if include_archived else {ACTIVE}
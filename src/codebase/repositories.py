@@ -0,0 +1,27 @@
+from typing import NamedTuple
+
+from codebase.projects import parse_elements, record_fields
+
+INTEGER_FIELDS = ["disk_usage"]
+TEXT_FIELDS = ["name", "permalink", "clone_url", "default_branch", "last_commit_ref"]
+
+
+class Repository(NamedTuple):
+    name: str
+    permalink: str
+    clone_url: str = ""
+    default_branch: str = ""
+    last_commit_ref: str = ""
+    disk_usage: int = 0
+
+
+def parse_repositories(source):
+    """
+    Yields a Repository for each <repository> in a project's repositories response.
+    """
+    for element in parse_elements(source, "repository"):
+        yield Repository(**record_fields(element, INTEGER_FIELDS, TEXT_FIELDS))
+
+
+def repositories_path(project):
+    return f"/{project.permalink}/repositories"
@@ -0,0 +1,3 @@
+from coursetools.app import main
+
+main()
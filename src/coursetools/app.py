@@ -1,32 +1,410 @@
 import argparse
 import sys
 
-from coursetools.repository import make_repo
-from coursetools.templates import get_templates
+# Only argparse is imported up front so that listing templates and printing
+# help start quickly; each command imports what it needs when it runs.
 
 description = """
 Create a course repository by copying files from the training repo according to a template
 """
 
+LINK_MODES = ["copy", "reflink", "hardlink", "auto"]
+
 
 def show_templates():
+    from coursetools.templates import get_templates
+
     print("listing templates")
     for template in get_templates():
         print(f"* {template}")
 
 
-def parse_and_execute(argv):
+def show_projects(namespace):
+    from codebase.listing import list_projects
+
+    list_projects(
+        include_archived=namespace.all,
+        refresh=namespace.refresh,
+        offline=namespace.offline,
+        repositories=namespace.repositories,
+        concurrency=namespace.concurrency,
+        rate=namespace.rate,
+        search=namespace.search,
+    )
+
+
+def copy_options(namespace):
+    return {
+        "jobs": namespace.jobs,
+        "sync": namespace.sync,
+        "checksum": namespace.checksum,
+        "delete": namespace.delete,
+        "link_mode": namespace.link_mode,
+        "metrics_json": namespace.metrics_json,
+        "buffer_size": (
+            namespace.buffer_size * 1024 * 1024 if namespace.buffer_size else None
+        ),
+        "manifest": namespace.manifest,
+        "resume": namespace.resume,
+    }
+
+
+def open_file_index(namespace):
+    if namespace.source == "git":
+        from coursetools.config import get_config
+        from coursetools.gitfiles import GitFiles
+
+        return GitFiles(get_config("repo_root"))
+    if not namespace.index:
+        return None
+    from coursetools.config import get_config
+    from coursetools.index import open_index
+
+    return open_index(
+        get_config("repo_root"),
+        refresh=namespace.index != "cached",
+        hash_files=namespace.index_hashes,
+    )
+
+
+def run_template(namespace):
+    if namespace.watch:
+        from coursetools.watch import watch_repo
+
+        watch_repo(
+            namespace.template,
+            index=open_file_index(namespace),
+            **copy_options(namespace),
+        )
+        return
+    from coursetools.repository import make_repo
+
+    make_repo(
+        namespace.template,
+        dry_run=namespace.dry_run,
+        save_plan=namespace.save_plan,
+        archive=namespace.archive,
+        index=open_file_index(namespace),
+        git_init=namespace.git_init,
+        **copy_options(namespace),
+    )
+
+
+def run_preflight(namespace):
+    from coursetools.preflight import preflight_templates
+
+    names = [namespace.template] if "template" in namespace else None
+    if not preflight_templates(
+        names, link_mode=namespace.link_mode, in_place=namespace.sync
+    ):
+        sys.exit(1)
+
+
+def run_verify(namespace):
+    from coursetools.manifest import verify_template
+
+    template, directory = namespace.verify
+    index = open_file_index(namespace)
+    if not verify_template(
+        template, directory, namespace.manifest, namespace.jobs, index
+    ):
+        sys.exit(1)
+
+
+def replay_plan(namespace):
+    from coursetools.plan import CopyPlan
+    from coursetools.repository import check_plan_sources, run_plan
+
+    plan = CopyPlan.load(namespace.from_plan)
+    if namespace.dry_run:
+        for line in plan.describe():
+            print(line)
+    elif check_plan_sources(plan):
+        run_plan(plan, **copy_options(namespace))
+
+
+def run_batch(namespace):
+    from coursetools.batch import load_batch
+    from coursetools.repository import make_repos
+
+    builds = load_batch(namespace.batch) if namespace.batch else []
+    make_repos(
+        builds + (namespace.build or []),
+        dry_run=namespace.dry_run,
+        index=open_file_index(namespace),
+        git_init=namespace.git_init,
+        **copy_options(namespace),
+    )
+
+
+def build_argument(value):
+    from coursetools.batch import parse_build
+
+    try:
+        return parse_build(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def archive_argument(value):
+    from coursetools.archive import archive_format
+
+    try:
+        archive_format(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return value
+
+
+def positive_int(value):
+    return positive(int, value)
+
+
+def positive_float(value):
+    return positive(float, value)
+
+
+def positive(convert, value):
+    try:
+        number = convert(value)
+    except ValueError:
+        number = None
+    if number is None or not number > 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a number above 0")
+    return number
+
+
+def create_parser():
     parser = argparse.ArgumentParser(description=description)
     parser.add_argument("-l", "--list", action="store_const", const=True)
+    parser.add_argument(
+        "-p",
+        "--project",
+        action="store_true",
+        help="List the active projects on Codebase",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="With --project, include archived projects"
+    )
+    parser.add_argument(
+        "--search",
+        metavar="WORDS",
+        help="With --project, only list projects with a name word starting with "
+        "each of WORDS",
+    )
+    parser.add_argument(
+        "--repositories",
+        action="store_true",
+        help="With --project, also list each project's repositories",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=8,
+        help="With --repositories, number of projects to query at once",
+    )
+    parser.add_argument(
+        "--rate",
+        type=positive_float,
+        default=None,
+        help="With --repositories, most requests to start per second",
+    )
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="With --project, check with Codebase even if the cached listing is recent",
+    )
+    cache_mode.add_argument(
+        "--offline",
+        action="store_true",
+        help="With --project, only use the cached listing",
+    )
     parser.add_argument(
         "template", nargs="?", default=argparse.SUPPRESS, help="Use this template"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Number of files to copy at once",
+    )
+    parser.add_argument(
+        "--sync", action="store_true", help="Only copy new or changed files"
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="With --sync, compare file contents instead of size and mtime",
+    )
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="With --sync, remove destination files whose source is gone",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted build, keeping the files it already copied",
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="copy",
+        help="How files are placed: copied, cloned with reflink, hard linked, "
+        "or auto to try reflink, then copy_file_range, then a plain copy",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        metavar="MB",
+        type=positive_int,
+        help="Megabytes to copy at a time from large files (default 1)",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="FILE",
+        help="Write files, bytes, timings and exclusions for the run to FILE as JSON",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help="Write the path, size and BLAKE2 hash of every copied file to FILE as "
+        "JSON, or with --verify, check against FILE instead of the training repo",
+    )
+    parser.add_argument(
+        "--verify",
+        nargs=2,
+        metavar=("TEMPLATE", "DIR"),
+        help="Report files missing from, extra in or modified in the course in DIR "
+        "and exit",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print what would be copied and stop"
+    )
+    parser.add_argument(
+        "--preflight-only",
+        action="store_true",
+        help="Check that the template's paths exist and its files fit in the current "
+        "directory, or every bundled template's without a template, and exit",
+    )
+    parser.add_argument(
+        "--save-plan", metavar="FILE", help="Write the copy plan to FILE as JSON"
+    )
+    parser.add_argument(
+        "--from-plan", metavar="FILE", help="Run a plan saved with --save-plan"
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="FILE",
+        type=archive_argument,
+        help="Stream the course into a .tar.gz, .tar or .zip FILE instead of a "
+        "directory",
+    )
+    parser.add_argument(
+        "--git-init",
+        action="store_true",
+        help="Make the course a new git repository with its files in the first commit",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After building, keep copying files as they change in the training repo "
+        "until interrupted",
+    )
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const="refresh",
+        choices=["refresh", "cached"],
+        help="List training repo files from the index in ~/.coursetools/index, "
+        "refreshing directories that changed unless 'cached' is given",
+    )
+    parser.add_argument(
+        "--source",
+        choices=["walk", "git"],
+        default="walk",
+        help="Find training repo files by walking directories, or from the files "
+        "tracked in its git index",
+    )
+    parser.add_argument(
+        "--index-hashes",
+        action="store_true",
+        help="Record a BLAKE2 hash of new and changed files in the index",
+    )
+    parser.add_argument(
+        "--batch", metavar="FILE", help="Build every template listed in an .ini FILE"
+    )
+    parser.add_argument(
+        "--build",
+        metavar="TEMPLATE=DIR",
+        action="append",
+        type=build_argument,
+        help="Build TEMPLATE into DIR, can be repeated to build several at once",
+    )
+    return parser
+
+
+# Options that can't be combined with any of the options listed against them.
+EXCLUSIVE_OPTIONS = {
+    "git_init": [
+        "sync",
+        "archive",
+        "link_mode",
+        "jobs",
+        "metrics_json",
+        "buffer_size",
+    ],
+    "archive": ["sync", "link_mode", "metrics_json", "buffer_size"],
+    "watch": ["dry_run", "archive", "git_init", "batch", "build"],
+    "resume": ["sync", "archive", "git_init", "from_plan"],
+    "manifest": ["archive", "git_init", "batch", "build"],
+}
+
 
+def check_exclusive(parser, namespace):
+    for option, others in EXCLUSIVE_OPTIONS.items():
+        if not is_given(parser, namespace, option):
+            continue
+        if any(is_given(parser, namespace, other) for other in others):
+            names = [option_name(other) for other in others]
+            parser.error(
+                f"{option_name(option)} can't be combined with "
+                f"{', '.join(names[:-1])} or {names[-1]}"
+            )
+
+
+def is_given(parser, namespace, option):
+    value = getattr(namespace, option, None)
+    return value is not None and value != parser.get_default(option)
+
+
+def option_name(option):
+    return "--" + option.replace("_", "-")
+
+
+def parse_and_execute(argv):
+    parser = create_parser()
     namespace = parser.parse_args(argv)
+    if (namespace.checksum or namespace.delete) and not namespace.sync:
+        parser.error("--checksum and --delete require --sync")
+    if namespace.index and namespace.source == "git":
+        parser.error("--index can't be combined with --source git")
+    check_exclusive(parser, namespace)
     if "list" in namespace and namespace.list:
         show_templates()
+    elif namespace.project:
+        show_projects(namespace)
+    elif namespace.verify:
+        run_verify(namespace)
+    elif namespace.preflight_only:
+        run_preflight(namespace)
+    elif namespace.from_plan:
+        replay_plan(namespace)
+    elif namespace.batch or namespace.build:
+        run_batch(namespace)
     elif "template" in namespace:
-        make_repo(namespace.template)
+        run_template(namespace)
     else:
         parser.print_help()
 
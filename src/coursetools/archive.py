@@ -0,0 +1,145 @@
+import os
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from coursetools.copier import CopyStats
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class ArchiveEntry(NamedTuple):
+    source: os.PathLike
+    name: str
+    is_dir: bool
+
+
+class ParallelGzipWriter:
+    """
+    A write-only file that gzips fixed-size blocks on a thread pool.
+
+    Each block becomes its own gzip member, and concatenated members are a
+    valid gzip stream. At most two blocks per worker are held in memory.
+    """
+
+    def __init__(self, file, jobs=None, level=6, block_size=BLOCK_SIZE):
+        self.file = file
+        self.level = level
+        self.block_size = block_size
+        workers = jobs or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = workers * 2
+        self.pending = deque()
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self.submit(bytes(self.buffer[: self.block_size]))
+            del self.buffer[: self.block_size]
+        return len(data)
+
+    def submit(self, block):
+        self.pending.append(self.executor.submit(compress_block, block, self.level))
+        while len(self.pending) > self.max_pending:
+            self.file.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.buffer or not self.pending:
+            self.submit(bytes(self.buffer))
+            self.buffer.clear()
+        while self.pending:
+            self.file.write(self.pending.popleft().result())
+        self.executor.shutdown()
+
+
+def compress_block(block, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(block) + compressor.flush()
+
+
+def archive_format(path):
+    name = str(path)
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".tar"):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"{name} should end in .tar.gz, .tgz, .tar or .zip")
+
+
+def write_archive(plan, path, root=".", jobs=None):
+    """
+    Streams the files of a CopyPlan from the training repo straight into an
+    archive, named by their destinations relative to root.
+
+    .tar.gz archives are compressed in parallel unless jobs is 1.
+    """
+    start = time.perf_counter()
+    write = ARCHIVE_WRITERS[archive_format(path)]
+    write(path, archive_entries(plan, root), jobs)
+    return CopyStats(len(plan.copies), plan.total_bytes(), time.perf_counter() - start)
+
+
+def archive_entries(plan, root):
+    directories = [
+        ArchiveEntry(directory.source, arcname(directory.destination, root), True)
+        for directory in plan.directories
+    ]
+    files = [
+        ArchiveEntry(file_copy.source, arcname(file_copy.destination, root), False)
+        for file_copy in plan.files
+    ]
+    unique_directories = {
+        entry.name: entry for entry in directories if entry.name != "."
+    }
+    return list(unique_directories.values()) + sorted(
+        files, key=lambda entry: entry.name
+    )
+
+
+def arcname(destination, root):
+    name = os.path.relpath(destination, root).replace(os.sep, "/")
+    if name == ".." or name.startswith("../"):
+        raise ValueError(f"{destination} is outside {root}")
+    return name
+
+
+def write_tar(path, entries, jobs=None, compress=False):
+    with open(path, "wb") as file:
+        writer = ParallelGzipWriter(file, jobs) if compress else file
+        with tarfile.open(fileobj=writer, mode="w|", dereference=True) as tar:
+            add_to_tar(tar, entries)
+        if compress:
+            writer.close()
+
+
+def write_tar_gz(path, entries, jobs=None):
+    if jobs == 1:
+        with tarfile.open(path, mode="w:gz", dereference=True) as tar:
+            add_to_tar(tar, entries)
+    else:
+        write_tar(path, entries, jobs, compress=True)
+
+
+def add_to_tar(tar, entries):
+    for entry in entries:
+        tar.add(entry.source, arcname=entry.name, recursive=False)
+
+
+def write_zip(path, entries, jobs=None):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            archive.write(entry.source, arcname=entry.name)
+
+
+ARCHIVE_WRITERS = {
+    "tar": write_tar,
+    "tar.gz": write_tar_gz,
+    "zip": write_zip,
+}
@@ -0,0 +1,35 @@
+import configparser
+
+
+def load_batch(batch_file):
+    """
+    Reads the builds listed in a batch file.
+
+    Each section is one build, named after its template unless it sets
+    `template`, with an `output` directory that defaults to the section name:
+
+        [typescript]
+        output = courses/typescript
+
+        [react-course]
+        template = typescript-react
+        output = courses/react
+    """
+    config = configparser.ConfigParser()
+    with open(batch_file) as file:
+        config.read_file(file)
+    return [
+        (section.get("template", name), section.get("output", name))
+        for name, section in config.items()
+        if name != configparser.DEFAULTSECT
+    ]
+
+
+def parse_build(build):
+    """
+    Splits a TEMPLATE=DIR command line argument into a (template, output) pair.
+    """
+    template, separator, output = build.partition("=")
+    if not separator or not template or not output:
+        raise ValueError(f"{build} should be TEMPLATE=DIR")
+    return template, output
@@ -0,0 +1,151 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, NamedTuple
+
+from coursetools.links import CHUNK_SIZE, fan_out_copy, link_file
+
+MEGABYTE = 1024 * 1024
+
+
+class FileCopy(NamedTuple):
+    source: os.PathLike
+    destination: os.PathLike
+    copy_function: Callable
+    origin: str = ""
+    size: int = 0
+
+
+class DirectoryCopy(NamedTuple):
+    source: os.PathLike
+    destination: os.PathLike
+    relative: str
+
+
+class CopyResult(NamedTuple):
+    size: int
+    origin: str
+    strategy: str
+    seconds: float
+    directory: str
+    destination: str = ""
+
+
+class CopyStats(NamedTuple):
+    files: int
+    size: int
+    elapsed: float
+    skipped: int = 0
+    results: tuple = ()
+
+    @property
+    def strategies(self):
+        return Counter((result.origin, result.strategy) for result in self.results)
+
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    def megabytes_per_second(self):
+        return self.size / MEGABYTE / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        report = (
+            f"copied {self.files} files ({self.size / MEGABYTE:.1f} MB) "
+            f"in {self.elapsed:.2f}s: {self.files_per_second():.0f} files/sec, "
+            f"{self.megabytes_per_second():.1f} MB/sec"
+        )
+        if self.skipped:
+            report += f", skipped {self.skipped} unchanged"
+        return report
+
+    def strategy_report(self):
+        by_origin = {}
+        for (origin, strategy), count in sorted(self.strategies.items()):
+            by_origin.setdefault(origin, []).append(f"{strategy} {count}")
+        return [f"{origin}: {', '.join(used)}" for origin, used in by_origin.items()]
+
+
+def copy_files(
+    copies, jobs=None, skip=None, link_mode="copy", progress=None, buffer_size=None
+):
+    """
+    Copies every file in parallel across a bounded thread pool.
+
+    Copies that share a source are handled by one worker, which reads the
+    source once for all of its destinations.
+
+    copies -- iterable of FileCopy operations, each with a distinct destination
+    jobs -- maximum number of worker threads, None for the executor default
+    skip -- optional predicate, files it returns True for are not copied
+    link_mode -- one of coursetools.links.LINK_MODES
+    progress -- optional callable given each finished group's results
+    buffer_size -- bytes per chunk when copying large files, None for the default
+    """
+    start = time.perf_counter()
+    worker = partial(
+        copy_group, skip=skip, link_mode=link_mode, buffer_size=buffer_size
+    )
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(worker, group) for group in group_by_source(copies)]
+        try:
+            for future in as_completed(futures):
+                results += future.result()
+                if progress:
+                    progress(future.result())
+        except BaseException:
+            cancel(futures)
+            raise
+    copied = tuple(result for result in results if result is not None)
+    return CopyStats(
+        files=len(copied),
+        size=sum(result.size for result in copied),
+        elapsed=time.perf_counter() - start,
+        skipped=len(results) - len(copied),
+        results=copied,
+    )
+
+
+def cancel(futures):
+    # The executor waits for every submitted copy on exit, so on an error or
+    # Ctrl-C the ones not yet started are cancelled first.
+    for future in futures:
+        future.cancel()
+
+
+def group_by_source(copies):
+    groups = {}
+    for file_copy in copies:
+        groups.setdefault(file_copy.source, []).append(file_copy)
+    return groups.values()
+
+
+def copy_group(file_copies, skip=None, link_mode="copy", buffer_size=None):
+    start = time.perf_counter()
+    pending = [file_copy for file_copy in file_copies if not (skip and skip(file_copy))]
+    skipped = [None] * (len(file_copies) - len(pending))
+    if len(pending) > 1 and link_mode == "copy":
+        fan_out_copy(pending, buffer_size or CHUNK_SIZE)
+        strategies = ["copy"] * len(pending)
+    else:
+        strategies = [
+            link_file(file_copy, link_mode, buffer_size) for file_copy in pending
+        ]
+    seconds = (time.perf_counter() - start) / max(len(pending), 1)
+    return skipped + [
+        copied(file_copy, strategy, seconds)
+        for file_copy, strategy in zip(pending, strategies)
+    ]
+
+
+def copied(file_copy, strategy, seconds):
+    return CopyResult(
+        size=os.path.getsize(file_copy.destination),
+        origin=file_copy.origin,
+        strategy=strategy,
+        seconds=seconds,
+        directory=os.path.dirname(file_copy.source),
+        destination=str(file_copy.destination),
+    )
@@ -0,0 +1,132 @@
+import os
+import re
+
+
+class ExcludeMatcher:
+    """
+    Matches relative paths against every exclude pattern with one compiled regex.
+
+    Patterns follow gitignore rules: a pattern without a slash matches a name at
+    any depth, a leading or inner slash anchors it to the root, `**` matches
+    across directories and a trailing slash only matches directories.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.name_patterns = [
+            pattern for pattern in self.patterns if is_name_pattern(pattern)
+        ]
+        self.path_patterns = [
+            pattern for pattern in self.patterns if not is_name_pattern(pattern)
+        ]
+        self.name_regex = compile_patterns(self.name_patterns)
+        self.path_regex = compile_patterns(self.path_patterns)
+
+    def match(self, relative_path, is_dir=False):
+        suffix = "/" if is_dir else ""
+        name = relative_path.rpartition("/")[2]
+        return match_pattern(
+            self.name_regex, self.name_patterns, name + suffix
+        ) or match_pattern(self.path_regex, self.path_patterns, relative_path + suffix)
+
+    def excludes(self, relative_path, is_dir=False):
+        return self.match(relative_path, is_dir) is not None
+
+
+def is_name_pattern(pattern):
+    return "/" not in pattern.rstrip("/")
+
+
+def compile_patterns(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(f"({translate(pattern)})" for pattern in patterns))
+
+
+def match_pattern(regex, patterns, path):
+    match = regex.fullmatch(path) if regex else None
+    return patterns[match.lastindex - 1] if match else None
+
+
+def translate(pattern):
+    """
+    Translates a gitignore-style pattern into a regex for a path relative to
+    the root, or just the entry name for a pattern without a slash. Directory
+    paths are matched with a trailing slash.
+    """
+    directory_only = pattern.endswith("/")
+    body = pattern.strip("/")
+    suffix = "/" if directory_only else "/?"
+    return f"{translate_glob(body)}{suffix}"
+
+
+GLOB_TOKENS = re.compile(r"\*\*/|/\*\*$|\*\*|\*|\?|\[[^\]]*\]|[^*?\[]+|\[")
+
+
+def translate_glob(glob):
+    return "".join(translate_token(token) for token in GLOB_TOKENS.findall(glob))
+
+
+def translate_token(token):
+    if token == "**/":
+        return "(?:.*/)?"
+    if token == "/**":
+        return "/.*"
+    if token == "**":
+        return ".*"
+    if token == "*":
+        return "[^/]*"
+    if token == "?":
+        return "[^/]"
+    if token.startswith("[") and token.endswith("]") and len(token) > 2:
+        inner = token[1:-1]
+        return f"[^{inner[1:]}]" if inner.startswith("!") else f"[{inner}]"
+    return re.escape(token)
+
+
+def walk(root, matcher, excluded=None, scandir=None):
+    """
+    Yields (relative path, DirEntry, is_dir) for every entry under root that
+    is not excluded, each directory before its contents.
+
+    Excluded directories are never opened. Symbolic links are followed.
+    excluded -- optional Counter of excluded entries per pattern
+    scandir -- optional function listing a directory, such as a ScanCache
+    """
+    scandir = scandir or scan_directory
+    pending = [""]
+    while pending:
+        prefix = pending.pop()
+        for entry in scandir(os.path.join(root, prefix)):
+            relative = prefix + entry.name
+            is_dir = entry.is_dir()
+            pattern = matcher.match(relative, is_dir)
+            if pattern:
+                if excluded is not None:
+                    excluded[pattern] += 1
+                continue
+            yield relative, entry, is_dir
+            if is_dir:
+                pending.append(relative + "/")
+
+
+def scan_directory(path):
+    with os.scandir(path) as entries:
+        yield from entries
+
+
+class ScanCache:
+    """
+    Lists each directory once, however many walks pass through it.
+
+    DirEntry objects cache their type and stat, so those are shared too.
+    """
+
+    def __init__(self):
+        self.listings = {}
+
+    def __call__(self, path):
+        key = os.path.normpath(path)
+        if key not in self.listings:
+            self.listings[key] = list(scan_directory(key))
+        return self.listings[key]
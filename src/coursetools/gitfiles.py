@@ -0,0 +1,99 @@
+import os
+import subprocess
+from pathlib import Path
+from stat import S_ISDIR
+
+
+class GitFiles:
+    """
+    Lists the training repo's files from its git index with `git ls-files`
+    instead of walking directories, so untracked build output is never seen.
+
+    Directories are those holding tracked files. Tracked files missing from
+    the working tree, and submodules, are skipped.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._is_checkout = None
+
+    def is_checkout(self):
+        if self._is_checkout is None:
+            self._is_checkout = (
+                git(self.root, "rev-parse", "--is-inside-work-tree") == b"true\n"
+            )
+            if not self._is_checkout:
+                print(
+                    f"{self.root} is not a git checkout, walking the filesystem instead"
+                )
+        return self._is_checkout
+
+    def covers(self, path):
+        relative = os.path.relpath(path, self.root)
+        inside = relative != ".." and not relative.startswith(".." + os.sep)
+        return inside and self.is_checkout()
+
+    def tracked_files(self, source):
+        output = git(Path(source), "ls-files", "-z", "--cached", "--", ".")
+        return sorted({os.fsdecode(name) for name in output.split(b"\0")[:-1]})
+
+    def digests(self, paths):
+        # git records SHA-1 blob ids, not the BLAKE2 digests the sync compares
+        return {}
+
+    def entries(self, source, matcher, excluded=None):
+        """
+        Yields (relative path, full path, is_dir, size) for every tracked entry
+        under source that is not excluded, each directory before its contents.
+        """
+        listed = set()
+        excluded_directories = set()
+        for relative in self.tracked_files(source):
+            for directory in parents(relative):
+                if directory in excluded_directories:
+                    break
+                if directory in listed:
+                    continue
+                listed.add(directory)
+                pattern = matcher.match(directory, True)
+                if pattern:
+                    count(excluded, pattern)
+                    excluded_directories.add(directory)
+                    break
+                yield directory, os.path.join(source, directory), True, 0
+            else:
+                pattern = matcher.match(relative, False)
+                if pattern:
+                    count(excluded, pattern)
+                    continue
+                entry = file_entry(source, relative)
+                if entry:
+                    yield entry
+
+
+def file_entry(source, relative):
+    path = os.path.join(source, relative)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if S_ISDIR(stat.st_mode):
+        return None
+    return relative, path, False, stat.st_size
+
+
+def count(excluded, pattern):
+    if excluded is not None:
+        excluded[pattern] += 1
+
+
+def parents(relative):
+    parts = relative.split("/")
+    return ["/".join(parts[:depth]) for depth in range(1, len(parts))]
+
+
+def git(directory, *arguments):
+    result = subprocess.run(
+        ["git", "-C", str(directory), *arguments], capture_output=True, check=False
+    )
+    return result.stdout if result.returncode == 0 else b""
@@ -0,0 +1,103 @@
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from coursetools.archive import archive_entries
+from coursetools.copier import CopyStats
+
+DEFAULT_IDENT = "coursetools <coursetools@localhost>"
+COMMIT_MESSAGE = "Initial commit of the {template} course"
+
+
+class GitInitError(Exception):
+    pass
+
+
+def init_repository(plan, root="."):
+    """
+    Makes root a new git repository whose first commit holds the files of a
+    CopyPlan, then checks the commit out.
+
+    Each source file is read once, straight into `git fast-import`, and git
+    writes the working tree and index from the objects it stored, so nothing
+    is copied and then hashed again by `git add`.
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    if (root / ".git").exists():
+        raise GitInitError(f"{root.resolve()} is already a git repository")
+    root.mkdir(parents=True, exist_ok=True)
+    git(root, "init", "-q")
+    files = [entry for entry in archive_entries(plan, root) if not entry.is_dir]
+    fast_import(root, files, commit_header(root, plan.template))
+    git(root, "reset", "-q", "--hard")
+    for directory in plan.directories:
+        directory.destination.mkdir(parents=True, exist_ok=True)
+    return CopyStats(len(files), plan.total_bytes(), time.perf_counter() - start)
+
+
+def commit_header(root, template):
+    branch = git(root, "symbolic-ref", "HEAD").strip()
+    ident = committer_ident(root)
+    message = COMMIT_MESSAGE.format(template=template).encode()
+    return b"commit %s\ncommitter %s\ndata %d\n%s\n" % (
+        branch,
+        ident,
+        len(message),
+        message,
+    )
+
+
+def committer_ident(root):
+    try:
+        return git(root, "var", "GIT_COMMITTER_IDENT").strip()
+    except GitInitError:
+        return f"{DEFAULT_IDENT} {int(time.time())} +0000".encode()
+
+
+def fast_import(root, files, header):
+    process = subprocess.Popen(
+        ["git", "fast-import", "--quiet"],
+        cwd=root,
+        stdin=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        modes = []
+        for mark, entry in enumerate(files, start=1):
+            modes.append(write_blob(process.stdin, mark, entry.source))
+        process.stdin.write(header)
+        for mark, (entry, mode) in enumerate(zip(files, modes), start=1):
+            process.stdin.write(b"M %s :%d %s\n" % (mode, mark, quote_path(entry.name)))
+    except BrokenPipeError:
+        pass
+    _, errors = process.communicate()
+    if process.returncode:
+        raise GitInitError(f"git fast-import failed: {errors.decode().strip()}")
+
+
+def write_blob(stream, mark, source):
+    with open(source, "rb") as file:
+        status = os.fstat(file.fileno())
+        stream.write(b"blob\nmark :%d\ndata %d\n" % (mark, status.st_size))
+        shutil.copyfileobj(file, stream)
+    stream.write(b"\n")
+    return b"100755" if status.st_mode & 0o111 else b"100644"
+
+
+def quote_path(name):
+    if not any(character in name for character in '"\\\n'):
+        return name.encode()
+    escaped = name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'.encode()
+
+
+def git(root, *arguments):
+    result = subprocess.run(["git", *arguments], cwd=root, capture_output=True)
+    if result.returncode:
+        raise GitInitError(
+            f"git {arguments[0]} failed: {result.stderr.decode().strip()}"
+        )
+    return result.stdout
@@ -0,0 +1,255 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+from coursetools.excludes import scan_directory
+from coursetools.sync import file_digest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS directories_parent ON directories(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files(directory);
+"""
+UNSCANNED = -1
+
+
+def index_path(repo_root):
+    key = hashlib.blake2b(str(repo_root).encode(), digest_size=8).hexdigest()
+    return Path.home() / ".coursetools" / "index" / f"{key}.sqlite3"
+
+
+def open_index(repo_root, refresh=True, hash_files=False):
+    """
+    Opens the index of the training repo, kept under ~/.coursetools/index.
+    """
+    root = Path(repo_root).resolve()
+    path = index_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return FileIndex(path, root, refresh, hash_files)
+
+
+class FileIndex:
+    """
+    An SQLite record of every directory and file in the training repo.
+
+    Paths are stored relative to the repo root with / separators. A refresh
+    stats each indexed directory and only lists those whose mtime changed, so
+    files edited in place keep their indexed size until their directory is
+    rescanned; the copy itself always reads the current contents. Without
+    refresh only directories the index has never scanned are listed. Recorded
+    digests are only used while the file's size and mtime still match.
+    """
+
+    def __init__(self, database, root, refresh=True, hash_files=False):
+        self.root = Path(root)
+        self.auto_refresh = refresh
+        self.hash_files = hash_files
+        self.connection = sqlite3.connect(str(database))
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def relative(self, path):
+        relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if relative == ".." or relative.startswith("../"):
+            return None
+        return "" if relative == "." else relative
+
+    def covers(self, path):
+        return self.relative(path) is not None
+
+    def full_path(self, relative):
+        return self.root / relative
+
+    def refresh(self, relative=""):
+        pending = [relative]
+        while pending:
+            directory = pending.pop()
+            try:
+                mtime = os.stat(self.full_path(directory)).st_mtime_ns
+            except FileNotFoundError:
+                self.forget(directory)
+                continue
+            if self.directory_mtime(directory) != mtime or self.needs_hashing(
+                directory
+            ):
+                self.rescan(directory, mtime)
+            pending.extend(self.subdirectories(directory))
+        self.connection.commit()
+
+    def directory_mtime(self, directory):
+        row = self.connection.execute(
+            "SELECT mtime_ns FROM directories WHERE path = ?", (directory,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def needs_hashing(self, directory):
+        if not self.hash_files:
+            return False
+        row = self.connection.execute(
+            "SELECT 1 FROM files WHERE directory = ? AND digest IS NULL LIMIT 1",
+            (directory,),
+        ).fetchone()
+        return row is not None
+
+    def subdirectories(self, directory):
+        rows = self.connection.execute(
+            "SELECT path FROM directories WHERE parent = ?", (directory,)
+        )
+        return [path for (path,) in rows]
+
+    def rescan(self, directory, mtime):
+        known_files = self.indexed_files(directory)
+        known_directories = set(self.subdirectories(directory))
+        seen = set()
+        for entry in scan_directory(self.full_path(directory)):
+            relative = join(directory, entry.name)
+            seen.add(relative)
+            if entry.is_dir():
+                if relative not in known_directories:
+                    self.save_directory(relative, directory, UNSCANNED)
+            elif entry.is_file():
+                self.save_file(
+                    relative, directory, entry.stat(), known_files.get(relative)
+                )
+        for gone in known_directories - seen:
+            self.forget(gone)
+        self.connection.executemany(
+            "DELETE FROM files WHERE path = ?",
+            [(gone,) for gone in set(known_files) - seen],
+        )
+        self.save_directory(directory, parent_of(directory), mtime)
+
+    def indexed_files(self, directory):
+        rows = self.connection.execute(
+            "SELECT path, size, mtime_ns, digest FROM files WHERE directory = ?",
+            (directory,),
+        )
+        return {path: (size, mtime, digest) for path, size, mtime, digest in rows}
+
+    def save_directory(self, path, parent, mtime):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO directories (path, parent, mtime_ns) "
+            "VALUES (?, ?, ?)",
+            (path, parent, mtime),
+        )
+
+    def save_file(self, path, directory, stat, known):
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            if known[2] or not self.hash_files:
+                return
+        digest = file_digest(self.full_path(path)) if self.hash_files else None
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files (path, directory, size, mtime_ns, digest) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (path, directory, stat.st_size, stat.st_mtime_ns, digest),
+        )
+
+    def digests(self, paths):
+        """
+        Returns {path: digest} for those of paths with a recorded digest whose
+        size and mtime still match the file, leaving out files changed since.
+        """
+        found = {}
+        for path in paths:
+            relative = self.relative(path)
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (relative,)
+            ).fetchone()
+            if row and row[2] and is_current(path, row[0], row[1]):
+                found[path] = row[2]
+        return found
+
+    def forget(self, directory):
+        low, high = subtree_range(directory)
+        for table in ["directories", "files"]:
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)",
+                (directory, low, high),
+            )
+
+    def scan_unscanned(self, top):
+        """
+        Scans the directories under top, or top itself, that the index has
+        never scanned, which a cached listing would otherwise leave out.
+        """
+        if self.directory_mtime(top) is None:
+            self.refresh(top)
+            return
+        low, high = subtree_range(top)
+        rows = self.connection.execute(
+            "SELECT path FROM directories WHERE mtime_ns = ? AND path >= ? "
+            "AND path < ? ORDER BY path",
+            (UNSCANNED, low, high),
+        ).fetchall()
+        for (directory,) in rows:
+            if self.directory_mtime(directory) == UNSCANNED:
+                self.refresh(directory)
+
+    def entries(self, source, matcher, excluded=None):
+        """
+        Yields (relative path, full path, is_dir, size) for every indexed entry
+        under source that is not excluded, each directory before its contents.
+        """
+        top = self.relative(source)
+        if self.auto_refresh:
+            self.refresh(top)
+        else:
+            self.scan_unscanned(top)
+        low, high = subtree_range(top)
+        rows = self.connection.execute(
+            "SELECT path, 1, 0 FROM directories WHERE path >= ? AND path < ? "
+            "UNION ALL SELECT path, 0, size FROM files WHERE path >= ? AND path < ? "
+            "ORDER BY path",
+            (low, high, low, high),
+        )
+        excluded_directories = set()
+        for path, is_dir, size in rows:
+            relative = path[len(low) :]
+            if not relative or parent_of(relative) in excluded_directories:
+                if is_dir and relative:
+                    excluded_directories.add(relative)
+                continue
+            pattern = matcher.match(relative, bool(is_dir))
+            if pattern:
+                if excluded is not None:
+                    excluded[pattern] += 1
+                if is_dir:
+                    excluded_directories.add(relative)
+                continue
+            yield relative, str(self.full_path(path)), bool(is_dir), size
+
+
+def is_current(path, size, mtime):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return (stat.st_size, stat.st_mtime_ns) == (size, mtime)
+
+
+def join(directory, name):
+    return f"{directory}/{name}" if directory else name
+
+
+def parent_of(path):
+    return path.rpartition("/")[0] if path else None
+
+
+def subtree_range(directory):
+    if not directory:
+        return "", "\U0010ffff"
+    return f"{directory}/", f"{directory}0"
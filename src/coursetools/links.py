@@ -0,0 +1,220 @@
+import errno
+import os
+from contextlib import ExitStack
+from shutil import copy2, copymode, copystat
+
+FICLONE = 0x40049409
+PROBE_NAME = ".coursetools-probe"
+CHUNK_SIZE = 1024 * 1024
+# Plain copies of files this size or larger move CHUNK_SIZE (or the buffer
+# size given) at a time with os.sendfile, see chunked_copy.
+LARGE_FILE_SIZE = 16 * 1024 * 1024
+UNSUPPORTED_ERRORS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.ENOSYS,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+}
+
+
+class UnsupportedLink(Exception):
+    pass
+
+
+def plain_copy(file_copy):
+    file_copy.copy_function(file_copy.source, file_copy.destination)
+
+
+def reflink(file_copy):
+    try:
+        import fcntl
+    except ImportError as error:
+        raise UnsupportedLink("reflink needs fcntl") from error
+    try:
+        with open(file_copy.source, "rb") as source, open(
+            file_copy.destination, "wb"
+        ) as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError as error:
+        if error.errno not in UNSUPPORTED_ERRORS:
+            raise
+        remove_existing(file_copy.destination)
+        raise UnsupportedLink("reflink is not supported on this filesystem") from error
+    copy_metadata(file_copy)
+
+
+def copy_range(file_copy):
+    if not hasattr(os, "copy_file_range"):
+        raise UnsupportedLink("copy_file_range is not available")
+    with open(file_copy.source, "rb") as source, open(
+        file_copy.destination, "wb"
+    ) as target:
+        remaining = os.fstat(source.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(source.fileno(), target.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    copy_metadata(file_copy)
+
+
+def chunked_copy(file_copy, buffer_size=CHUNK_SIZE):
+    """
+    Copies a large file buffer_size bytes at a time, in the kernel with
+    os.sendfile where it can copy between files, and otherwise through one
+    reused buffer.
+    """
+    with open(file_copy.source, "rb") as source, open(
+        file_copy.destination, "wb"
+    ) as target:
+        try:
+            send_file(source, target, buffer_size)
+        except UnsupportedLink:
+            read_into(source, target, buffer_size)
+    copy_metadata(file_copy)
+
+
+def send_file(source, target, buffer_size):
+    if not hasattr(os, "sendfile"):
+        raise UnsupportedLink("sendfile is not available")
+    offset = 0
+    while True:
+        try:
+            sent = os.sendfile(target.fileno(), source.fileno(), offset, buffer_size)
+        except OSError as error:
+            if offset == 0 and error.errno in UNSUPPORTED_ERRORS:
+                raise UnsupportedLink(
+                    "sendfile can't copy between these files"
+                ) from error
+            raise
+        if sent == 0:
+            return
+        offset += sent
+
+
+def read_into(source, target, buffer_size):
+    buffer = memoryview(bytearray(buffer_size))
+    while True:
+        read = source.readinto(buffer)
+        if not read:
+            return
+        target.write(buffer[:read])
+
+
+def fan_out_copy(file_copies, buffer_size=CHUNK_SIZE):
+    """
+    Copies one source to several destinations, reading the source only once.
+    """
+    for file_copy in file_copies:
+        if is_same_file(file_copy):
+            remove_existing(file_copy.destination)
+    with ExitStack() as stack:
+        source = stack.enter_context(open(file_copies[0].source, "rb"))
+        targets = [
+            stack.enter_context(open(fc.destination, "wb")) for fc in file_copies
+        ]
+        for chunk in iter(lambda: source.read(buffer_size), b""):
+            for target in targets:
+                target.write(chunk)
+    for file_copy in file_copies:
+        copy_metadata(file_copy)
+
+
+def hardlink(file_copy):
+    remove_existing(file_copy.destination)
+    try:
+        os.link(file_copy.source, file_copy.destination)
+    except OSError as error:
+        if error.errno not in UNSUPPORTED_ERRORS:
+            raise
+        raise UnsupportedLink(
+            "hardlink is not supported between these filesystems"
+        ) from error
+
+
+def copy_metadata(file_copy):
+    if file_copy.copy_function is copy2:
+        copystat(file_copy.source, file_copy.destination)
+    else:
+        copymode(file_copy.source, file_copy.destination)
+
+
+def remove_existing(path):
+    if os.path.lexists(path):
+        os.unlink(path)
+
+
+TRANSFERS = {
+    "copy": plain_copy,
+    "reflink": reflink,
+    "copy_file_range": copy_range,
+    "hardlink": hardlink,
+    "chunked": chunked_copy,
+}
+
+STRATEGIES = {
+    "copy": ["copy"],
+    "reflink": ["reflink"],
+    "hardlink": ["hardlink"],
+    "auto": ["reflink", "copy_file_range", "copy"],
+}
+LINK_MODES = list(STRATEGIES)
+
+
+def link_file(file_copy, link_mode="copy", buffer_size=None):
+    """
+    Puts the source file at the destination using the first strategy of the
+    link mode that the filesystem supports, and returns the strategy's name.
+
+    buffer_size -- bytes per chunk for large files, see chunked_copy
+    """
+    if is_same_file(file_copy):
+        remove_existing(file_copy.destination)
+    strategies = STRATEGIES[link_mode]
+    for strategy in strategies[:-1]:
+        try:
+            TRANSFERS[strategy](file_copy)
+            return strategy
+        except UnsupportedLink:
+            continue
+        except OSError as error:
+            if error.errno not in UNSUPPORTED_ERRORS:
+                raise
+    if strategies[-1] == "copy" and file_copy.size >= LARGE_FILE_SIZE:
+        chunked_copy(file_copy, buffer_size or CHUNK_SIZE)
+        return "chunked"
+    TRANSFERS[strategies[-1]](file_copy)
+    return strategies[-1]
+
+
+def probe_link_mode(link_mode, file_copy):
+    """
+    Raises UnsupportedLink when a link mode with nothing to fall back on
+    can't place the file's source where it is going, by linking it beside
+    the destination, so nothing is copied with a mode that would fail.
+    """
+    strategies = STRATEGIES[link_mode]
+    if len(strategies) > 1 or strategies[0] == "copy":
+        return
+    probe = os.path.join(existing_parent(file_copy.destination), PROBE_NAME)
+    try:
+        TRANSFERS[strategies[0]](file_copy._replace(destination=probe))
+    finally:
+        remove_existing(probe)
+
+
+def existing_parent(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    while not os.path.isdir(directory):
+        directory = os.path.dirname(directory)
+    return directory
+
+
+def is_same_file(file_copy):
+    try:
+        return os.path.samefile(file_copy.source, file_copy.destination)
+    except OSError:
+        return False
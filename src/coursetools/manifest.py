@@ -0,0 +1,198 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from coursetools.archive import arcname
+from coursetools.copier import MEGABYTE
+from coursetools.excludes import ExcludeMatcher, walk
+from coursetools.plan import limits_error, plan_template
+from coursetools.sync import PROTECTED_NAMES, file_digest
+from coursetools.templates import find_template
+
+ALGORITHM = "blake2b"
+
+
+class HashStats(NamedTuple):
+    files: int
+    size: int
+    elapsed: float
+
+    def megabytes_per_second(self):
+        return self.size / MEGABYTE / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"hashed {self.files} files ({self.size / MEGABYTE:.1f} MB) "
+            f"in {self.elapsed:.2f}s: {self.megabytes_per_second():.1f} MB/sec"
+        )
+
+
+class ExpectedFile(NamedTuple):
+    size: int
+    digest: str = None
+    source: os.PathLike = None
+
+
+class Verification(NamedTuple):
+    missing: list
+    extra: list
+    modified: list
+    stats: HashStats
+
+    @property
+    def ok(self):
+        return not (self.missing or self.extra or self.modified)
+
+    def describe(self):
+        lines = [f"  missing {path}" for path in self.missing]
+        lines += [f"  extra {path}" for path in self.extra]
+        lines += [f"  modified {path}" for path in self.modified]
+        lines.append(
+            f"{len(self.missing)} missing, {len(self.extra)} extra, "
+            f"{len(self.modified)} modified"
+        )
+        lines.append(str(self.stats))
+        return lines
+
+
+def hash_files(paths, jobs=None):
+    """
+    Returns the BLAKE2 digest of each path, in order, spreading the files
+    across a process pool when there is more than one worker.
+    """
+    paths = [str(path) for path in paths]
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return [file_digest(path) for path in paths]
+    # Imported here as it brings in multiprocessing, which only hashing needs.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                file_digest, paths, chunksize=max(1, len(paths) // (workers * 4))
+            )
+        )
+
+
+def write_manifest(path, copies, root=".", jobs=None):
+    """
+    Writes the path relative to root, size and digest of every copied file to
+    path as JSON, hashing the files as they are in the destination.
+    """
+    start = time.perf_counter()
+    destinations = sorted(Path(file_copy.destination) for file_copy in copies)
+    sizes = [os.path.getsize(destination) for destination in destinations]
+    digests = hash_files(destinations, jobs)
+    files = {
+        arcname(destination, root): [size, digest]
+        for destination, size, digest in zip(destinations, sizes, digests)
+    }
+    with open(path, "w") as file:
+        json.dump({"algorithm": ALGORITHM, "files": files}, file, indent=1)
+    return HashStats(len(files), sum(sizes), time.perf_counter() - start)
+
+
+def load_manifest(path):
+    with open(path) as file:
+        data = json.load(file)
+    if data.get("algorithm") != ALGORITHM:
+        raise ValueError(f"{path} is not a {ALGORITHM} manifest")
+    return {
+        name: ExpectedFile(size, digest)
+        for name, (size, digest) in data["files"].items()
+    }
+
+
+def expected_from_plan(plan, directory, digests=None):
+    """
+    The files the plan puts in directory, with the digest of any source in
+    digests so that only the others are hashed.
+    """
+    digests = digests or {}
+    return {
+        arcname(file_copy.destination, directory): ExpectedFile(
+            file_copy.size, digests.get(file_copy.source), file_copy.source
+        )
+        for file_copy in plan.copies.values()
+    }
+
+
+def directory_files(directory, excludes=(), ignore=()):
+    matcher = ExcludeMatcher(list(excludes) + sorted(PROTECTED_NAMES))
+    return {
+        relative: Path(entry.path)
+        for relative, entry, is_dir in walk(directory, matcher)
+        if not is_dir and Path(entry.path) not in ignore
+    }
+
+
+def verify_directory(expected, directory, excludes=(), jobs=None, ignore=()):
+    """
+    Compares the files in directory with the expected ones, hashing those of
+    the same size on a process pool.
+
+    expected -- {path relative to directory: ExpectedFile}, with a digest
+    or a source file to hash
+    excludes -- patterns of files in directory that are never extra
+    ignore -- full paths in directory that are never extra, such as the manifest
+    """
+    start = time.perf_counter()
+    actual = directory_files(directory, excludes, ignore)
+    missing = sorted(set(expected) - set(actual))
+    extra = sorted(set(actual) - set(expected))
+    modified, compared = [], []
+    for name in sorted(set(expected) & set(actual)):
+        if os.path.getsize(actual[name]) != expected[name].size:
+            modified.append(name)
+        else:
+            compared.append(name)
+    sources = [name for name in compared if expected[name].digest is None]
+    paths = [actual[name] for name in compared] + [
+        expected[name].source for name in sources
+    ]
+    digests = hash_files(paths, jobs)
+    found = dict(zip(compared, digests))
+    wanted = {name: expected[name].digest for name in compared}
+    wanted.update(zip(sources, digests[len(compared) :]))
+    modified += [name for name in compared if found[name] != wanted[name]]
+    size = sum(os.path.getsize(path) for path in paths)
+    stats = HashStats(len(paths), size, time.perf_counter() - start)
+    return Verification(missing, extra, sorted(modified), stats)
+
+
+def verify_template(name, directory, manifest=None, jobs=None, index=None):
+    """
+    Checks that directory holds the course the template makes, against the
+    training repo or against a manifest written by an earlier run, and
+    prints what differs. Returns True when nothing does.
+
+    index -- optional FileIndex or GitFiles to list the training repo's files
+    from, whose recorded digests spare hashing those sources
+    """
+    template = find_template(name)
+    if template is None:
+        print("Not a valid template")
+        return False
+    error = limits_error(template)
+    if error:
+        print(error)
+        return False
+    print(f"verifying {directory} against the {name} template")
+    directory = Path(directory).resolve()
+    if manifest:
+        expected = load_manifest(manifest)
+    else:
+        plan = plan_template(name, template, directory, index=index)
+        sources = [file_copy.source for file_copy in plan.files]
+        digests = index.digests(sources) if index else None
+        expected = expected_from_plan(plan, directory, digests)
+    ignore = {Path(manifest).resolve()} if manifest else set()
+    result = verify_directory(
+        expected, directory, list(template["excludes"]), jobs, ignore
+    )
+    for line in result.describe():
+        print(line)
+    return result.ok
@@ -0,0 +1,116 @@
+import json
+import sys
+import time
+from collections import defaultdict
+
+from coursetools.copier import MEGABYTE
+
+SLOWEST_DIRECTORIES = 10
+
+
+def build_metrics(plans, stats):
+    """
+    Summarises a run as a JSON-ready dict: totals, time spent scanning and
+    copying, each template path's files and bytes, files excluded per
+    pattern and the directories that took longest to copy.
+    """
+    scan_seconds = sum(sum(plan.scan_seconds.values()) for plan in plans)
+    return {
+        "templates": [plan.template for plan in plans],
+        "files": stats.files,
+        "bytes": stats.size,
+        "skipped": stats.skipped,
+        "seconds": {
+            "scan": scan_seconds,
+            "copy": stats.elapsed,
+            "total": scan_seconds + stats.elapsed,
+        },
+        "paths": path_metrics(plans, stats),
+        "excluded": excluded_metrics(plans),
+        "slowest_directories": slowest_directories(stats),
+    }
+
+
+def path_metrics(plans, stats):
+    paths = {}
+    for plan in plans:
+        for key, seconds in plan.scan_seconds.items():
+            paths[key] = {
+                "files": 0,
+                "bytes": 0,
+                "scan_seconds": seconds,
+                "copy_seconds": 0.0,
+            }
+    for result in stats.results:
+        path = paths.setdefault(
+            result.origin,
+            {"files": 0, "bytes": 0, "scan_seconds": 0.0, "copy_seconds": 0.0},
+        )
+        path["files"] += 1
+        path["bytes"] += result.size
+        path["copy_seconds"] += result.seconds
+    return paths
+
+
+def excluded_metrics(plans):
+    excluded = defaultdict(int)
+    for plan in plans:
+        for pattern, count in plan.excluded.items():
+            excluded[pattern] += count
+    return dict(excluded)
+
+
+def slowest_directories(stats, limit=SLOWEST_DIRECTORIES):
+    directories = defaultdict(lambda: {"files": 0, "seconds": 0.0})
+    for result in stats.results:
+        directories[result.directory]["files"] += 1
+        directories[result.directory]["seconds"] += result.seconds
+    slowest = sorted(
+        directories.items(), key=lambda item: item[1]["seconds"], reverse=True
+    )
+    return [{"directory": directory, **totals} for directory, totals in slowest[:limit]]
+
+
+def write_metrics(path, metrics):
+    with open(path, "w") as file:
+        json.dump(metrics, file, indent=2)
+
+
+class ProgressLine:
+    """
+    Rewrites a single status line on a terminal as copies finish.
+    """
+
+    def __init__(self, total, stream=None, interval=0.1):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.shown = None
+
+    def __call__(self, results):
+        copied = [result for result in results if result is not None]
+        self.files += len(results)
+        self.bytes += sum(result.size for result in copied)
+        now = time.perf_counter()
+        if (
+            self.shown is None
+            or now - self.shown >= self.interval
+            or self.files == self.total
+        ):
+            self.shown = now
+            self.stream.write(
+                f"\r{self.files}/{self.total} files, {self.bytes / MEGABYTE:.1f} MB"
+            )
+            self.stream.flush()
+
+    def close(self):
+        if self.shown is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def progress_line(total, stream=None):
+    stream = stream or sys.stderr
+    return ProgressLine(total, stream) if stream.isatty() else None
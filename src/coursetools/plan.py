@@ -0,0 +1,410 @@
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from shutil import copy, copy2
+from typing import Callable, NamedTuple
+
+from coursetools.config import get_config
+from coursetools.copier import MEGABYTE, DirectoryCopy, FileCopy
+from coursetools.excludes import ExcludeMatcher, ScanCache, walk
+
+COPY_FUNCTIONS = {"copy": copy, "copy2": copy2}
+
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+class FileLimit(NamedTuple):
+    max_size: int
+    skip: bool = True
+
+
+class CopyRoot(NamedTuple):
+    key: str
+    source: Path
+    destination: Path
+
+
+@dataclass
+class CopyPlan:
+    """
+    Everything a template run will do, discovered without touching the destination.
+
+    Files are keyed on their destination, so a later template path replaces an
+    earlier one that maps to the same place; those are kept as conflicts.
+    Template paths already copied as part of a directory path are kept in
+    merged, against the path that covers them. What planning skips or merges
+    is told to report as it is found.
+    """
+
+    template: str
+    excludes: list = field(default_factory=list)
+    directories: list = field(default_factory=list)
+    copies: dict = field(default_factory=dict)
+    excluded: Counter = field(default_factory=Counter)
+    conflicts: dict = field(default_factory=dict)
+    missing: list = field(default_factory=list)
+    merged: dict = field(default_factory=dict)
+    oversized: list = field(default_factory=list)
+    scan_seconds: dict = field(default_factory=dict, compare=False)
+    report: Callable = field(default=print, compare=False, repr=False)
+
+    @property
+    def files(self):
+        return list(self.copies.values())
+
+    def total_bytes(self):
+        return sum(file_copy.size for file_copy in self.copies.values())
+
+    def add_directory(self, directory):
+        self.directories.append(directory)
+
+    def add_file(self, file_copy):
+        previous = self.copies.get(file_copy.destination)
+        if previous and previous.source != file_copy.source:
+            sources = self.conflicts.setdefault(
+                file_copy.destination, [previous.source]
+            )
+            sources.append(file_copy.source)
+        self.copies[file_copy.destination] = file_copy
+
+    def is_planned_directory(self, path):
+        return any(directory.destination == path for directory in self.directories)
+
+    def clashes(self):
+        """
+        Returns (destination, file source, directory source) for every
+        destination planned as both a file and a directory.
+        """
+        directories = {
+            directory.destination: directory.source for directory in self.directories
+        }
+        return [
+            (
+                file_copy.destination,
+                file_copy.source,
+                directories[file_copy.destination],
+            )
+            for file_copy in self.copies.values()
+            if file_copy.destination in directories
+        ]
+
+    def collisions(self):
+        lines = [
+            f"{target} is written by {', '.join(str(source) for source in sources)}, "
+            "keeping the last"
+            for target, sources in self.conflicts.items()
+        ]
+        lines += [
+            f"{target} would be both the file {file_source} "
+            f"and the directory {directory_source}"
+            for target, file_source, directory_source in self.clashes()
+        ]
+        return lines
+
+    def describe(self):
+        lines = [
+            f"plan for {self.template}: {len(self.copies)} files, "
+            f"{self.total_bytes() / MEGABYTE:.1f} MB "
+            f"in {len(self.directories)} directories"
+        ]
+        lines += [
+            f"  {origin}: {count} files"
+            for origin, count in self.files_per_origin().items()
+        ]
+        lines += [
+            f"  excluded {pattern}: {count}"
+            for pattern, count in sorted(self.excluded.items())
+        ]
+        lines += [f"  missing {key}" for key in self.missing]
+        lines += [
+            f"  {key} copied with {parent}" for key, parent in self.merged.items()
+        ]
+        lines += [
+            f"  oversized {source}: {size / MEGABYTE:.1f} MB"
+            for source, size in self.oversized
+        ]
+        lines += [
+            f"  conflict {target}: {', '.join(str(source) for source in sources)}"
+            for target, sources in self.conflicts.items()
+        ]
+        lines += [
+            f"  clash {target}: file {file_source}, directory {directory_source}"
+            for target, file_source, directory_source in self.clashes()
+        ]
+        return lines
+
+    def files_per_origin(self):
+        return Counter(file_copy.origin for file_copy in self.copies.values())
+
+    def to_dict(self):
+        return {
+            "template": self.template,
+            "excludes": self.excludes,
+            "directories": [
+                [str(d.source), str(d.destination), d.relative]
+                for d in self.directories
+            ],
+            "files": [file_to_list(file_copy) for file_copy in self.copies.values()],
+            "excluded": dict(self.excluded),
+            "conflicts": {
+                str(k): [str(s) for s in v] for k, v in self.conflicts.items()
+            },
+            "missing": self.missing,
+            "merged": self.merged,
+            "oversized": [[str(source), size] for source, size in self.oversized],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        plan = cls(data["template"], data["excludes"])
+        for source, destination, relative in data["directories"]:
+            plan.add_directory(DirectoryCopy(Path(source), Path(destination), relative))
+        for file_data in data["files"]:
+            plan.add_file(file_from_list(file_data))
+        plan.excluded.update(data["excluded"])
+        plan.conflicts = {
+            Path(k): [Path(s) for s in v] for k, v in data["conflicts"].items()
+        }
+        plan.missing = data["missing"]
+        plan.merged = data.get("merged", {})
+        plan.oversized = [
+            (Path(source), size) for source, size in data.get("oversized", [])
+        ]
+        return plan
+
+    def save(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+
+def file_to_list(file_copy):
+    return [
+        str(file_copy.source),
+        str(file_copy.destination),
+        file_copy.copy_function.__name__,
+        file_copy.origin,
+        file_copy.size,
+    ]
+
+
+def file_from_list(data):
+    source, destination, function, origin, size = data
+    return FileCopy(
+        Path(source), Path(destination), COPY_FUNCTIONS[function], origin, size
+    )
+
+
+def plan_template(name, template, output=".", scandir=None, index=None, report=print):
+    """
+    Walks every path of the template once and returns the CopyPlan for it.
+
+    Paths that are already copied, to the same place, by a directory path
+    above them are merged into it rather than walked again.
+
+    output -- directory the template's destinations are relative to
+    scandir -- optional directory lister shared between plans, see ScanCache
+    index -- optional FileIndex or GitFiles to enumerate files from instead of walking
+    report -- called with each message about skipped and merged paths
+    """
+    training_repo = get_config("repo_root")
+    plan = CopyPlan(name, list(template["excludes"]), report=report)
+    matcher = ExcludeMatcher(plan.excludes)
+    limit = file_limit(template)
+    roots, plan.merged = copy_roots(training_repo, template["paths"], output, matcher)
+    for key, parent in plan.merged.items():
+        plan.report(f"{key} is copied with {parent}, skipping")
+    if scandir is None and overlapping(roots):
+        scandir = ScanCache()
+
+    for key, source, destination in roots:
+        start = time.perf_counter()
+        if source.is_dir():
+            entries = source_entries(source, matcher, plan.excluded, scandir, index)
+            plan_directory(plan, key, source, destination, entries, limit)
+        elif source.is_file():
+            plan_file(plan, key, source, destination, matcher, limit)
+        else:
+            plan.report(f"{key} is neither file or directory, skipping")
+            plan.missing.append(key)
+        plan.scan_seconds[key] = time.perf_counter() - start
+
+    return plan
+
+
+def copy_roots(training_repo, paths, output, matcher):
+    """
+    Resolves a template's paths into CopyRoots, leaving out those covered by
+    a directory root, and returns them with a dict of each covered key and
+    the key covering it.
+    """
+    roots = [
+        CopyRoot(
+            key,
+            Path(f"{training_repo}{key}").resolve(),
+            (Path(output) / paths[key]).resolve(),
+        )
+        for key in paths
+    ]
+    directories = [root for root in roots if root.source.is_dir()]
+    kept, merged = [], {}
+    for root in roots:
+        parent = covering_root(root, directories, matcher)
+        if parent:
+            merged[root.key] = parent.key
+        else:
+            kept.append(root)
+    return kept, merged
+
+
+def covering_root(root, directories, matcher):
+    """
+    Returns the directory root whose walk already copies root to the same
+    destination, if any.
+
+    Anchored exclude patterns match differently from a nested root, so they
+    are never merged.
+    """
+    if matcher.path_patterns:
+        return None
+    for directory in directories:
+        if root.source == directory.source or not is_inside(
+            root.source, directory.source
+        ):
+            continue
+        relative = root.source.relative_to(directory.source)
+        target = directory.destination / relative
+        is_file = root.source.is_file()
+        same_place = root.destination == target or (
+            is_file and root.destination == target.parent
+        )
+        if same_place and not excluded_within(
+            relative.as_posix(), not is_file, matcher
+        ):
+            return directory
+    return None
+
+
+def excluded_within(relative, is_dir, matcher):
+    parts = relative.split("/")
+    ancestors = ["/".join(parts[:depth]) for depth in range(1, len(parts))]
+    return any(
+        matcher.excludes(ancestor, True) for ancestor in ancestors
+    ) or matcher.excludes(relative, is_dir)
+
+
+def overlapping(roots):
+    sources = [root.source for root in roots]
+    return any(
+        first != second and is_inside(second, first)
+        for first in sources
+        for second in sources
+    )
+
+
+def is_inside(path, directory):
+    try:
+        path.relative_to(directory)
+    except ValueError:
+        return False
+    return True
+
+
+def source_entries(source, matcher, excluded, scandir=None, index=None):
+    if index and index.covers(source):
+        return index.entries(source, matcher, excluded)
+    return walked_entries(source, matcher, excluded, scandir)
+
+
+def walked_entries(source, matcher, excluded, scandir=None):
+    for relative, entry, is_dir in walk(source, matcher, excluded, scandir):
+        yield relative, entry.path, is_dir, 0 if is_dir else entry.stat().st_size
+
+
+def plan_directory(plan, key, source, destination, entries, limit=None):
+    plan.add_directory(DirectoryCopy(source, destination, ""))
+    for relative, path, is_dir, size in entries:
+        target = destination / relative
+        if is_dir:
+            plan.add_directory(DirectoryCopy(Path(path), target, f"{relative}/"))
+        elif within_limit(plan, Path(path), size, limit):
+            plan.add_file(FileCopy(Path(path), target, copy2, key, size))
+
+
+def plan_file(plan, key, source, destination, matcher, limit=None):
+    pattern = matcher.match(source.name)
+    if pattern:
+        plan.report(f"{key} is excluded, skipping")
+        plan.excluded[pattern] += 1
+        return
+    size = source.stat().st_size
+    if not within_limit(plan, source, size, limit):
+        return
+    into_directory = destination.is_dir() or plan.is_planned_directory(destination)
+    target = destination / source.name if into_directory else destination
+    plan.add_file(FileCopy(source, target, copy, key, size))
+
+
+def within_limit(plan, source, size, limit):
+    """
+    Records and reports a file over the template's size limit, returning
+    False when the limit says to leave it out.
+    """
+    if limit is None or size <= limit.max_size:
+        return True
+    plan.oversized.append((source, size))
+    action = "skipping" if limit.skip else "copying anyway"
+    plan.report(
+        f"{source} is {size / MEGABYTE:.1f} MB, "
+        f"over the {limit.max_size / MEGABYTE:.1f} MB limit, {action}"
+    )
+    return not limit.skip
+
+
+def file_limit(template):
+    """
+    Reads the optional [limits] section of a template:
+
+        [limits]
+        max_file_size = 100M
+        oversized = skip
+
+    max_file_size takes a K, M or G suffix, and oversized is skip (the
+    default) or warn to copy large files anyway.
+    """
+    if "limits" not in template or "max_file_size" not in template["limits"]:
+        return None
+    limits = template["limits"]
+    return FileLimit(
+        parse_size(limits["max_file_size"]), limits.get("oversized", "skip") != "warn"
+    )
+
+
+def limits_error(template):
+    """
+    Returns why the template's [limits] section can't be read, or None when
+    it can, so a bad size is reported before anything is planned.
+    """
+    try:
+        file_limit(template)
+    except ValueError as error:
+        return f"{error} in the [limits] section"
+    return None
+
+
+def parse_size(text):
+    value = text.strip().upper()
+    if value.endswith("B"):
+        value = value[:-1]
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        return int(float(value[: len(value) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"{text} is not a size such as 500K, 100M or 2G") from None
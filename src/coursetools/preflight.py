@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from shutil import disk_usage
+from typing import NamedTuple
+
+from coursetools.config import get_config
+from coursetools.copier import MEGABYTE
+from coursetools.plan import limits_error, plan_template
+from coursetools.templates import bundled_templates, find_template
+
+
+class SpaceCheck(NamedTuple):
+    directory: Path
+    required: int
+    free: int
+
+    @property
+    def ok(self):
+        return self.required <= self.free
+
+    def __str__(self):
+        return (
+            f"{self.required / MEGABYTE:.1f} MB needed, "
+            f"{self.free / MEGABYTE:.1f} MB free in {self.directory}"
+        )
+
+
+class Preflight(NamedTuple):
+    template: str
+    missing: list
+    files: int = 0
+    space: tuple = ()
+    found: bool = True
+    notes: tuple = ()
+    error: str = None
+
+    @property
+    def ok(self):
+        return (
+            self.found
+            and not self.missing
+            and not self.error
+            and all(check.ok for check in self.space)
+        )
+
+    def describe(self):
+        if not self.found:
+            return [f"{self.template} is not a valid template"]
+        lines = [
+            ", ".join([f"{self.template}: {self.files} files", *map(str, self.space)])
+        ]
+        lines += [f"  {key} is neither file or directory" for key in self.missing]
+        lines += [f"  {self.error}"] if self.error else []
+        lines += [f"  {note}" for note in self.notes]
+        lines += [
+            f"  not enough space: {check}" for check in self.space if not check.ok
+        ]
+        return lines
+
+
+def missing_sources(paths, jobs=None):
+    """
+    Checks every training repo path of a template at once and returns the
+    keys that are neither a file nor a directory.
+    """
+    training_repo = get_config("repo_root")
+    keys = list(paths)
+    with ThreadPoolExecutor(max_workers=jobs or min(32, len(keys) or 1)) as executor:
+        found = list(executor.map(lambda key: is_source(f"{training_repo}{key}"), keys))
+    return [key for key, exists in zip(keys, found) if not exists]
+
+
+def is_source(path):
+    return os.path.isdir(path) or os.path.isfile(path)
+
+
+def space_checks(plans, outputs, link_mode="copy", in_place=False):
+    """
+    Returns a SpaceCheck for each filesystem the plans are copied onto.
+
+    Builds are staged beside the course they replace, so every byte is
+    counted unless in_place is set, when only the growth of files already
+    in the destination is. Hard links take no space.
+    """
+    needed = {}
+    for plan, output in zip(plans, outputs):
+        directory = existing_directory(Path(output).resolve())
+        device = os.stat(directory).st_dev
+        required, directory = needed.get(device, (0, directory))
+        if link_mode != "hardlink":
+            required += bytes_needed(plan) if in_place else plan.total_bytes()
+        needed[device] = (required, directory)
+    return [
+        SpaceCheck(directory, required, disk_usage(directory).free)
+        for required, directory in needed.values()
+    ]
+
+
+def existing_directory(path):
+    while not path.is_dir():
+        path = path.parent
+    return path
+
+
+def bytes_needed(plan):
+    total = 0
+    for file_copy in plan.copies.values():
+        try:
+            existing = os.stat(file_copy.destination).st_size
+        except OSError:
+            existing = 0
+        total += max(file_copy.size - existing, 0)
+    return total
+
+
+def preflight_template(name, output=".", link_mode="copy", in_place=False):
+    """
+    Checks that a template's sources exist and that its files fit on the
+    destination, without copying anything. Planning runs quietly, its
+    messages kept with the result so each template's are printed together.
+    """
+    template = find_template(name)
+    if template is None:
+        return Preflight(name, [], found=False)
+    error = limits_error(template)
+    if error:
+        return Preflight(name, [], error=error)
+    missing = missing_sources(template["paths"])
+    if missing:
+        return Preflight(name, missing)
+    notes = []
+    plan = plan_template(name, template, output, report=notes.append)
+    return Preflight(
+        name,
+        missing,
+        len(plan.copies),
+        tuple(space_checks([plan], [output], link_mode, in_place)),
+        notes=tuple(notes),
+    )
+
+
+def preflight_templates(names=None, output=".", link_mode="copy", in_place=False):
+    """
+    Runs preflight_template for each named template, or every template in
+    src/templates, at the same time. Returns True when they all pass.
+    """
+    names = names or bundled_templates()
+    with ThreadPoolExecutor() as executor:
+        results = list(
+            executor.map(
+                lambda name: preflight_template(name, output, link_mode, in_place),
+                names,
+            )
+        )
+    for result in results:
+        for line in result.describe():
+            print(line)
+    failed = [result.template for result in results if not result.ok]
+    print(f"{len(results) - len(failed)} of {len(results)} templates passed preflight")
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+    return not failed
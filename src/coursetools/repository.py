@@ -1,38 +1,460 @@
+import os
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from shutil import copytree, copy, ignore_patterns
+from shutil import copystat
+from typing import NamedTuple
 
-from coursetools.config import get_config
-from coursetools.templates import get_templates, load_template
+# archive, gitinit, manifest and preflight bring in tarfile, zipfile and
+# subprocess, so they are imported by the steps that use them, keeping a
+# plain build's startup quick.
+from coursetools.copier import copy_files
+from coursetools.excludes import ExcludeMatcher, ScanCache
+from coursetools.links import UnsupportedLink, probe_link_mode
+from coursetools.metrics import build_metrics, progress_line, write_metrics
+from coursetools.plan import limits_error, plan_template
+from coursetools.staging import Staging
+from coursetools.sync import is_unchanged, remove_stale
+from coursetools.templates import find_template
 
 
-def make_repo(course_template):
+def make_repo(
+    course_template,
+    dry_run=False,
+    save_plan=None,
+    archive=None,
+    index=None,
+    git_init=False,
+    **options,
+):
     """
     Copies the files defined in the template from the training repo into the current directory.
 
     course_template -- name of the template to run
+    dry_run -- print the plan without copying anything
+    save_plan -- file to write the plan to as JSON, for replaying with run_plan
+    archive -- .tar.gz, .tar or .zip file to stream the course into instead
+    index -- optional FileIndex or GitFiles of the training repo to list files from
+    git_init -- make the course a new git repository, committing the files as
+    they are read
+    options -- passed on to run_plan
     """
     print(f"making a course using the {course_template} template")
-    if course_template not in get_templates():
+    template = find_template(course_template)
+    if template is None:
         print("Not a valid template")
         return
 
-    template = load_template(course_template)
-    exclusion = list(template["excludes"])
-    training_repo = get_config("repo_root")
-
-    for key in template["paths"]:
-        source = Path(f"{training_repo}{key}").resolve()
-        destination = Path(template["paths"][key]).resolve()
-        if source.is_dir():
-            copytree(
-                source,
-                destination,
-                ignore=ignore_patterns(*exclusion),
-                dirs_exist_ok=True,
-            )
-        elif source.is_file():
-            copy(source, destination)
-        else:
-            print(f"{key} is neither file or directory, skipping")
+    if not check_limits(course_template, template):
+        return
+    if not dry_run and not check_sources(course_template, template):
+        return
+    plan = plan_template(course_template, template, index=index)
+    if save_plan:
+        plan.save(save_plan)
+    if dry_run:
+        for line in plan.describe():
+            print(line)
+    elif archive:
+        from coursetools.archive import write_archive
+
+        if check_collisions([plan]):
+            stats = write_archive(plan, archive, jobs=options.get("jobs"))
+            print(f"wrote {archive}: {stats}")
+    elif not check_space(
+        [plan], ["."], options.get("link_mode", "copy"), options.get("sync", False)
+    ):
+        return
+    elif git_init:
+        if check_collisions([plan]):
+            commit_plan(plan, ".")
+    else:
+        run_plan(plan, roots=["."], index=index, **options)
 
     return
+
+
+def make_repos(builds, dry_run=False, index=None, git_init=False, **options):
+    """
+    Builds several templates in one run, each into its own output directory.
+
+    Directories shared by the templates are listed once, and files shared by
+    them are read once and copied by a single worker pool.
+
+    builds -- list of (template name, output directory) pairs
+    dry_run -- print the plans without copying anything
+    index -- optional FileIndex or GitFiles of the training repo to list files from
+    git_init -- make each course a new git repository, see make_repo
+    options -- passed on to run_plans
+    """
+    plans = plan_builds(builds, index, check=not dry_run)
+    if plans is None:
+        return
+    outputs = [output for _, output in builds]
+    if dry_run:
+        for plan in plans:
+            for line in plan.describe():
+                print(line)
+    elif not check_space(
+        plans, outputs, options.get("link_mode", "copy"), options.get("sync", False)
+    ):
+        return
+    elif git_init:
+        if check_collisions(plans):
+            for (_, output), plan in zip(builds, plans):
+                commit_plan(plan, output)
+    else:
+        run_plans(plans, roots=outputs, index=index, **options)
+
+
+def commit_plan(plan, root):
+    from coursetools.gitinit import GitInitError, init_repository
+
+    try:
+        stats = init_repository(plan, root)
+    except GitInitError as error:
+        print(error)
+        return
+    print(f"committed {plan.template} to a new git repository: {stats}")
+
+
+def plan_builds(builds, index=None, check=True):
+    scan_cache = ScanCache()
+    plans = []
+    for course_template, output in builds:
+        print(f"making a course using the {course_template} template in {output}")
+        template = find_template(course_template)
+        if template is None:
+            print(f"{course_template} is not a valid template")
+            return None
+        if not check_limits(course_template, template):
+            return None
+        if check and not check_sources(course_template, template):
+            return None
+        plans.append(
+            plan_template(course_template, template, output, scan_cache, index)
+        )
+    return plans
+
+
+def run_plan(plan, **options):
+    """
+    Carries out a CopyPlan, see run_plans for the options.
+    """
+    return run_plans([plan], **options)
+
+
+def run_plans(
+    plans,
+    jobs=None,
+    sync=False,
+    checksum=False,
+    delete=False,
+    link_mode="copy",
+    metrics_json=None,
+    buffer_size=None,
+    manifest=None,
+    roots=None,
+    resume=False,
+    index=None,
+):
+    """
+    Carries out CopyPlans through one shared pool of workers.
+
+    jobs -- number of files to copy concurrently, None for the default
+    sync -- only copy files that are missing or changed in the destination
+    checksum -- with sync, compare file contents rather than size and mtime
+    delete -- remove destination files that no longer have a source
+    link_mode -- how file contents are placed, one of coursetools.links.LINK_MODES
+    metrics_json -- file to write the run's metrics to, see build_metrics
+    buffer_size -- bytes per chunk when copying large files, None for the default
+    manifest -- file to write the path, size and BLAKE2 hash of every copied
+    file to, relative to the current directory, see write_manifest
+    roots -- directories the courses are built in; unless syncing, files are
+    copied into a Staging directory inside each and moved into place when done
+    resume -- with roots, keep the files an interrupted build already copied
+    index -- optional FileIndex whose recorded digests stand in for hashing
+    sources with checksum
+
+    Destinations written more than once are reported before anything is
+    copied, and nothing is copied if a file would replace a directory.
+    """
+    if not check_collisions(plans):
+        return None
+    copies = merge_copies(plans)
+    if not check_link_mode(link_mode, copies):
+        return None
+    if manifest and not check_manifest_paths(copies):
+        return None
+    build = prepare_build(plans, copies, None if sync else roots, resume)
+    if delete:
+        remove_stale_entries(plans, copies)
+    if sync:
+        skip = sync_check(copies, checksum, index)
+    else:
+        skip = build.is_done if build.stagings and resume else None
+    stats = copy_build(build, jobs, skip, link_mode, buffer_size)
+    report_build(plans, stats, link_mode, metrics_json)
+    if manifest:
+        write_build_manifest(manifest, copies, jobs)
+    return stats
+
+
+class Build(NamedTuple):
+    """
+    Where a run copies its files: into the courses, or into the Staging
+    directory of each course when there are some.
+
+    targets -- the FileCopy operations keyed on the destination they write
+    owners -- the Staging each staged destination belongs to
+    """
+
+    targets: dict
+    directories: list
+    stagings: list
+    owners: dict
+
+    def is_done(self, file_copy):
+        return self.owners[file_copy.destination].is_done(file_copy)
+
+
+def prepare_build(plans, copies, roots=None, resume=False):
+    directories = [directory for plan in plans for directory in plan.directories]
+    stagings = open_stagings(roots, copies, directories, resume) if roots else []
+    owners = {}
+    if stagings:
+        copies, directories, owners = stage(stagings, copies, directories)
+    make_directories(directories)
+    return Build(copies, directories, stagings, owners)
+
+
+def remove_stale_entries(plans, copies):
+    removed = sum(
+        remove_stale(plan.directories, copies, ExcludeMatcher(plan.excludes))
+        for plan in plans
+    )
+    print(f"removed {removed} stale entries")
+
+
+def sync_check(copies, checksum=False, index=None):
+    sources = {file_copy.source for file_copy in copies.values()}
+    digests = index.digests(sources) if checksum and index else None
+    return partial(is_unchanged, checksum=checksum, digests=digests)
+
+
+def copy_build(build, jobs, skip, link_mode, buffer_size):
+    progress = progress_line(len(build.targets))
+    copied = partial(record_copied, build, progress)
+    try:
+        stats = copy_files(
+            build.targets.values(), jobs, skip, link_mode, copied, buffer_size
+        )
+    finally:
+        for staging in build.stagings:
+            staging.close()
+    if progress:
+        progress.close()
+    copy_directory_stats(build.directories)
+    for staging in build.stagings:
+        staging.swap_in()
+    return stats
+
+
+def record_copied(build, progress, results):
+    if progress:
+        progress(results)
+    if build.stagings:
+        record_staged(build, results)
+
+
+def record_staged(build, results):
+    finished = {}
+    for result in results:
+        if result is not None:
+            owner = build.owners[Path(result.destination)]
+            finished.setdefault(owner, []).append(result)
+    for staging, staged in finished.items():
+        staging.record(build.targets, staged)
+
+
+def report_build(plans, stats, link_mode, metrics_json=None):
+    if link_mode != "copy":
+        for line in stats.strategy_report():
+            print(line)
+    print(stats)
+    if metrics_json:
+        write_metrics(metrics_json, build_metrics(plans, stats))
+
+
+def write_build_manifest(manifest, copies, jobs=None):
+    from coursetools.manifest import write_manifest
+
+    stats = write_manifest(manifest, copies.values(), jobs=jobs)
+    print(f"wrote {manifest}: {stats}")
+
+
+def open_stagings(roots, copies, directories, resume=False):
+    """
+    Starts a Staging directory inside each root, so every course is staged on
+    its own filesystem, or returns an empty list to copy in place when a
+    destination is outside all of them.
+    """
+    stagings = list({staging.root: staging for staging in map(Staging, roots)}.values())
+    destinations = chain(copies, (directory.destination for directory in directories))
+    outside = next(
+        (path for path in destinations if owning_staging(stagings, path) is None), None
+    )
+    if outside:
+        ignored = ", ignoring --resume" if resume else ""
+        names = ", ".join(str(staging.root) for staging in stagings)
+        print(f"{outside} is outside {names}, copying in place{ignored}")
+        return []
+    for staging in stagings:
+        staging.start(resume)
+    return stagings
+
+
+def owning_staging(stagings, path):
+    """
+    The Staging of the innermost root holding path, None when there is none.
+    """
+    covering = [staging for staging in stagings if staging.covers(path)]
+    return max(covering, key=lambda staging: len(staging.root.parts), default=None)
+
+
+def stage(stagings, copies, directories):
+    targets = {}
+    owners = {}
+    for file_copy in copies.values():
+        staging = owning_staging(stagings, file_copy.destination)
+        staged = staging.staged(file_copy.destination)
+        targets[staged] = file_copy._replace(destination=staged)
+        owners[staged] = staging
+    staged_directories = [
+        directory._replace(
+            destination=owning_staging(stagings, directory.destination).staged(
+                directory.destination
+            )
+        )
+        for directory in directories
+    ]
+    return targets, staged_directories, owners
+
+
+def check_collisions(plans):
+    for plan in plans:
+        for line in plan.collisions():
+            print(line)
+    if any(plan.clashes() for plan in plans):
+        print("files and directories collide, not copying anything")
+        return False
+    return True
+
+
+def check_link_mode(link_mode, copies):
+    if not copies:
+        return True
+    try:
+        probe_link_mode(link_mode, next(iter(copies.values())))
+    except UnsupportedLink as error:
+        print(f"{error}, not copying anything")
+        return False
+    return True
+
+
+def check_manifest_paths(copies):
+    outside = next((path for path in copies if is_outside(path, ".")), None)
+    if outside:
+        print(
+            f"{outside} is outside the current directory, which manifest paths "
+            "are relative to, not copying anything"
+        )
+        return False
+    return True
+
+
+def is_outside(path, root):
+    relative = os.path.relpath(path, root)
+    return relative == ".." or relative.startswith(f"..{os.sep}")
+
+
+def check_limits(name, template):
+    error = limits_error(template)
+    if error:
+        print(f"{error} of {name}, not copying anything")
+    return error is None
+
+
+def check_sources(name, template):
+    """
+    Checks every source path of the template before anything is planned or
+    copied, so a missing one stops the run instead of leaving a partial course.
+    """
+    from coursetools.preflight import missing_sources
+
+    missing = missing_sources(template["paths"])
+    for key in missing:
+        print(f"{key} is neither file or directory")
+    if missing:
+        print(f"{name} has missing paths, not copying anything")
+    return not missing
+
+
+def check_plan_sources(plan):
+    """
+    Checks that every source of a saved plan is still in the training repo, so
+    replaying it after the repo changed stops instead of leaving a partial
+    course.
+    """
+    missing = [
+        file_copy.source
+        for file_copy in plan.copies.values()
+        if not os.path.isfile(file_copy.source)
+    ]
+    missing += [
+        directory.source
+        for directory in plan.directories
+        if not os.path.isdir(directory.source)
+    ]
+    for source in missing:
+        print(f"{source} is no longer in the training repo")
+    if missing:
+        print(f"the {plan.template} plan has missing sources, not copying anything")
+    return not missing
+
+
+def check_space(plans, outputs, link_mode="copy", in_place=False):
+    from coursetools.preflight import space_checks
+
+    checks = space_checks(plans, outputs, link_mode, in_place)
+    for check in checks:
+        if not check.ok:
+            print(f"not enough space: {check}")
+    if not all(check.ok for check in checks):
+        print("not enough free space, not copying anything")
+        return False
+    return True
+
+
+def merge_copies(plans):
+    copies = {}
+    for plan in plans:
+        for destination, file_copy in plan.copies.items():
+            previous = copies.get(destination)
+            if previous and previous.source != file_copy.source:
+                print(
+                    f"{destination} is written by more than one template, "
+                    f"using {plan.template}"
+                )
+            copies[destination] = file_copy
+    return copies
+
+
+def make_directories(directories):
+    for directory in directories:
+        directory.destination.mkdir(parents=True, exist_ok=True)
+
+
+def copy_directory_stats(directories):
+    for directory in reversed(directories):
+        copystat(directory.source, directory.destination)
@@ -0,0 +1,150 @@
+import json
+import os
+from pathlib import Path
+from shutil import copystat, rmtree
+
+STAGING_NAME = ".coursetools-staging"
+JOURNAL_NAME = ".coursetools-journal"
+SWAPPING_NAME = ".coursetools-swapping"
+
+
+class Staging:
+    """
+    A build copied into a directory beside the course and moved into place
+    once every file is there, so an interrupted run never leaves a half
+    copied course behind.
+
+    Staged files and directories are renamed into the course, merging with
+    the directories already there, so nothing the build didn't copy is
+    touched. Copied files are written to a journal as they finish, so a
+    resumed build only copies those that are missing or whose source has
+    changed since.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self.directory = self.root / STAGING_NAME
+        self.journal_path = self.directory / JOURNAL_NAME
+        self.journal = None
+        self.done = {}
+
+    def covers(self, path):
+        relative = os.path.relpath(path, self.root)
+        return relative != ".." and not relative.startswith(f"..{os.sep}")
+
+    def staged(self, path):
+        return self.directory / os.path.relpath(path, self.root)
+
+    def start(self, resume=False):
+        """
+        Prepares the staging directory, keeping what an interrupted build
+        copied when resuming and discarding it otherwise. A build interrupted
+        while moving into place is finished first.
+        """
+        if (self.directory / SWAPPING_NAME).exists():
+            print(f"finishing moving an interrupted build into {self.root}")
+            self.swap_in()
+        if resume:
+            self.done = load_journal(self.journal_path)
+            print(
+                f"resuming an interrupted build, {len(self.done)} files already copied"
+            )
+        elif self.directory.exists():
+            print(
+                f"discarding an interrupted build in {self.directory}, "
+                "use --resume to continue it"
+            )
+            rmtree(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.journal = open(self.journal_path, "a")
+
+    def is_done(self, file_copy):
+        """
+        True when the journal shows the file was copied from the source as it
+        is now.
+        """
+        entry = self.done.get(self.relative(file_copy.destination))
+        if entry is None:
+            return False
+        try:
+            source = os.stat(file_copy.source)
+            destination = os.stat(file_copy.destination)
+        except OSError:
+            return False
+        return (
+            entry == [source.st_size, source.st_mtime_ns]
+            and destination.st_size == source.st_size
+        )
+
+    def record(self, copies, results):
+        """
+        Writes the files of a finished group of copies to the journal.
+
+        copies -- the staged FileCopy operations keyed on their destination
+        """
+        for result in results:
+            if result is None:
+                continue
+            source = os.stat(copies[Path(result.destination)].source)
+            entry = [
+                self.relative(result.destination),
+                source.st_size,
+                source.st_mtime_ns,
+            ]
+            self.journal.write(json.dumps(entry) + "\n")
+        self.journal.flush()
+
+    def relative(self, path):
+        return os.path.relpath(path, self.directory).replace(os.sep, "/")
+
+    def close(self):
+        if self.journal:
+            os.fsync(self.journal.fileno())
+            self.journal.close()
+            self.journal = None
+
+    def swap_in(self):
+        """
+        Renames every staged entry into the course and removes the staging
+        directory. A marker is written first, so a move that is interrupted
+        is finished by the next start.
+        """
+        self.close()
+        (self.directory / SWAPPING_NAME).touch()
+        move_into(self.directory, self.root, skip={JOURNAL_NAME, SWAPPING_NAME})
+        rmtree(self.directory)
+
+
+def load_journal(path):
+    done = {}
+    try:
+        with open(path) as file:
+            for line in file:
+                try:
+                    relative, size, mtime = json.loads(line)
+                except ValueError:
+                    continue
+                done[relative] = [size, mtime]
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def is_directory(path):
+    return os.path.isdir(path) and not os.path.islink(path)
+
+
+def move_into(source, target, skip=()):
+    """
+    Renames the entries of source into target, descending into directories
+    target already has rather than replacing them.
+    """
+    for entry in os.scandir(source):
+        if entry.name in skip:
+            continue
+        destination = os.path.join(target, entry.name)
+        if entry.is_dir(follow_symlinks=False) and is_directory(destination):
+            move_into(entry.path, destination)
+            copystat(entry.path, destination)
+        else:
+            os.replace(entry.path, destination)
@@ -0,0 +1,80 @@
+import hashlib
+import os
+from pathlib import Path
+from shutil import rmtree
+
+from coursetools.staging import STAGING_NAME
+
+PROTECTED_NAMES = {".git", STAGING_NAME}
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_unchanged(file_copy, checksum=False, digests=None):
+    """
+    True when the destination already holds the source file.
+
+    Files match on size and on the destination being at least as new as the
+    source, or on content when checksum is set.
+
+    digests -- optional {source: digest} used instead of hashing those sources
+    """
+    try:
+        destination = os.stat(file_copy.destination)
+    except FileNotFoundError:
+        return False
+    source = os.stat(file_copy.source)
+    if source.st_size != destination.st_size:
+        return False
+    if checksum:
+        expected = source_digest(file_copy.source, digests)
+        return expected == file_digest(file_copy.destination)
+    return int(destination.st_mtime) >= int(source.st_mtime)
+
+
+def source_digest(path, digests=None):
+    digest = digests.get(path) if digests else None
+    return digest or file_digest(path)
+
+
+def file_digest(path):
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remove_stale(directories, targets, matcher):
+    """
+    Removes entries in the destination directories that no source maps to.
+
+    Excluded paths and .git are left alone, as are directories still needed
+    by a target.
+    """
+    keep = {Path(directory.destination) for directory in directories}
+    keep.update(Path(target) for target in targets)
+    keep.update(parent for target in targets for parent in Path(target).parents)
+    removed = 0
+    for directory in directories:
+        for entry in stale_entries(directory, keep, matcher):
+            remove_entry(entry)
+            removed += 1
+    return removed
+
+
+def stale_entries(directory, keep, matcher):
+    with os.scandir(directory.destination) as entries:
+        return [
+            Path(entry.path)
+            for entry in entries
+            if entry.name not in PROTECTED_NAMES
+            and Path(entry.path) not in keep
+            and not matcher.excludes(directory.relative + entry.name, entry.is_dir())
+        ]
+
+
+def remove_entry(path):
+    if path.is_dir() and not path.is_symlink():
+        rmtree(path)
+    else:
+        path.unlink()
@@ -1,27 +1,107 @@
-import configparser
-import glob
 import os
 from pathlib import Path
 
 template_dir = (Path(__file__).absolute().parent / ".." / "templates").resolve()
+registry = None
+
+
+class TemplateRegistry:
+    """
+    Finds templates across search paths on first use and parses each one once,
+    re-parsing only when its file's mtime changes.
+
+    Earlier search paths take precedence over later ones for the same name.
+    """
+
+    def __init__(self, search_paths):
+        self.search_paths = [Path(path) for path in search_paths]
+        self._files = None
+        self._parsed = {}
+
+    def files(self):
+        if self._files is None:
+            self._files = find_template_files(self.search_paths)
+        return self._files
+
+    def names(self):
+        return sorted(self.files())
+
+    def __contains__(self, name):
+        return name in self.files()
+
+    def load(self, name):
+        path = self.files()[name]
+        mtime = path.stat().st_mtime_ns
+        cached = self._parsed.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        config = parse_template(path)
+        self._parsed[name] = (mtime, config)
+        return config
+
+    def find(self, name):
+        return self.load(name) if name in self else None
+
+
+def find_template_files(search_paths):
+    files = {}
+    for directory in reversed(search_paths):
+        files.update(
+            (Path(file).stem, Path(file)) for file in template_files(directory)
+        )
+    return files
+
+
+def template_files(directory):
+    if not Path(directory).is_dir():
+        return []
+    with os.scandir(directory) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.endswith(".ini") and entry.is_file()
+        ]
+
+
+def parse_template(path):
+    import configparser
+
+    config = configparser.ConfigParser()
+    config.read(path)
+    return config
 
 
 def load_templates(template_directory):
-    path = template_directory / "*.ini"
-    return [os.path.splitext(Path(file).name)[0] for file in glob.glob(str(path))]
+    return [Path(file).stem for file in template_files(template_directory)]
+
 
+def bundled_templates():
+    return sorted(load_templates(template_dir))
 
-templates = load_templates(template_dir)
+
+def search_paths():
+    extra = os.environ.get("COURSETOOLS_TEMPLATE_PATH", "")
+    user_dir = Path.home() / ".coursetools" / "templates"
+    return [Path(path) for path in extra.split(os.pathsep) if path] + [
+        user_dir,
+        template_dir,
+    ]
+
+
+def get_registry():
+    global registry
+    if registry is None:
+        registry = TemplateRegistry(search_paths())
+    return registry
 
 
 def get_templates():
-    return templates
+    return get_registry().names()
 
 
 def load_template(template_file):
-    config = configparser.ConfigParser()
-    template_file = template_dir / f"{template_file}.ini"
-    print(template_file)
+    return get_registry().load(template_file)
 
-    config.read(template_file)
-    return config
+
+def find_template(template_file):
+    return get_registry().find(template_file)
@@ -0,0 +1,470 @@
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from shutil import copy2
+from typing import NamedTuple
+
+from coursetools.config import get_config
+from coursetools.copier import DirectoryCopy, FileCopy
+from coursetools.excludes import ExcludeMatcher, scan_directory, walk
+from coursetools.plan import (
+    CopyPlan,
+    copy_roots,
+    excluded_within,
+    file_limit,
+    is_inside,
+    limits_error,
+    plan_directory,
+    plan_file,
+    walked_entries,
+    within_limit,
+)
+from coursetools.repository import make_repo, run_plan
+from coursetools.sync import PROTECTED_NAMES, remove_entry
+from coursetools.templates import find_template
+
+# A batch is synced once no change has been seen for DEBOUNCE seconds, or
+# MAX_DELAY seconds after its first change when changes keep coming.
+DEBOUNCE = 0.05
+MAX_DELAY = 1.0
+POLL_INTERVAL = 0.25
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+)
+ADDED = IN_CREATE | IN_MOVED_TO
+REMOVED = IN_DELETE | IN_MOVED_FROM
+EVENT = struct.Struct("iIII")
+
+
+class PrefixedMatcher(NamedTuple):
+    """
+    Matches paths walked from inside a template path as if walked from its root.
+    """
+
+    matcher: ExcludeMatcher
+    prefix: str
+
+    def match(self, relative_path, is_dir=False):
+        return self.matcher.match(self.prefix + relative_path, is_dir)
+
+
+class WatchedCourse:
+    """
+    The template paths being watched, and where a changed training repo path
+    lands in the course.
+    """
+
+    def __init__(self, name, template, output="."):
+        self.name = name
+        self.excludes = list(template["excludes"])
+        self.matcher = ExcludeMatcher(self.excludes)
+        self.limit = file_limit(template)
+        self.roots, _ = copy_roots(
+            get_config("repo_root"), template["paths"], output, self.matcher
+        )
+        self.directory_roots = [root for root in self.roots if root.source.is_dir()]
+        self.file_roots = [root for root in self.roots if root.source.is_file()]
+
+    def targets(self, path, is_dir):
+        """
+        Returns (root, relative path) for every template path that copies
+        path and does not exclude it. is_dir is None for a path that is gone,
+        which is left out if it would be excluded as either a file or a
+        directory.
+        """
+        found = [(root, "") for root in self.file_roots if root.source == path]
+        for root in self.directory_roots:
+            if path == root.source:
+                found.append((root, ""))
+            elif is_inside(path, root.source):
+                relative = path.relative_to(root.source).as_posix()
+                kinds = [False, True] if is_dir is None else [is_dir]
+                if not any(
+                    excluded_within(relative, kind, self.matcher) for kind in kinds
+                ):
+                    found.append((root, relative))
+        return found
+
+    def watched_directories(self):
+        """
+        The directories whose entries can change what is copied: every
+        directory root with its subdirectories, and the directory of each
+        file root.
+        """
+        for root in self.directory_roots:
+            yield root.source
+            for relative, entry, is_dir in walk(root.source, self.matcher):
+                if is_dir:
+                    yield Path(entry.path)
+        for root in self.file_roots:
+            yield root.source.parent
+
+    def snapshot(self):
+        """
+        Returns {path: (is_dir, size, mtime)} for everything watched. Only
+        the presence of directories is recorded, since their mtime changes
+        with every entry added to them.
+        """
+        state = {}
+        for root in self.directory_roots:
+            state[root.source] = (True, 0, 0)
+            for relative, entry, is_dir in walk(root.source, self.matcher):
+                state[Path(entry.path)] = (
+                    (True, 0, 0) if is_dir else stat_key(entry.stat())
+                )
+        for root in self.file_roots:
+            try:
+                state[root.source] = stat_key(root.source.stat())
+            except FileNotFoundError:
+                pass
+        return state
+
+    def plan_changes(self, paths):
+        """
+        Returns a CopyPlan of the files and directories to copy for a batch
+        of changed paths, and the course paths whose source is gone.
+        """
+        plan = CopyPlan(self.name, self.excludes)
+        removed = []
+        for path in sorted(paths):
+            is_dir = path.is_dir() if path.exists() else None
+            for root, relative in self.targets(path, is_dir):
+                if is_dir is None:
+                    removed.extend(self.removed_target(root, relative))
+                elif root in self.file_roots:
+                    plan_file(
+                        plan, root.key, path, root.destination, self.matcher, self.limit
+                    )
+                elif is_dir:
+                    entries = walked_entries(
+                        path,
+                        PrefixedMatcher(self.matcher, prefix(relative)),
+                        plan.excluded,
+                    )
+                    plan_directory(
+                        plan,
+                        root.key,
+                        path,
+                        root.destination / relative,
+                        entries,
+                        self.limit,
+                    )
+                else:
+                    self.plan_changed_file(plan, root, path, relative)
+        return plan, removed
+
+    def removed_target(self, root, relative):
+        if root in self.file_roots:
+            into_directory = root.destination.is_dir()
+            return [
+                (
+                    root.destination / root.source.name
+                    if into_directory
+                    else root.destination
+                )
+            ]
+        return [root.destination / relative] if relative else []
+
+    def plan_changed_file(self, plan, root, path, relative):
+        target = root.destination / relative
+        parent = Path(relative).parent.as_posix()
+        plan.add_directory(DirectoryCopy(path.parent, target.parent, prefix(parent)))
+        size = path.stat().st_size
+        if within_limit(plan, path, size, self.limit):
+            plan.add_file(FileCopy(path, target, copy2, root.key, size))
+
+
+class InotifyWatcher:
+    """
+    Reports changed paths with Linux inotify, adding a watch for each new
+    directory as it appears. A new directory is reported itself, so files
+    written to it before its watch was added are still copied.
+    """
+
+    def __init__(self, course, libc):
+        self.course = course
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise last_error("inotify_init1")
+        self.directories = {}
+        try:
+            for directory in course.watched_directories():
+                self.add_watch(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, directory):
+        descriptor = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), WATCH_MASK
+        )
+        if descriptor < 0:
+            raise last_error(f"inotify_add_watch {directory}")
+        self.directories[descriptor] = directory
+
+    def watch_tree(self, directory):
+        pending = [directory]
+        while pending:
+            directory = pending.pop()
+            if not self.course.targets(directory, True):
+                continue
+            try:
+                self.add_watch(directory)
+                pending.extend(
+                    Path(entry.path)
+                    for entry in scan_directory(directory)
+                    if entry.is_dir()
+                )
+            except OSError:
+                continue
+
+    def forget(self, directory):
+        for descriptor, path in list(self.directories.items()):
+            if path == directory or is_inside(path, directory):
+                self.libc.inotify_rm_watch(self.fd, descriptor)
+                del self.directories[descriptor]
+
+    def read(self, timeout):
+        """
+        Waits up to timeout seconds for changes and returns the set of
+        changed paths, empty if there were none.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        for descriptor, mask, name in read_events(self.fd):
+            if mask & IN_Q_OVERFLOW:
+                changed.update(root.source for root in self.course.roots)
+            elif mask & IN_IGNORED:
+                self.directories.pop(descriptor, None)
+            elif descriptor in self.directories and name:
+                path = self.directories[descriptor] / name
+                if mask & IN_ISDIR:
+                    if not mask & (ADDED | REMOVED):
+                        continue
+                    if mask & REMOVED:
+                        self.forget(path)
+                    else:
+                        self.watch_tree(path)
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Reports changed paths by comparing snapshots of the template paths every
+    interval seconds, for platforms without inotify.
+    """
+
+    def __init__(
+        self, course, interval=POLL_INTERVAL, clock=time.perf_counter, sleep=time.sleep
+    ):
+        self.course = course
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self.state = course.snapshot()
+        self.next_poll = clock() + interval
+
+    def read(self, timeout):
+        wait = self.next_poll - self.clock()
+        if wait > timeout:
+            self.sleep(timeout)
+            return set()
+        self.sleep(max(wait, 0))
+        self.next_poll = self.clock() + self.interval
+        state = self.course.snapshot()
+        changed = {
+            path
+            for path in state.keys() | self.state.keys()
+            if state.get(path) != self.state.get(path)
+        }
+        self.state = state
+        return changed
+
+    def close(self):
+        pass
+
+
+def read_events(fd):
+    data = os.read(fd, 64 * 1024)
+    offset = 0
+    while offset < len(data):
+        descriptor, mask, _, length = EVENT.unpack_from(data, offset)
+        start = offset + EVENT.size
+        name = data[start : start + length].rstrip(b"\0")
+        offset = start + length
+        yield descriptor, mask, os.fsdecode(name)
+
+
+def load_inotify():
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1
+    except (ImportError, OSError, TypeError, AttributeError):
+        return None
+    return libc
+
+
+def last_error(call):
+    import ctypes
+
+    number = ctypes.get_errno()
+    return OSError(number, f"{call}: {os.strerror(number)}")
+
+
+def open_watcher(course, poll=False):
+    libc = None if poll else load_inotify()
+    if libc is not None:
+        try:
+            return InotifyWatcher(course, libc)
+        except OSError as error:
+            print(f"can't watch with inotify ({error}), polling instead")
+    return PollingWatcher(course)
+
+
+def stat_key(stat):
+    return (False, stat.st_size, stat.st_mtime_ns)
+
+
+def prefix(relative):
+    return "" if relative in ("", ".") else f"{relative}/"
+
+
+def wait_for_changes(watcher, stop=None, debounce=DEBOUNCE, max_delay=MAX_DELAY):
+    """
+    Blocks until a batch of changes has settled and returns the changed paths
+    with the time the first of them was seen, or None once stop is set.
+    """
+    changed = set()
+    while not changed:
+        if stop is not None and stop.is_set():
+            return None
+        changed = watcher.read(0.2)
+    first = time.perf_counter()
+    while time.perf_counter() - first < max_delay:
+        more = watcher.read(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed, first
+
+
+def update_course(course, paths, first, **options):
+    """
+    Copies a batch of changes and reports how long it took since the first
+    was seen. A file renamed or removed while it is copied, as editors and
+    git checkout do, fails the batch, whose paths are returned to be tried
+    again with the next one.
+    """
+    try:
+        copied, removed = sync_changes(course, paths, **options)
+    except OSError as error:
+        print(
+            f"couldn't update the course ({error}), trying again with the next change"
+        )
+        return paths
+    milliseconds = (time.perf_counter() - first) * 1000
+    print(f"updated {copied} files and removed {removed} in {milliseconds:.0f}ms")
+    return set()
+
+
+def sync_changes(course, paths, **options):
+    """
+    Copies the files of a batch of changed paths and removes course entries
+    whose source is gone. Returns the number of files copied and removed.
+    """
+    plan, removed = course.plan_changes(paths)
+    stats = run_plan(plan, **options) if plan.copies or plan.directories else None
+    gone = [path for path in removed if is_removable(path)]
+    for path in gone:
+        remove_entry(path)
+    return (stats.files if stats else 0), len(gone)
+
+
+def is_removable(path):
+    return os.path.lexists(path) and not PROTECTED_NAMES.intersection(path.parts)
+
+
+def watch_repo(
+    course_template,
+    poll=False,
+    stop=None,
+    debounce=DEBOUNCE,
+    index=None,
+    jobs=None,
+    link_mode="copy",
+    buffer_size=None,
+    **options,
+):
+    """
+    Builds the course, then keeps it in step with the training repo, copying
+    only the files that change until interrupted.
+
+    poll -- compare snapshots instead of using inotify
+    stop -- optional threading.Event that ends the watch when set
+    debounce -- seconds without changes before a batch is copied
+    index, jobs, link_mode, buffer_size, options -- passed on to make_repo;
+    only jobs, link_mode and buffer_size apply to the batches that follow
+    """
+    make_repo(
+        course_template,
+        index=index,
+        jobs=jobs,
+        link_mode=link_mode,
+        buffer_size=buffer_size,
+        **options,
+    )
+    template = find_template(course_template)
+    if template is None or limits_error(template):
+        return
+    course = WatchedCourse(course_template, template)
+    watcher = open_watcher(course, poll)
+    print(f"watching {len(course.roots)} template paths, press Ctrl-C to stop")
+    retry = set()
+    try:
+        while True:
+            batch = wait_for_changes(watcher, stop, debounce)
+            if batch is None:
+                break
+            paths, first = batch
+            retry = update_course(
+                course,
+                paths | retry,
+                first,
+                jobs=jobs,
+                link_mode=link_mode,
+                buffer_size=buffer_size,
+            )
+    except KeyboardInterrupt:
+        print("stopped watching")
+    finally:
+        watcher.close()
@@ -0,0 +1,88 @@
+"""Build one template into the current directory and print measurements as JSON.
+
+The build goes through the same checks, staging and swap as makerepo, with
+its own output sent to stderr, and is timed against copying the same files
+one at a time with shutil.copy2 in the same run. Run in a fresh process so peak RSS belongs to
+the build alone:
+
+    python -m tests.benchmarks.measure REPO_ROOT TEMPLATE_FILE [JOBS]
+"""
+import configparser
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import coursetools.config as config_module
+from coursetools.plan import plan_template
+from coursetools.repository import check_sources, check_space, run_plan
+from coursetools.templates import parse_template
+
+
+def timed(phases, name, action):
+    start_time, start_usage = time.perf_counter(), resource.getrusage(resource.RUSAGE_SELF)
+    result = action()
+    end_usage = resource.getrusage(resource.RUSAGE_SELF)
+    phases[name] = {
+        "seconds": time.perf_counter() - start_time,
+        "system_seconds": end_usage.ru_stime - start_usage.ru_stime,
+        "user_seconds": end_usage.ru_utime - start_usage.ru_utime,
+    }
+    return result
+
+
+def peak_rss_mb():
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reference_copy(plan):
+    """Copy the planned files one at a time with shutil.copy2 into a scratch
+    directory beside the output, the plainest way to make the same course.
+    Returns the seconds taken."""
+    with tempfile.TemporaryDirectory(dir="..") as scratch:
+        start = time.perf_counter()
+        for file_copy in plan.files:
+            destination = os.path.join(scratch, os.path.relpath(file_copy.destination))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(file_copy.source, destination)
+        return time.perf_counter() - start
+
+
+def measure(repo_root, template_file, jobs=None):
+    config = configparser.ConfigParser()
+    config["config"] = {"repo_root": repo_root}
+    config_module.CONFIG = config
+    template = parse_template(template_file)
+    phases = {}
+
+    with redirect_stdout(sys.stderr):
+        timed(phases, "preflight", lambda: check_sources("benchmark", template))
+        plan = timed(phases, "scan", lambda: plan_template("benchmark", template))
+        timed(phases, "space", lambda: check_space([plan], ["."]))
+        # Flush before each copy so neither is timed writing back the other's pages
+        os.sync()
+        reference = reference_copy(plan)
+        os.sync()
+        stats = timed(phases, "build", lambda: run_plan(plan, roots=["."], jobs=jobs))
+
+    total = sum(phase["seconds"] for phase in phases.values())
+    return {
+        "files": stats.files,
+        "bytes": stats.size,
+        "files_per_sec": stats.files / total,
+        "reference_files_per_sec": stats.files / reference,
+        "mb_per_sec": stats.size / (1024 * 1024) / total,
+        "peak_rss_mb": peak_rss_mb(),
+        "phases": phases,
+    }
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    print(json.dumps(measure(sys.argv[1], sys.argv[2], jobs)))
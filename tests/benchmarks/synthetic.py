@@ -0,0 +1,57 @@
+import random
+from pathlib import Path
+
+# (size in bytes, weight): mostly small source files, a few large assets
+SIZE_DISTRIBUTION = [(300, 60), (4 * 1024, 30), (64 * 1024, 9), (1024 * 1024, 1)]
+IGNORED_DIRECTORIES = ["node_modules", ".venv"]
+
+
+def generate_training_repo(root, template, files_per_path=200, depth=3, ignored_files=1000,
+                           sizes=SIZE_DISTRIBUTION, seed=0):
+    """Create a synthetic training repo with a tree for every [paths] entry of a template.
+
+    Args:
+        root: Directory to create the training repo in
+        template: A parsed template, only its [paths] keys are used
+        files_per_path: Number of files to create under each directory path
+        depth: How many directory levels each tree spreads its files across
+        ignored_files: Files to put in each node_modules and .venv directory
+        sizes: List of (size, weight) pairs files sizes are drawn from
+        seed: Seed for the random size choices
+
+    Returns:
+        Total number of bytes in files the template copies
+    """
+    chooser = random.Random(seed)
+    size_choices, weights = zip(*sizes)
+    total = 0
+    for key in template["paths"]:
+        path = Path(root) / key.lstrip("/")
+        if is_file_path(key):
+            total += write_file(path, chooser.choices(size_choices, weights)[0])
+            continue
+        for number in range(files_per_path):
+            directory = path.joinpath(*(f"level{level}-{number % (level + 2)}" for level in range(number % (depth + 1))))
+            total += write_file(directory / f"file{number}.txt", chooser.choices(size_choices, weights)[0])
+        for ignored in IGNORED_DIRECTORIES:
+            write_ignored_tree(path / ignored, ignored_files)
+    return total
+
+
+def is_file_path(key):
+    # Dotfiles such as /.gitignore have no suffix but are files all the same
+    name = Path(key).name
+    return bool(Path(key).suffix) or name.startswith(".")
+
+
+def write_file(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return size
+
+
+def write_ignored_tree(path, files):
+    for number in range(files):
+        package = path / f"package{number % 50}" / "lib"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"module{number}.js").write_bytes(b"")
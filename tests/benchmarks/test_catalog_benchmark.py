@@ -0,0 +1,94 @@
+import os
+import random
+import time
+import tracemalloc
+
+import pytest
+
+from codebase.catalog import ProjectCatalog, tokens
+from codebase.projects import parse_projects
+
+SCALE = float(os.environ.get("COURSETOOLS_BENCHMARK_SCALE", "1"))
+PROJECTS = int(50000 * SCALE)
+COURSES = [
+    "Introduction to TypeScript", "Fast Track to Java for .NET Developers", "Kotlin and Android Development",
+    "Testing Excellence in Python", "React with TypeScript", "Docker and Kubernetes", "AWS Serverless",
+    "Performance with JMH", "Modern C++", "Rust Fundamentals", "Go for Java Developers", "Spring Boot",
+]
+CLIENTS = ["CME", "BMW", "LIT", "ACME", "NHS", "BT", "SAGE", "KAINOS", "CITI", "AIB"]
+MONTHS = ["January", "March", "May", "June", "September", "October", "November"]
+QUERIES = [("typescript 2024", {"archived"}), ("kotlin bmw", None), ("jav octo 2023", {"active"})]
+
+
+def write_projects(path, projects=PROJECTS):
+    generator = random.Random(42)
+    with open(path, "w") as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n<projects type="array">\n')
+        for number in range(projects):
+            name = (
+                f"{generator.choice(COURSES)} - {generator.choice(CLIENTS)} - "
+                f"{generator.choice(MONTHS)} {generator.randint(2018, 2025)}"
+            )
+            status = "active" if generator.random() < 0.1 else "archived"
+            file.write(
+                f"<project><project-id type=\"integer\">{100000 + number}</project-id>"
+                f"<account-name>Instil Software</account-name><name>{name}</name>"
+                f"<status>{status}</status><permalink>p{number}-{'-'.join(tokens(name))}</permalink>"
+                f"<disk-usage type=\"integer\">{generator.randint(0, 10 ** 6)}</disk-usage>"
+                f"<total-tickets type=\"integer\">0</total-tickets></project>\n"
+            )
+        file.write("</projects>\n")
+
+
+def allocated(function):
+    tracemalloc.start()
+    result = function()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def scan(projects, text, statuses):
+    words = tokens(text)
+    return [
+        project for project in projects
+        if (statuses is None or project.status in statuses)
+        and all(any(token.startswith(word) for token in tokens(project.name)) for word in words)
+    ]
+
+
+def best_time(function, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+class TestCatalogBenchmark:
+
+    def test_catalog_against_a_list_of_records(self, temp_dir):
+        path = temp_dir / "projects.xml"
+        write_projects(path)
+
+        records, records_bytes = allocated(lambda: list(parse_projects(path)))
+        catalog, catalog_bytes = allocated(lambda: ProjectCatalog(parse_projects(path)))
+        catalog.search("warm")
+
+        print(
+            f"\n{len(records)} projects: list of records {records_bytes / len(records):.0f} bytes each, "
+            f"indexed catalog {catalog_bytes / len(catalog):.0f} bytes each"
+        )
+        assert catalog_bytes < records_bytes
+        for text, statuses in QUERIES:
+            expected = scan(records, text, statuses)
+            assert catalog.search(text, statuses) == expected
+            scanned = best_time(lambda: scan(records, text, statuses))
+            indexed = best_time(lambda: catalog.search(text, statuses))
+            print(
+                f"  {text!r} {sorted(statuses or [])}: {len(expected)} matches, "
+                f"scan {scanned * 1000:.1f}ms, index {indexed * 1000:.2f}ms"
+            )
+            assert indexed < scanned / 5
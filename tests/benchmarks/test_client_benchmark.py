@@ -0,0 +1,54 @@
+import http.client
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from codebase.client import CodebaseClient
+from codebase.credentials import Credentials
+from tests.codebase.stub_server import StubCodebase
+
+REQUESTS = 200
+
+
+def new_connection_get(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+    connection.request("GET", "/projects")
+    body = connection.getresponse().read()
+    connection.close()
+    return body
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def latencies(get, requests=REQUESTS):
+    return [timed(get) for _ in range(requests)]
+
+
+@pytest.mark.benchmark
+class TestClientBenchmark:
+
+    def test_pooled_connections_against_a_connection_per_request(self):
+        with StubCodebase() as server:
+            client = CodebaseClient(Credentials("a", "u", "k", server.url), pool_size=8)
+            fresh = latencies(lambda: new_connection_get(server))
+            pooled = latencies(lambda: client.get("/projects"))
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                concurrent = timed(
+                    lambda: list(executor.map(lambda _: client.get("/projects"), range(REQUESTS)))
+                )
+            client.close()
+
+        print(
+            f"\nmedian latency: new connection {statistics.median(fresh) * 1000:.2f}ms, "
+            f"pooled {statistics.median(pooled) * 1000:.2f}ms; "
+            f"{REQUESTS} requests on 8 threads in {concurrent * 1000:.0f}ms "
+            f"over {server.connections - REQUESTS} connections"
+        )
+        assert server.connections - REQUESTS <= 8
+        assert statistics.median(pooled) < statistics.median(fresh)
@@ -0,0 +1,71 @@
+import os
+import time
+from shutil import ignore_patterns
+
+import pytest
+
+from coursetools.excludes import ExcludeMatcher, walk
+
+EXCLUDES = ["archive", "node_modules", "*.old", ".idea", ".vscode", ".aws-sam", ".DS_Store", ".venv"]
+
+
+def build_tree(root, directories=40, files_per_directory=50, ignored_files=20000):
+    for directory in range(directories):
+        path = root / "src" / f"module{directory}"
+        path.mkdir(parents=True)
+        for file in range(files_per_directory):
+            (path / f"file{file}.py").write_text("")
+        (path / "notes.old").write_text("")
+    for ignored in ["node_modules", ".venv"]:
+        for file in range(ignored_files):
+            path = root / "src" / ignored / f"package{file % 200}"
+            path.mkdir(parents=True, exist_ok=True)
+            (path / f"file{file}.js").write_text("")
+
+
+def ignore_patterns_walk(root):
+    ignore = ignore_patterns(*EXCLUDES)
+    for directory, dirnames, filenames in os.walk(root):
+        ignored = ignore(directory, dirnames + filenames)
+        dirnames[:] = [name for name in dirnames if name not in ignored]
+        yield from (name for name in filenames if name not in ignored)
+
+
+def matcher_walk(root):
+    matcher = ExcludeMatcher(EXCLUDES)
+    return (entry.name for _, entry, is_dir in walk(root, matcher) if not is_dir)
+
+
+def unpruned_walk(root):
+    ignore = ignore_patterns(*EXCLUDES)
+    for directory, _, filenames in os.walk(root):
+        ignored = ignore(directory, filenames)
+        yield from (name for name in filenames if name not in ignored)
+
+
+def best_time(function, root, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        files = list(function(root))
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(files)
+
+
+@pytest.mark.benchmark
+class TestExcludesBenchmark:
+
+    def test_matcher_walk_against_ignore_patterns(self, temp_dir):
+        build_tree(temp_dir)
+
+        unpruned, _ = best_time(unpruned_walk, temp_dir)
+        baseline, baseline_files = best_time(ignore_patterns_walk, temp_dir)
+        compiled, compiled_files = best_time(matcher_walk, temp_dir)
+
+        print(
+            f"\nunpruned walk {unpruned * 1000:.1f}ms, "
+            f"ignore_patterns {baseline * 1000:.1f}ms, "
+            f"compiled matcher {compiled * 1000:.1f}ms ({baseline / compiled:.1f}x)"
+        )
+        assert compiled_files == baseline_files
+        assert compiled < unpruned
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+import pytest
+
+from codebase.client import CodebaseClient
+from codebase.credentials import Credentials
+from codebase.fetcher import project_repositories
+from codebase.projects import Project
+from codebase.repositories import repositories_path
+from tests.codebase.stub_server import StubCodebase, repositories_xml
+
+PROJECTS = [Project(number, f"p{number}", "active", f"p{number}") for number in range(200)]
+LATENCY = 0.02
+
+
+def fan_out(client, concurrency):
+    async def gather():
+        return [result async for result in project_repositories(client, PROJECTS, concurrency)]
+
+    return asyncio.run(gather())
+
+
+@pytest.mark.benchmark
+class TestFetcherBenchmark:
+
+    def test_fan_out_against_one_request_at_a_time(self):
+        routes = {repositories_path(project): repositories_xml("course") for project in PROJECTS}
+        with StubCodebase(routes, latency=LATENCY) as server:
+            client = CodebaseClient(Credentials("a", "u", "k", server.url), pool_size=16)
+            timings = {}
+            for concurrency in [1, 4, 16]:
+                start = time.perf_counter()
+                results = fan_out(client, concurrency)
+                timings[concurrency] = time.perf_counter() - start
+            client.close()
+
+        print(
+            f"\n{len(PROJECTS)} projects at {LATENCY * 1000:.0f}ms latency: "
+            + ", ".join(f"concurrency {c} {t * 1000:.0f}ms" for c, t in timings.items())
+        )
+        assert all(error is None for _, _, error in results)
+        assert timings[16] < timings[1] / 5
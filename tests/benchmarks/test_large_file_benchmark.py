@@ -0,0 +1,56 @@
+import os
+import time
+from shutil import copy2
+
+import pytest
+
+from coursetools.copier import FileCopy
+from coursetools.links import chunked_copy, read_into
+
+SCALE = float(os.environ.get("COURSETOOLS_BENCHMARK_SCALE", "1"))
+SIZE = int(256 * 1024 * 1024 * SCALE)
+BUFFER_SIZES = [64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+
+
+def buffered_copy(file_copy, buffer_size):
+    with open(file_copy.source, "rb") as source, open(file_copy.destination, "wb") as target:
+        read_into(source, target, buffer_size)
+
+
+def best_time(function, destination, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        if destination.exists():
+            destination.unlink()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+class TestLargeFileBenchmark:
+
+    def test_chunked_copy_against_shutil(self, temp_dir):
+        source = temp_dir / "large.bin"
+        with open(source, "wb") as file:
+            for _ in range(SIZE // (1024 * 1024)):
+                file.write(os.urandom(1024 * 1024))
+        file_copy = FileCopy(source, temp_dir / "copy.bin", copy2, "/", SIZE)
+        megabytes = SIZE / 1024 / 1024
+
+        timings = {"shutil.copy2": best_time(lambda: copy2(source, file_copy.destination), file_copy.destination)}
+        for buffer_size in BUFFER_SIZES:
+            label = f"{buffer_size // 1024}K"
+            timings[f"sendfile {label}"] = best_time(
+                lambda: chunked_copy(file_copy, buffer_size), file_copy.destination
+            )
+            timings[f"readinto {label}"] = best_time(
+                lambda: buffered_copy(file_copy, buffer_size), file_copy.destination
+            )
+
+        print(f"\n{megabytes:.0f} MB file:")
+        for name, seconds in timings.items():
+            print(f"  {name}: {seconds * 1000:.0f}ms, {megabytes / seconds:.0f} MB/sec")
+        assert file_copy.destination.stat().st_size == SIZE
+        assert timings["sendfile 1024K"] < timings["shutil.copy2"] * 1.5
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import coursetools
+from coursetools.templates import TemplateRegistry, template_dir
+from tests.benchmarks.synthetic import generate_training_repo
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+# Each build is timed against copying the same files with shutil.copy2 in the
+# same run, and the baseline records that relative speed rather than files/sec
+# on one machine. Scale the synthetic repo with COURSETOOLS_BENCHMARK_SCALE,
+# record the baseline with COURSETOOLS_UPDATE_BASELINE=1, and allow noisier
+# machines with COURSETOOLS_BENCHMARK_TOLERANCE (the fraction of the baseline's
+# relative speed to reach). Each template is built COURSETOOLS_BENCHMARK_REPEAT
+# times (default 3), as one run can be slowed by anything else on the machine:
+# the baseline records the slowest and a run passes when its fastest reaches it.
+SCALE = float(os.environ.get("COURSETOOLS_BENCHMARK_SCALE", "1"))
+TOLERANCE = float(os.environ.get("COURSETOOLS_BENCHMARK_TOLERANCE", "0.5"))
+REPEAT = int(os.environ.get("COURSETOOLS_BENCHMARK_REPEAT", "3"))
+REGISTRY = TemplateRegistry([template_dir])
+
+
+def load_baseline():
+    if not BASELINE_FILE.exists():
+        return {}
+    return json.loads(BASELINE_FILE.read_text())
+
+
+def save_baseline(name, result):
+    baseline = load_baseline()
+    baseline[name] = {
+        "files": result["files"],
+        "relative_speed": round(relative_speed(result), 2),
+    }
+    BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def relative_speed(result):
+    return result["files_per_sec"] / result["reference_files_per_sec"]
+
+
+def new_output(temp_dir, run):
+    output = temp_dir / f"output{run}"
+    output.mkdir()
+    return output
+
+
+def run_measure(repo_root, template_name, output):
+    package_root = Path(coursetools.__file__).parent.parent
+    project_root = Path(__file__).parent.parent.parent
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(package_root), str(project_root)])}
+    command = [
+        sys.executable, "-m", "tests.benchmarks.measure",
+        str(repo_root), str(REGISTRY.files()[template_name]),
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=output, check=True)
+    return json.loads(result.stdout)
+
+
+def report(name, result, baseline):
+    print(
+        f"\n{name}: {result['files']} files, {result['files_per_sec']:.0f} files/sec, "
+        f"{result['mb_per_sec']:.1f} MB/sec, peak RSS {result['peak_rss_mb']:.0f} MB, "
+        f"{relative_speed(result):.2f}x the speed of copying with shutil.copy2 "
+        f"({result['reference_files_per_sec']:.0f} files/sec)"
+    )
+    for phase, timing in result["phases"].items():
+        print(
+            f"  {phase}: {timing['seconds'] * 1000:.0f}ms "
+            f"({timing['system_seconds'] * 1000:.0f}ms in the kernel)"
+        )
+    if baseline:
+        print(f"  baseline: {baseline['relative_speed']:.2f}x")
+
+
+@pytest.mark.benchmark
+class TestMakeRepoBenchmark:
+
+    @pytest.mark.parametrize("name", REGISTRY.names())
+    def test_template_throughput(self, temp_dir, name):
+        repo_root = temp_dir / "training-repo"
+        generate_training_repo(
+            repo_root, REGISTRY.load(name),
+            files_per_path=int(200 * SCALE), ignored_files=int(1000 * SCALE)
+        )
+
+        results = [run_measure(repo_root, name, new_output(temp_dir, run)) for run in range(REPEAT)]
+        result = max(results, key=relative_speed)
+        baseline = load_baseline().get(name)
+        report(name, result, baseline)
+
+        if os.environ.get("COURSETOOLS_UPDATE_BASELINE"):
+            save_baseline(name, min(results, key=relative_speed))
+        elif baseline is not None:
+            assert relative_speed(result) >= baseline["relative_speed"] * TOLERANCE
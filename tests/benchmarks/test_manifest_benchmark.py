@@ -0,0 +1,34 @@
+import os
+import time
+
+import pytest
+
+from coursetools.manifest import HashStats, hash_files
+
+SCALE = float(os.environ.get("COURSETOOLS_BENCHMARK_SCALE", "1"))
+FILES = int(64 * SCALE)
+FILE_SIZE = 4 * 1024 * 1024
+
+
+@pytest.mark.benchmark
+class TestManifestBenchmark:
+
+    def test_process_pool_hashing_scales_across_cores(self, temp_dir):
+        paths = []
+        for number in range(FILES):
+            path = temp_dir / f"file{number}.bin"
+            path.write_bytes(os.urandom(FILE_SIZE))
+            paths.append(path)
+
+        results = {}
+        for jobs in [1, None]:
+            start = time.perf_counter()
+            digests = hash_files(paths, jobs)
+            results[jobs] = (HashStats(FILES, FILES * FILE_SIZE, time.perf_counter() - start), digests)
+
+        single, pooled = results[1][0], results[None][0]
+        print(f"\none process: {single}")
+        print(f"{os.cpu_count()} processes: {pooled}")
+        assert results[1][1] == results[None][1]
+        if (os.cpu_count() or 1) >= 4:
+            assert pooled.megabytes_per_second() > single.megabytes_per_second() * 1.5
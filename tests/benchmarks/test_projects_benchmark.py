@@ -0,0 +1,66 @@
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from xml.etree.ElementTree import parse
+
+import pytest
+
+from codebase.projects import parse_projects, project_from_element
+
+FIXTURE = Path(__file__).parent.parent.parent / "fixturedata" / "projects.xml"
+SCALE = float(os.environ.get("COURSETOOLS_BENCHMARK_SCALE", "1"))
+PROJECTS = int(50000 * SCALE)
+
+
+def scaled_fixture(path, projects=PROJECTS):
+    document = FIXTURE.read_text()
+    start = document.index("<project>")
+    end = document.rindex("</project>") + len("</project>")
+    block = document[start:end]
+    copies = projects // block.count("<project>") + 1
+    with open(path, "w") as file:
+        file.write(document[:start])
+        for _ in range(copies):
+            file.write(block)
+        file.write(document[end:])
+    return copies * block.count("<project>")
+
+
+def parse_whole_tree(path, statuses):
+    projects = (project_from_element(element) for element in parse(path).getroot())
+    return [project for project in projects if project.status in statuses]
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+@pytest.mark.benchmark
+class TestProjectsBenchmark:
+
+    def test_streaming_parser_against_whole_tree(self, temp_dir):
+        path = temp_dir / "projects.xml"
+        total = scaled_fixture(path)
+
+        tree, tree_seconds, tree_mb = measure(lambda: parse_whole_tree(path, {"active"}))
+        streamed, stream_seconds, stream_mb = measure(
+            lambda: list(parse_projects(path, {"active"}))
+        )
+        _, first_seconds, _ = measure(lambda: next(parse_projects(path)))
+
+        print(
+            f"\n{total} projects ({path.stat().st_size / 1024 / 1024:.1f} MB): "
+            f"whole tree {tree_seconds * 1000:.0f}ms peak {tree_mb:.1f} MB, "
+            f"streamed {stream_seconds * 1000:.0f}ms peak {stream_mb:.1f} MB, "
+            f"first project after {first_seconds * 1000:.2f}ms"
+        )
+        assert streamed == tree
+        assert stream_mb < tree_mb / 10
+        assert first_seconds < stream_seconds / 100
@@ -0,0 +1,104 @@
+import configparser
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import coursetools
+from tests.codebase.stub_server import StubCodebase
+
+# Budgets in milliseconds: best wall clock over a few cold starts, and the
+# self-reported import time of everything imported after interpreter startup.
+# Scale them on slow machines with COURSETOOLS_STARTUP_BUDGET_SCALE.
+BUDGETS = {
+    "list": {"wall": 150, "imports": 40},
+    "help": {"wall": 150, "imports": 40},
+    "noop": {"wall": 300, "imports": 100},
+    "cached projects": {"wall": 150},
+}
+RUNS = 5
+
+
+def budget(command, kind):
+    scale = float(os.environ.get("COURSETOOLS_STARTUP_BUDGET_SCALE", "1"))
+    return BUDGETS[command][kind] * scale
+
+
+def makerepo_env(home):
+    src = Path(coursetools.__file__).parent.parent
+    return {**os.environ, "HOME": str(home), "PYTHONPATH": str(src)}
+
+
+def makerepo(args, home, *options):
+    command = [sys.executable, *options, "-m", "coursetools", *args]
+    return subprocess.run(
+        command, capture_output=True, text=True, env=makerepo_env(home), cwd=home, check=True
+    )
+
+
+def best_wall_time(args, home):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        makerepo(args, home)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def import_time(args, home):
+    """Total self time in ms of modules imported by the app, from -X importtime."""
+    stderr = makerepo(args, home, "-X", "importtime").stderr
+    lines = stderr.split("import time:")
+    started = next(i for i, line in enumerate(lines) if line.rstrip().endswith(" coursetools"))
+    self_times = [re.match(r"\s*(\d+)", line) for line in lines[started:]]
+    return sum(int(match.group(1)) for match in self_times if match) / 1000
+
+
+@pytest.fixture
+def home(temp_dir):
+    config_dir = temp_dir / ".coursetools"
+    (config_dir / "templates").mkdir(parents=True)
+    config = configparser.ConfigParser()
+    config["config"] = {"repo_root": str(temp_dir / "training-repo")}
+    with open(config_dir / "config.ini", "w") as file:
+        config.write(file)
+    template = configparser.ConfigParser()
+    template["paths"] = {"/missing": "out"}
+    template["excludes"] = {"node_modules": ""}
+    with open(config_dir / "templates" / "noop.ini", "w") as file:
+        template.write(file)
+    return temp_dir
+
+
+@pytest.mark.benchmark
+class TestStartupBenchmark:
+
+    @pytest.mark.parametrize("command, args", [
+        ("list", ["-l"]),
+        ("help", ["--help"]),
+        ("noop", ["noop"]),
+    ])
+    def test_startup_within_budget(self, home, command, args):
+        wall = best_wall_time(args, home)
+        imports = import_time(args, home)
+
+        print(f"\n{command}: {wall:.0f}ms wall clock, {imports:.1f}ms imports")
+        assert wall <= budget(command, "wall")
+        assert imports <= budget(command, "imports")
+
+    def test_cached_project_listing_within_budget(self, home):
+        with StubCodebase() as server:
+            (home / ".codebase").mkdir()
+            (home / ".codebase" / "credentials.toml").write_text(
+                f'account = "a"\nusername = "u"\napi_key = "k"\napi_url = "{server.url}"\n'
+            )
+            makerepo(["--project", "--all"], home)
+            wall = best_wall_time(["--project", "--all"], home)
+
+        print(f"\ncached projects: {wall:.0f}ms wall clock")
+        assert len(server.requests) == 1
+        assert wall <= budget("cached projects", "wall")
@@ -0,0 +1,84 @@
+import statistics
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import coursetools.config as config_module
+import coursetools.templates as templates_module
+from coursetools.repository import make_repo
+from coursetools.templates import TemplateRegistry, template_dir
+from coursetools.watch import load_inotify, watch_repo
+from tests import run_in_temporary_directory
+from tests.benchmarks.synthetic import generate_training_repo
+
+EDITS = 20
+
+
+def edit_latency(source, destination, number):
+    content = f"edit {number}\n"
+    start = time.perf_counter()
+    source.write_text(content)
+    deadline = start + 5
+    while not (destination.exists() and destination.read_text() == content):
+        if time.perf_counter() > deadline:
+            raise AssertionError(f"{destination} was not updated")
+        time.sleep(0.001)
+    return time.perf_counter() - start
+
+
+def edited_files(repo_root, key):
+    return sorted((repo_root / key.lstrip("/")).rglob("file*.txt"))[:EDITS]
+
+
+@pytest.mark.benchmark
+class TestWatchBenchmark:
+
+    @pytest.fixture
+    def course(self, temp_dir, mock_config_dir, monkeypatch):
+        registry = TemplateRegistry([template_dir])
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        monkeypatch.setattr(config_module, "CONFIG", None)
+        monkeypatch.setattr(templates_module, "registry", registry)
+        template = registry.load("python")
+        generate_training_repo(temp_dir / "training-repo", template)
+        key, output = next(
+            (key, output) for key, output in template["paths"].items() if not Path(key).suffix
+        )
+        (temp_dir / "out").mkdir()
+        return temp_dir, key, output
+
+    @pytest.mark.parametrize("poll", [False, True], ids=["inotify", "polling"])
+    def test_change_to_destination_latency(self, course, poll):
+        if not poll and load_inotify() is None:
+            pytest.skip("needs inotify")
+        temp_dir, key, output = course
+        repo_root = temp_dir / "training-repo"
+        stop = threading.Event()
+        latencies = []
+
+        def act_and_assert():
+            start = time.perf_counter()
+            make_repo("python", sync=True)
+            rebuild = time.perf_counter() - start
+            thread = threading.Thread(target=watch_repo, args=("python",), kwargs={"poll": poll, "stop": stop, "sync": True})
+            thread.start()
+            try:
+                time.sleep(0.5)
+                for number, source in enumerate(edited_files(repo_root, key)):
+                    destination = Path(output) / source.relative_to(repo_root / key.lstrip("/"))
+                    latencies.append(edit_latency(source, destination, number))
+                    time.sleep(0.1)
+            finally:
+                stop.set()
+                thread.join()
+            median = statistics.median(latencies)
+            print(
+                f"\n{'polling' if poll else 'inotify'}: median {median * 1000:.0f}ms, "
+                f"worst {max(latencies) * 1000:.0f}ms per edit; "
+                f"unchanged rebuild with --sync {rebuild * 1000:.0f}ms"
+            )
+            assert median < (1.0 if poll else 0.25)
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "out")
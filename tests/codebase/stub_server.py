@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE = Path(__file__).parent.parent.parent / "fixturedata" / "projects.xml"
+LAST_MODIFIED = "Mon, 14 Oct 2024 09:00:00 GMT"
+
+
+class StubCodebase(ThreadingHTTPServer):
+    """
+    A local stand-in for the Codebase API serving fixture XML over HTTP/1.1
+    keep-alive, counting connections and requests.
+
+    routes -- path to response body
+    failures -- statuses to answer with, one per request, before succeeding
+    latency -- seconds to wait before each response, or a dict of them by path
+    drop_connections -- close each connection after responding without telling the client
+    validators -- send ETag and Last-Modified, answering 304 when they match
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, routes=None, failures=(), latency=0.0, drop_connections=False, validators=True
+    ):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.routes = routes if routes is not None else {"/projects": FIXTURE.read_bytes()}
+        self.failures = list(failures)
+        self.latency = latency
+        self.drop_connections = drop_connections
+        self.validators = validators
+        self.connections = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, args=(0.01,), daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+    def next_failure(self):
+        with self.lock:
+            return self.failures.pop(0) if self.failures else None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, dict(self.headers)))
+        latency = self.server.latency
+        if isinstance(latency, dict):
+            latency = latency.get(self.path, 0.0)
+        if latency:
+            time.sleep(latency)
+        failure = self.server.next_failure()
+        if failure:
+            self.respond(failure, b"", {"Retry-After": "0"} if failure == 429 else {})
+        elif self.path in self.server.routes:
+            self.respond_with(self.server.routes[self.path])
+        else:
+            self.respond(404, b"")
+        if self.server.drop_connections:
+            self.close_connection = True
+
+    def respond_with(self, body):
+        if not self.server.validators:
+            self.respond(200, body)
+            return
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        if self.headers.get("If-None-Match") == etag:
+            self.respond(304, b"", headers)
+        else:
+            self.respond(200, body, headers)
+
+    def respond(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def repositories_xml(*permalinks):
+    repositories = "".join(
+        f"<repository><name>{permalink}</name><permalink>{permalink}</permalink>"
+        f"<disk-usage type=\"integer\">1024</disk-usage>"
+        f"<clone-url>git@codebasehq.com:instil/{permalink}.git</clone-url></repository>"
+        for permalink in permalinks
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><repositories type="array">{repositories}</repositories>'.encode()
@@ -0,0 +1,135 @@
+import pytest
+
+from codebase.cache import ResponseCache
+from codebase.client import CodebaseClient, CodebaseError
+from codebase.credentials import Credentials
+from tests.codebase.stub_server import LAST_MODIFIED, StubCodebase
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(server, cache, **options):
+    credentials = Credentials("instil", "ryan", "secret", server.url)
+    return CodebaseClient(credentials, sleep=lambda seconds: None, cache=cache, **options)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(temp_dir, clock):
+    return ResponseCache(temp_dir / "cache", ttl=60, clock=clock)
+
+
+class TestResponseCache:
+
+    def test_fresh_responses_are_served_from_disk(self, cache):
+        with StubCodebase() as server:
+            first = make_client(server, cache).get("/projects")
+            second = make_client(server, cache).get("/projects")
+
+        assert first == second
+        assert len(server.requests) == 1
+
+    def test_streamed_projects_are_cached(self, cache):
+        with StubCodebase() as server:
+            streamed = list(make_client(server, cache).projects(include_archived=True))
+            cached = list(make_client(server, cache).projects(include_archived=True))
+
+        assert cached == streamed
+        assert len(server.requests) == 1
+
+    def test_stale_responses_are_revalidated(self, cache, clock):
+        with StubCodebase() as server:
+            first = make_client(server, cache).get("/projects")
+            clock.now += 61
+            second = make_client(server, cache).get("/projects")
+
+        assert second == first
+        _, headers = server.requests[1]
+        assert headers["If-None-Match"].startswith('"')
+        assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+    def test_not_modified_renews_the_entry(self, cache, clock):
+        with StubCodebase() as server:
+            make_client(server, cache).get("/projects")
+            clock.now += 61
+            make_client(server, cache).get("/projects")
+            make_client(server, cache).get("/projects")
+
+        assert len(server.requests) == 2
+
+    def test_changed_responses_replace_the_entry(self, cache, clock):
+        with StubCodebase(routes={"/projects": b"<projects/>"}) as server:
+            make_client(server, cache).get("/projects")
+            server.routes["/projects"] = b"<projects></projects>"
+            clock.now += 61
+
+            body = make_client(server, cache).get("/projects")
+
+        assert body == b"<projects></projects>"
+        assert make_client(server, cache, offline=True).get("/projects") == b"<projects></projects>"
+
+    def test_refresh_asks_the_server_even_when_fresh(self, cache):
+        with StubCodebase() as server:
+            make_client(server, cache).get("/projects")
+            make_client(server, cache, refresh=True).get("/projects")
+
+        assert len(server.requests) == 2
+        assert "If-None-Match" in server.requests[1][1]
+
+    def test_servers_without_validators_send_the_whole_body(self, cache, clock):
+        with StubCodebase(validators=False) as server:
+            make_client(server, cache).get("/projects")
+            clock.now += 61
+            make_client(server, cache).get("/projects")
+
+        _, headers = server.requests[1]
+        assert "If-None-Match" not in headers
+        assert "If-Modified-Since" not in headers
+
+    def test_offline_uses_old_entries_without_the_server(self, cache, clock):
+        with StubCodebase() as server:
+            body = make_client(server, cache).get("/projects")
+        clock.now += 3600
+
+        assert make_client(server, cache, offline=True).get("/projects") == body
+
+    def test_offline_without_an_entry(self, cache):
+        with StubCodebase() as server:
+            with pytest.raises(CodebaseError, match="without --offline"):
+                make_client(server, cache, offline=True).get("/projects")
+
+        assert server.requests == []
+
+    def test_entries_are_per_account(self, cache):
+        with StubCodebase() as server:
+            make_client(server, cache).get("/projects")
+            other = CodebaseClient(Credentials("other", "ryan", "secret", server.url), cache=cache)
+            other.get("/projects")
+
+        assert len(server.requests) == 2
+
+    def test_failed_responses_are_not_cached(self, cache):
+        with StubCodebase(failures=[401]) as server:
+            with pytest.raises(CodebaseError):
+                make_client(server, cache).get("/projects")
+
+        assert list(cache.directory.glob("*.xml")) == []
+
+    def test_abandoned_streams_are_not_cached(self, cache):
+        with StubCodebase() as server:
+            projects = make_client(server, cache).projects(include_archived=True)
+            next(projects)
+            projects.close()
+
+        assert list(cache.directory.glob("*")) == []
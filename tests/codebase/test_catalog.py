@@ -0,0 +1,91 @@
+from pathlib import Path
+
+from codebase.catalog import ProjectCatalog, tokens
+from codebase.projects import Project, parse_projects
+
+FIXTURE = Path(__file__).parent.parent.parent / "fixturedata" / "projects.xml"
+
+
+def catalog():
+    return ProjectCatalog(parse_projects(FIXTURE))
+
+
+class TestProjectCatalog:
+
+    def test_rows_round_trip_to_projects(self):
+        projects = list(parse_projects(FIXTURE))
+
+        assert list(ProjectCatalog(projects)) == projects
+        assert len(ProjectCatalog(projects)) == 32
+
+    def test_get_by_permalink(self):
+        project = catalog().get("instil-software")
+
+        assert project.project_id == 239023
+        assert project.status == "archived"
+        assert project.account_name == "Instil Software"
+
+    def test_get_unknown_permalink(self):
+        assert catalog().get("nothing") is None
+
+    def test_search_by_status(self):
+        projects = catalog().search(statuses={"active"})
+
+        assert len(projects) == 7
+        assert all(project.status == "active" for project in projects)
+
+    def test_search_matches_every_word(self):
+        projects = catalog().search("typescript 2024")
+
+        assert projects
+        assert all("TypeScript" in project.name and "2024" in project.name for project in projects)
+
+    def test_search_matches_word_prefixes(self):
+        assert catalog().search("types") == catalog().search("typescript")
+
+    def test_search_by_words_and_status(self):
+        projects = catalog().search("TypeScript 2024", statuses={"archived"})
+
+        assert projects == [
+            project for project in catalog().search("typescript 2024") if project.status == "archived"
+        ]
+
+    def test_search_keeps_the_order_projects_were_added(self):
+        projects = catalog().search("2024")
+
+        assert [project.project_id for project in projects] == sorted(
+            project.project_id for project in projects
+        )
+
+    def test_search_without_matches(self):
+        assert catalog().search("cobol") == []
+        assert catalog().search("typescript", statuses={"deleted"}) == []
+
+    def test_empty_search_returns_everything(self):
+        assert len(catalog().search()) == 32
+
+    def test_projects_added_later_are_searchable(self):
+        projects = catalog()
+        projects.search("kotlin")
+
+        projects.add(Project(1, "Advanced Kotlin - 2025", "active", "advanced-kotlin-2025"))
+
+        assert projects.get("advanced-kotlin-2025").name == "Advanced Kotlin - 2025"
+        assert [project.project_id for project in projects.search("kotlin 2025")] == [1]
+
+    def test_many_accounts_do_not_crowd_out_statuses(self):
+        projects = [Project(number, f"p{number}", "active", f"p{number}", f"account{number}") for number in range(300)]
+        projects.append(Project(300, "p300", "archived", "p300", "account0"))
+
+        catalog = ProjectCatalog(projects)
+
+        assert list(catalog) == projects
+        assert [project.name for project in catalog.search(statuses={"archived"})] == ["p300"]
+
+
+class TestTokens:
+
+    def test_words_are_lowercase_letters_and_digits(self):
+        assert tokens("Fast Track to Java for .NET Developers - CME - October 2024") == [
+            "fast", "track", "to", "java", "for", "net", "developers", "cme", "october", "2024"
+        ]
@@ -0,0 +1,144 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from codebase.client import CodebaseClient, CodebaseError
+from codebase.credentials import Credentials, load_credentials
+from tests.codebase.stub_server import StubCodebase
+
+
+def make_client(server, **options):
+    credentials = Credentials("instil", "ryan", "secret", server.url)
+    return CodebaseClient(credentials, sleep=lambda seconds: None, **options)
+
+
+class TestLoadCredentials:
+
+    def test_reads_the_toml_file(self, temp_dir):
+        path = temp_dir / "credentials.toml"
+        path.write_text('account = "instil"\nusername = "ryan"\napi_key = "secret"\n')
+
+        credentials = load_credentials(path)
+
+        assert credentials == Credentials("instil", "ryan", "secret")
+        assert credentials.api_username == "instil/ryan"
+
+    def test_api_url_can_be_overridden(self, temp_dir):
+        path = temp_dir / "credentials.toml"
+        path.write_text(
+            'account = "a"\nusername = "u"\napi_key = "k"\napi_url = "http://localhost:8000"\n'
+        )
+
+        assert load_credentials(path).api_url == "http://localhost:8000"
+
+
+class TestCodebaseClient:
+
+    def test_lists_active_projects(self):
+        with StubCodebase() as server:
+            client = make_client(server)
+
+            projects = list(client.projects())
+
+        assert len(projects) == 7
+        assert all(project.status == "active" for project in projects)
+
+    def test_lists_all_projects(self):
+        with StubCodebase() as server:
+            client = make_client(server)
+
+            projects = list(client.projects(include_archived=True))
+
+        assert len(projects) == 32
+
+    def test_sends_basic_auth_and_xml_headers(self):
+        with StubCodebase() as server:
+            make_client(server).get("/projects")
+
+        _, headers = server.requests[0]
+        assert headers["Authorization"] == "Basic " + base64.b64encode(b"instil/ryan:secret").decode()
+        assert headers["Accept"] == "application/xml"
+
+    def test_reuses_one_connection_for_sequential_requests(self):
+        with StubCodebase() as server:
+            client = make_client(server)
+            for _ in range(5):
+                client.get("/projects")
+            client.close()
+
+        assert len(server.requests) == 5
+        assert server.connections == 1
+
+    def test_concurrent_requests_share_the_pool(self):
+        with StubCodebase(latency=0.01) as server:
+            client = make_client(server, pool_size=4)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                bodies = list(executor.map(lambda _: client.get("/projects"), range(20)))
+            client.close()
+
+        assert len(set(bodies)) == 1
+        assert server.connections <= 4
+
+    def test_retries_busy_and_failing_responses(self):
+        delays = []
+        with StubCodebase(failures=[503, 429, 500]) as server:
+            credentials = Credentials("instil", "ryan", "secret", server.url)
+            client = CodebaseClient(credentials, backoff=0.5, sleep=delays.append)
+
+            body = client.get("/projects")
+
+        assert body.startswith(b"<?xml")
+        assert delays == [0.5, 0, 2.0]
+
+    def test_gives_up_after_the_last_retry(self):
+        with StubCodebase(failures=[503] * 4) as server:
+            client = make_client(server, retries=3)
+
+            with pytest.raises(CodebaseError, match="503"):
+                client.get("/projects")
+
+        assert len(server.requests) == 4
+
+    def test_client_errors_are_not_retried(self):
+        with StubCodebase(failures=[401]) as server:
+            client = make_client(server)
+
+            with pytest.raises(CodebaseError, match="401"):
+                client.get("/projects")
+
+        assert len(server.requests) == 1
+
+    def test_reconnects_when_a_kept_alive_connection_was_closed(self):
+        with StubCodebase(drop_connections=True) as server:
+            client = make_client(server)
+            client.get("/projects")
+
+            body = client.get("/projects")
+
+        assert body.startswith(b"<?xml")
+        assert server.connections == 2
+
+    def test_unreachable_server(self):
+        credentials = Credentials("instil", "ryan", "secret", "http://127.0.0.1:9")
+        client = CodebaseClient(credentials, retries=1, sleep=lambda seconds: None)
+
+        with pytest.raises(CodebaseError, match="failed"):
+            client.get("/projects")
+
+    def test_unknown_host(self):
+        credentials = Credentials("instil", "ryan", "secret", "http://codebase.invalid")
+        client = CodebaseClient(credentials, sleep=lambda seconds: None)
+
+        with pytest.raises(CodebaseError, match="failed"):
+            client.get("/projects")
+
+    def test_timeouts_are_not_retried(self):
+        with StubCodebase(latency=0.5) as server:
+            client = make_client(server)
+            client.pool.timeout = 0.05
+
+            with pytest.raises(CodebaseError, match="timed out"):
+                client.get("/projects")
+
+        assert len(server.requests) == 1
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from codebase.client import CodebaseClient
+from codebase.credentials import Credentials
+from codebase.fetcher import RateLimiter, fetch_all, project_repositories
+from codebase.projects import Project
+from codebase.repositories import Repository
+from tests.codebase.stub_server import StubCodebase, repositories_xml
+
+
+def make_client(server, pool_size=8):
+    credentials = Credentials("instil", "ryan", "secret", server.url)
+    return CodebaseClient(credentials, pool_size, sleep=lambda seconds: None)
+
+
+def collect(async_iterable):
+    async def gather():
+        return [item async for item in async_iterable]
+
+    return asyncio.run(gather())
+
+
+def project(permalink):
+    return Project(1, permalink, "active", permalink)
+
+
+class TestFetchAll:
+
+    def test_fetches_every_path(self):
+        routes = {f"/p{number}": str(number).encode() for number in range(20)}
+        with StubCodebase(routes) as server:
+            results = collect(fetch_all(make_client(server), [(path, path) for path in routes]))
+
+        assert sorted(result.body for result in results) == sorted(routes.values())
+
+    def test_results_arrive_as_they_complete(self):
+        routes = {"/slow": b"slow", "/fast": b"fast"}
+        with StubCodebase(routes, latency={"/slow": 0.2}) as server:
+            results = collect(fetch_all(make_client(server), [("slow", "/slow"), ("fast", "/fast")]))
+
+        assert [result.key for result in results] == ["fast", "slow"]
+
+    def test_requests_run_concurrently(self):
+        routes = {f"/p{number}": b"" for number in range(16)}
+        with StubCodebase(routes, latency=0.1) as server:
+            start = time.perf_counter()
+            collect(fetch_all(make_client(server), [(path, path) for path in routes], concurrency=8))
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.8
+        assert server.connections <= 8
+
+    def test_concurrency_is_limited(self):
+        routes = {f"/p{number}": b"" for number in range(6)}
+        with StubCodebase(routes, latency=0.05) as server:
+            start = time.perf_counter()
+            collect(fetch_all(make_client(server), [(path, path) for path in routes], concurrency=1))
+            elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.3
+        assert server.connections == 1
+
+    def test_errors_are_returned_per_request(self):
+        with StubCodebase({"/good": b"ok"}) as server:
+            results = collect(fetch_all(make_client(server), [("good", "/good"), ("bad", "/bad")]))
+
+        by_key = {result.key: result for result in results}
+        assert by_key["good"].body == b"ok"
+        assert "404" in str(by_key["bad"].error)
+
+    def test_a_timeout_only_fails_its_own_request(self):
+        with StubCodebase({"/good": b"ok", "/slow": b""}, latency={"/slow": 0.5}) as server:
+            client = make_client(server)
+            client.pool.timeout = 0.05
+            results = collect(fetch_all(client, [("good", "/good"), ("slow", "/slow")]))
+
+        by_key = {result.key: result for result in results}
+        assert by_key["good"].body == b"ok"
+        assert "timed out" in str(by_key["slow"].error)
+
+
+class TestRateLimiter:
+
+    def test_spaces_out_requests(self):
+        async def acquire_times():
+            limiter = RateLimiter(20)
+            times = []
+            for _ in range(5):
+                await limiter.acquire()
+                times.append(time.monotonic())
+            return times
+
+        times = asyncio.run(acquire_times())
+
+        assert times[-1] - times[0] >= 0.19
+
+    def test_limits_fetches(self):
+        routes = {f"/p{number}": b"" for number in range(5)}
+        with StubCodebase(routes) as server:
+            start = time.perf_counter()
+            collect(fetch_all(make_client(server), [(path, path) for path in routes], rate=20))
+            elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.19
+
+
+class TestProjectRepositories:
+
+    def test_parses_each_projects_repositories(self):
+        routes = {
+            "/alpha/repositories": repositories_xml("course", "solutions"),
+            "/beta/repositories": repositories_xml(),
+        }
+        with StubCodebase(routes) as server:
+            results = collect(project_repositories(make_client(server), [project("alpha"), project("beta")]))
+
+        by_project = {result[0].permalink: result for result in results}
+        assert by_project["alpha"][1][0] == Repository(
+            "course", "course", "git@codebasehq.com:instil/course.git", disk_usage=1024
+        )
+        assert [repository.permalink for repository in by_project["alpha"][1]] == ["course", "solutions"]
+        assert by_project["beta"][1] == []
+        assert by_project["beta"][2] is None
+
+    def test_failures_are_reported_with_their_project(self):
+        with StubCodebase({}) as server:
+            (result,) = collect(project_repositories(make_client(server), [project("gone")]))
+
+        assert result[0].permalink == "gone"
+        assert result[1] == []
+        assert "404" in str(result[2])
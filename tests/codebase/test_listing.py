@@ -0,0 +1,86 @@
+from pathlib import Path
+
+from codebase.client import CodebaseClient
+from codebase.credentials import Credentials
+from codebase.listing import list_projects
+from tests.codebase.stub_server import StubCodebase, repositories_xml
+
+
+def make_client(server):
+    return CodebaseClient(Credentials("instil", "ryan", "secret", server.url), sleep=lambda s: None)
+
+
+class TestListProjects:
+
+    def test_prints_active_projects(self, capsys):
+        with StubCodebase() as server:
+            list_projects(client=make_client(server))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == "listing projects"
+        assert len(lines) == 8
+        assert all(line.endswith(", active)") for line in lines[1:])
+
+    def test_prints_archived_projects_with_all(self, capsys):
+        with StubCodebase() as server:
+            list_projects(include_archived=True, client=make_client(server))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 33
+        assert "* instil-software (instil-software, archived)" in lines
+
+    def test_empty_listing(self, capsys):
+        with StubCodebase(routes={"/projects": b'<projects type="array"></projects>'}) as server:
+            list_projects(client=make_client(server))
+
+        assert "no projects found" in capsys.readouterr().out
+
+    def test_api_errors_are_reported(self, capsys):
+        with StubCodebase(failures=[401]) as server:
+            list_projects(client=make_client(server))
+
+        assert "returned 401" in capsys.readouterr().out
+
+    def test_missing_credentials_are_reported(self, temp_dir, monkeypatch, capsys):
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+
+        list_projects()
+
+        assert "could not read Codebase credentials" in capsys.readouterr().out
+
+    def test_reads_credentials_from_the_home_directory(self, temp_dir, monkeypatch, capsys):
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+        with StubCodebase() as server:
+            (temp_dir / ".codebase").mkdir()
+            (temp_dir / ".codebase" / "credentials.toml").write_text(
+                f'account = "a"\nusername = "u"\napi_key = "k"\napi_url = "{server.url}"\n'
+            )
+
+            list_projects()
+
+        assert len(capsys.readouterr().out.splitlines()) == 8
+
+    def test_prints_repositories_for_each_project(self, capsys):
+        with StubCodebase() as server:
+            for permalink in ["instil-software", "visibility-check"]:
+                server.routes[f"/{permalink}/repositories"] = repositories_xml("course")
+            list_projects(include_archived=True, repositories=True, client=make_client(server))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert "listing repositories" in lines
+        assert "* instil-software: course" in lines
+        assert len([line for line in lines if "404" in line]) == 30
+
+    def test_search_lists_matching_projects(self, capsys):
+        with StubCodebase() as server:
+            list_projects(include_archived=True, search="typescript 2024", client=make_client(server))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) > 1
+        assert all("typescript" in line.lower() and "2024" in line for line in lines[1:])
+
+    def test_search_without_matches(self, capsys):
+        with StubCodebase() as server:
+            list_projects(search="cobol", client=make_client(server))
+
+        assert "no projects found" in capsys.readouterr().out
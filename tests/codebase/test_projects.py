@@ -0,0 +1,69 @@
+import io
+from pathlib import Path
+from xml.etree.ElementTree import ParseError
+
+import pytest
+
+from codebase.projects import Project, parse_projects, project_statuses
+
+FIXTURE = Path(__file__).parent.parent.parent / "fixturedata" / "projects.xml"
+
+
+class TestParseProjects:
+
+    def test_parses_every_project_in_the_fixture(self):
+        projects = list(parse_projects(FIXTURE))
+
+        assert len(projects) == 32
+        assert projects[1] == Project(
+            project_id=239069,
+            name="Fast Track to Java for .NET Developers - CME - October 2024",
+            status="archived",
+            permalink="fast-track-to-java-for-net-developers-cme-october-2024",
+            account_name="Instil Software",
+            disk_usage=17344,
+        )
+
+    def test_filters_on_status_while_streaming(self):
+        projects = list(parse_projects(FIXTURE, {"active"}))
+
+        assert len(projects) == 7
+        assert all(project.status == "active" for project in projects)
+
+    def test_parses_from_a_binary_stream(self):
+        with open(FIXTURE, "rb") as file:
+            projects = list(parse_projects(io.BytesIO(file.read())))
+
+        assert len(projects) == 32
+
+    def test_yields_projects_before_the_document_is_complete(self):
+        document = FIXTURE.read_bytes()
+        truncated = document[: document.index(b"</project>", 6000)] + b"</project><project>"
+        projects = parse_projects(io.BytesIO(truncated))
+
+        first = next(projects)
+
+        assert first.project_id == 239023
+        with pytest.raises(ParseError):
+            list(projects)
+
+    def test_missing_numbers_are_zero(self):
+        document = b"<projects><project><project-id>1</project-id><name>x</name>" \
+                   b"<status>active</status><permalink>x</permalink>" \
+                   b"<disk-usage type='integer'></disk-usage></project></projects>"
+
+        project, = parse_projects(io.BytesIO(document))
+
+        assert project.disk_usage == 0
+
+    def test_empty_listing(self):
+        assert list(parse_projects(io.BytesIO(b'<projects type="array"></projects>'))) == []
+
+
+class TestProjectStatuses:
+
+    def test_only_active_projects_by_default(self):
+        assert project_statuses() == {"active"}
+
+    def test_all_projects_include_archived(self):
+        assert project_statuses(include_archived=True) is None
@@ -88,8 +88,8 @@ def create_mock_template(temp_dir, monkeypatch, template_name, paths, excludes):
     with open(test_template, "w") as f:
         config.write(f)
     
-    # Patch templates list
-    monkeypatch.setattr(templates_module, "templates", [template_name])
+    # Patch the registry to search only the mock template directory
+    monkeypatch.setattr(templates_module, "registry", templates_module.TemplateRegistry([template_dir]))
 
 
 @pytest.fixture
@@ -148,6 +148,24 @@ def mock_config_dir(temp_dir):
     return config_dir
 
 
+@pytest.fixture
+def training_files():
+    """The files training_repo creates; override this fixture in a test module
+    or parametrize it to use other files."""
+    return {}
+
+
+@pytest.fixture
+def training_repo(temp_dir, mock_config_dir, monkeypatch, training_files):
+    """Create the training repo from training_files and point the config at it."""
+    import coursetools.config as config_module
+
+    monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+    monkeypatch.setattr(config_module, "CONFIG", None)
+    create_directory_structure(temp_dir, {"training-repo": training_files})
+    return temp_dir / "training-repo"
+
+
 @pytest.fixture
 def mock_repo_structure(temp_dir):
     repo_root = temp_dir / "training-repo"
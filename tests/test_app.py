@@ -107,3 +107,296 @@ class TestArgumentParsing:
 
         captured = capsys.readouterr()
         assert "listing templates" in captured.out
+
+    def test_jobs_option_is_passed_to_make_repo(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append((template, kwargs)))
+
+        parse_and_execute(["python", "--jobs", "4"])
+
+        assert calls[0][1]["jobs"] == 4
+
+    def test_metrics_json_option_is_passed_to_make_repo(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append((template, kwargs)))
+
+        parse_and_execute(["python", "--metrics-json", "metrics.json"])
+
+        assert calls[0][1]["metrics_json"] == "metrics.json"
+
+    def test_buffer_size_is_given_in_megabytes(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append((template, kwargs)))
+
+        parse_and_execute(["python", "--buffer-size", "8"])
+        parse_and_execute(["python"])
+
+        assert calls[0][1]["buffer_size"] == 8 * 1024 * 1024
+        assert calls[1][1]["buffer_size"] is None
+
+    @pytest.mark.parametrize("argv", [
+        ["python", "-j", "0"],
+        ["python", "--buffer-size", "-1"],
+        ["-p", "--repositories", "--concurrency", "0"],
+        ["-p", "--repositories", "--rate", "-5"],
+        ["-p", "--repositories", "--rate", "nan"],
+    ])
+    def test_counts_and_rates_must_be_above_zero(self, argv, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(argv)
+
+        assert "is not a number above 0" in capsys.readouterr().err
+
+    def test_delete_requires_sync(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--delete"])
+
+        captured = capsys.readouterr()
+        assert "require --sync" in captured.err
+
+
+class TestStartup:
+
+    def imported_modules(self, *args):
+        import subprocess
+        import sys
+        from pathlib import Path
+        import coursetools
+
+        script = (
+            "import sys\n"
+            "from coursetools.app import parse_and_execute\n"
+            "parse_and_execute(sys.argv[1:])\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        env = {"PYTHONPATH": str(Path(coursetools.__file__).parent.parent)}
+        result = subprocess.run(
+            [sys.executable, "-c", script, *args], capture_output=True, text=True, env=env, check=True
+        )
+        return result.stdout.splitlines()[-1].split()
+
+    def test_listing_does_not_import_the_copy_engine(self):
+        modules = self.imported_modules("-l")
+
+        assert "coursetools.repository" not in modules
+        assert "concurrent.futures" not in modules
+        assert "configparser" not in modules
+
+    def test_link_modes_match_the_copy_engine(self):
+        from coursetools.app import LINK_MODES
+        from coursetools.links import STRATEGIES
+
+        assert LINK_MODES == list(STRATEGIES)
+
+    def test_from_plan_replays_a_saved_plan(self, temp_dir, monkeypatch, capsys):
+        from coursetools.plan import CopyPlan
+
+        CopyPlan("saved").save(temp_dir / "plan.json")
+
+        parse_and_execute(["--from-plan", str(temp_dir / "plan.json"), "--dry-run"])
+
+        assert "plan for saved: 0 files" in capsys.readouterr().out
+
+    def test_build_option_needs_an_output_directory(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["--build", "python"])
+
+        assert "should be TEMPLATE=DIR" in capsys.readouterr().err
+
+    def test_build_options_are_passed_to_make_repos(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repos", lambda builds, **kwargs: calls.append(builds))
+
+        parse_and_execute(["--build", "python=out/python", "--build", "docker=out/docker"])
+
+        assert calls == [[("python", "out/python"), ("docker", "out/docker")]]
+
+    def test_archive_option_checks_the_extension(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--archive", "course.rar"])
+
+        assert "should end in .tar.gz" in capsys.readouterr().err
+
+    def test_project_option_lists_projects(self, monkeypatch):
+        import codebase.listing as listing_module
+        calls = []
+        monkeypatch.setattr(listing_module, "list_projects", lambda **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["-p"])
+        parse_and_execute(["--project", "--all"])
+
+        assert [call["include_archived"] for call in calls] == [False, True]
+        assert not calls[0]["refresh"] and not calls[0]["offline"]
+        assert not calls[0]["repositories"]
+
+    def test_repository_options_are_passed_to_the_listing(self, monkeypatch):
+        import codebase.listing as listing_module
+        calls = []
+        monkeypatch.setattr(listing_module, "list_projects", lambda **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["-p", "--repositories", "--concurrency", "16", "--rate", "5"])
+
+        assert calls[0]["repositories"]
+        assert calls[0]["concurrency"] == 16
+        assert calls[0]["rate"] == 5
+
+    def test_search_is_passed_to_the_listing(self, monkeypatch):
+        import codebase.listing as listing_module
+        calls = []
+        monkeypatch.setattr(listing_module, "list_projects", lambda **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["-p", "--all", "--search", "typescript 2024"])
+
+        assert calls[0]["search"] == "typescript 2024"
+
+    def test_refresh_and_offline_are_passed_to_the_listing(self, monkeypatch):
+        import codebase.listing as listing_module
+        calls = []
+        monkeypatch.setattr(listing_module, "list_projects", lambda **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["-p", "--refresh"])
+        parse_and_execute(["-p", "--offline"])
+
+        assert calls[0]["refresh"] and not calls[0]["offline"]
+        assert calls[1]["offline"] and not calls[1]["refresh"]
+
+    def test_refresh_and_offline_cannot_be_combined(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["-p", "--refresh", "--offline"])
+
+        assert "not allowed with" in capsys.readouterr().err
+
+    def test_source_git_lists_files_with_git(self, mock_config_dir, monkeypatch):
+        from pathlib import Path
+        import coursetools.config as config_module
+        import coursetools.repository as repository_module
+        from coursetools.gitfiles import GitFiles
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        monkeypatch.setattr(config_module, "CONFIG", None)
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["python", "--source", "git"])
+
+        assert isinstance(calls[0]["index"], GitFiles)
+
+    def test_index_cannot_be_combined_with_source_git(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--index", "--source", "git"])
+
+        assert "--source git" in capsys.readouterr().err
+
+    def test_git_init_cannot_be_combined_with_sync(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--git-init", "--sync"])
+
+        assert "--git-init can't be combined" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("option", [["-j", "4"], ["--metrics-json", "m.json"], ["--buffer-size", "8"]])
+    def test_git_init_cannot_be_combined_with_copy_options(self, option, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--git-init", *option])
+
+        assert "--git-init can't be combined" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("option", [
+        ["--sync"], ["--link-mode", "reflink"], ["--metrics-json", "m.json"], ["--buffer-size", "8"]
+    ])
+    def test_archive_cannot_be_combined_with_copy_options(self, option, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--archive", "course.zip", *option])
+
+        assert "--archive can't be combined with --sync, --link-mode, --metrics-json or --buffer-size" in capsys.readouterr().err
+
+    def test_archive_can_be_streamed_on_several_jobs(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["python", "--archive", "course.zip", "-j", "4"])
+
+        assert calls[0]["archive"] == "course.zip"
+        assert calls[0]["jobs"] == 4
+
+    def test_watch_options_are_passed_to_watch_repo(self, monkeypatch):
+        import coursetools.watch as watch_module
+        calls = []
+        monkeypatch.setattr(watch_module, "watch_repo", lambda template, **kwargs: calls.append((template, kwargs)))
+
+        parse_and_execute(["python", "--watch", "--link-mode", "auto"])
+
+        assert calls[0][0] == "python"
+        assert calls[0][1]["link_mode"] == "auto"
+
+    def test_watch_cannot_be_combined_with_archive(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--watch", "--archive", "course.zip"])
+
+        assert "--watch can't be combined" in capsys.readouterr().err
+
+    def test_preflight_only_exits_with_an_error_when_a_check_fails(self, monkeypatch):
+        import coursetools.preflight as preflight_module
+        calls = []
+        monkeypatch.setattr(preflight_module, "preflight_templates", lambda names, **kwargs: calls.append(names))
+
+        with pytest.raises(SystemExit) as exit_info:
+            parse_and_execute(["--preflight-only"])
+
+        assert exit_info.value.code == 1
+        assert calls == [None]
+
+    def test_preflight_only_checks_the_given_template(self, monkeypatch):
+        import coursetools.preflight as preflight_module
+        calls = []
+        monkeypatch.setattr(preflight_module, "preflight_templates", lambda names, **kwargs: calls.append(names) or True)
+
+        parse_and_execute(["python", "--preflight-only"])
+
+        assert calls == [["python"]]
+
+    def test_verify_takes_a_template_and_a_directory(self, monkeypatch):
+        import coursetools.manifest as manifest_module
+        calls = []
+        monkeypatch.setattr(manifest_module, "verify_template", lambda *args: calls.append(args))
+
+        with pytest.raises(SystemExit):
+            parse_and_execute(["--verify", "python", "out", "--manifest", "manifest.json", "-j", "4"])
+
+        assert calls == [("python", "out", "manifest.json", 4, None)]
+
+    def test_manifest_cannot_be_combined_with_archive(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--manifest", "m.json", "--archive", "course.zip"])
+
+        assert "--manifest can't be combined" in capsys.readouterr().err
+
+    def test_manifest_cannot_be_combined_with_a_batch(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["--build", "python=c/py", "--manifest", "m.json"])
+
+        assert "--manifest can't be combined with --archive, --git-init, --batch or --build" in capsys.readouterr().err
+
+    def test_resume_is_passed_to_make_repo(self, monkeypatch):
+        import coursetools.repository as repository_module
+        calls = []
+        monkeypatch.setattr(repository_module, "make_repo", lambda template, **kwargs: calls.append(kwargs))
+
+        parse_and_execute(["python", "--resume"])
+
+        assert calls[0]["resume"]
+
+    def test_resume_cannot_be_combined_with_sync(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["python", "--resume", "--sync"])
+
+        assert "--resume can't be combined" in capsys.readouterr().err
+
+    def test_resume_cannot_be_combined_with_a_replayed_plan(self, capsys):
+        with pytest.raises(SystemExit):
+            parse_and_execute(["--from-plan", "plan.json", "--resume"])
+
+        assert "--resume can't be combined with --sync, --archive, --git-init or --from-plan" in capsys.readouterr().err
@@ -0,0 +1,94 @@
+import gzip
+import io
+import tarfile
+import zipfile
+from shutil import copy, copy2
+
+import pytest
+
+from coursetools.archive import ParallelGzipWriter, archive_format, write_archive
+from coursetools.copier import DirectoryCopy, FileCopy
+from coursetools.plan import CopyPlan
+from tests import create_directory_structure
+
+
+def make_plan(temp_dir):
+    create_directory_structure(temp_dir, {
+        "training-repo": {"src": {"a.py": "aaa", "empty": {}}, "requirements.txt": "pytest"}
+    })
+    source = temp_dir / "training-repo"
+    out = temp_dir / "out"
+    plan = CopyPlan("test")
+    plan.add_directory(DirectoryCopy(source / "src", out / "examples", ""))
+    plan.add_directory(DirectoryCopy(source / "src" / "empty", out / "examples" / "empty", "empty/"))
+    plan.add_file(FileCopy(source / "src" / "a.py", out / "examples" / "a.py", copy2, "/src", 3))
+    plan.add_file(FileCopy(source / "requirements.txt", out / "requirements.txt", copy, "/requirements.txt", 6))
+    return plan, out
+
+
+class TestWriteArchive:
+
+    @pytest.mark.parametrize("name, jobs", [("course.tar.gz", None), ("course.tar.gz", 1), ("course.tar", None)])
+    def test_tar_archives_hold_the_mapped_files(self, temp_dir, name, jobs):
+        plan, out = make_plan(temp_dir)
+
+        stats = write_archive(plan, temp_dir / name, root=out, jobs=jobs)
+
+        with tarfile.open(temp_dir / name) as tar:
+            assert sorted(tar.getnames()) == [
+                "examples", "examples/a.py", "examples/empty", "requirements.txt"
+            ]
+            assert tar.extractfile("examples/a.py").read() == b"aaa"
+        assert stats.files == 2
+        assert stats.size == 9
+        assert not out.exists()
+
+    def test_zip_archives_hold_the_mapped_files(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+
+        write_archive(plan, temp_dir / "course.zip", root=out)
+
+        with zipfile.ZipFile(temp_dir / "course.zip") as archive:
+            assert "examples/empty/" in archive.namelist()
+            assert archive.read("requirements.txt") == b"pytest"
+
+    def test_files_outside_the_root_are_rejected(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+
+        with pytest.raises(ValueError):
+            write_archive(plan, temp_dir / "course.zip", root=out / "examples")
+
+
+class TestArchiveFormat:
+
+    @pytest.mark.parametrize("name, expected", [
+        ("a.tar.gz", "tar.gz"), ("a.tgz", "tar.gz"), ("a.tar", "tar"), ("a.zip", "zip")
+    ])
+    def test_formats_come_from_the_extension(self, name, expected):
+        assert archive_format(name) == expected
+
+    def test_unknown_extensions_are_rejected(self):
+        with pytest.raises(ValueError):
+            archive_format("course.rar")
+
+
+class TestParallelGzipWriter:
+
+    def test_output_decompresses_to_the_input(self):
+        data = bytes(range(256)) * 1000
+        buffer = io.BytesIO()
+        writer = ParallelGzipWriter(buffer, jobs=4, block_size=1000)
+
+        for start in range(0, len(data), 777):
+            writer.write(data[start:start + 777])
+        writer.close()
+
+        assert gzip.decompress(buffer.getvalue()) == data
+
+    def test_empty_output_is_valid_gzip(self):
+        buffer = io.BytesIO()
+        writer = ParallelGzipWriter(buffer)
+
+        writer.close()
+
+        assert gzip.decompress(buffer.getvalue()) == b""
@@ -0,0 +1,35 @@
+import pytest
+
+from coursetools.batch import load_batch, parse_build
+
+
+class TestLoadBatch:
+
+    def test_sections_are_builds(self, temp_dir):
+        batch_file = temp_dir / "batch.ini"
+        batch_file.write_text(
+            "[typescript]\noutput = courses/ts\n\n"
+            "[react]\ntemplate = typescript-react\noutput = courses/react\n"
+        )
+
+        assert load_batch(batch_file) == [
+            ("typescript", "courses/ts"),
+            ("typescript-react", "courses/react"),
+        ]
+
+    def test_output_defaults_to_section_name(self, temp_dir):
+        batch_file = temp_dir / "batch.ini"
+        batch_file.write_text("[python]\n")
+
+        assert load_batch(batch_file) == [("python", "python")]
+
+
+class TestParseBuild:
+
+    def test_splits_template_and_directory(self):
+        assert parse_build("python=courses/python") == ("python", "courses/python")
+
+    @pytest.mark.parametrize("build", ["python", "=out", "python="])
+    def test_rejects_incomplete_builds(self, build):
+        with pytest.raises(ValueError):
+            parse_build(build)
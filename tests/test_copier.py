@@ -0,0 +1,114 @@
+from shutil import copy, copy2
+
+import pytest
+
+from coursetools.copier import CopyStats, FileCopy, copy_files
+from tests import create_directory_structure
+
+
+class TestCopyFiles:
+
+    def test_copy_files_copies_every_file(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "source": {"a.txt": "aaa", "b.txt": "bb"},
+            "dest": {}
+        })
+        copies = [
+            FileCopy(temp_dir / "source" / name, temp_dir / "dest" / name, copy2)
+            for name in ["a.txt", "b.txt"]
+        ]
+
+        copy_files(copies, jobs=2)
+
+        assert (temp_dir / "dest" / "a.txt").read_text() == "aaa"
+        assert (temp_dir / "dest" / "b.txt").read_text() == "bb"
+
+    def test_copy_files_counts_files_and_bytes(self, temp_dir):
+        create_directory_structure(temp_dir, {"source": {"a.txt": "aaa", "b.txt": "bb"}})
+        copies = [
+            FileCopy(temp_dir / "source" / name, temp_dir / f"copy-{name}", copy)
+            for name in ["a.txt", "b.txt"]
+        ]
+
+        stats = copy_files(copies, jobs=1)
+
+        assert stats.files == 2
+        assert stats.size == 5
+
+    def test_an_interrupt_cancels_the_copies_not_yet_started(self, temp_dir):
+        names = [f"{number}.txt" for number in range(50)]
+        create_directory_structure(temp_dir, {"source": {name: "x" for name in names}, "dest": {}})
+        copies = [FileCopy(temp_dir / "source" / name, temp_dir / "dest" / name, copy2) for name in names]
+
+        def interrupt(results):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            copy_files(copies, jobs=1, progress=interrupt)
+
+        assert len(list((temp_dir / "dest").iterdir())) < len(names)
+
+    def test_copy_files_with_nothing_to_copy(self):
+        stats = copy_files([])
+
+        assert stats.files == 0
+        assert stats.size == 0
+
+
+class TestCopyStats:
+
+    def test_rates(self):
+        stats = CopyStats(files=10, size=4 * 1024 * 1024, elapsed=2.0)
+
+        assert stats.files_per_second() == 5
+        assert stats.megabytes_per_second() == 2
+
+    def test_rates_with_no_elapsed_time(self):
+        stats = CopyStats(files=0, size=0, elapsed=0.0)
+
+        assert stats.files_per_second() == 0
+        assert stats.megabytes_per_second() == 0
+
+    def test_report_mentions_throughput(self):
+        report = str(CopyStats(files=10, size=4 * 1024 * 1024, elapsed=2.0))
+
+        assert "copied 10 files" in report
+        assert "files/sec" in report
+        assert "MB/sec" in report
+
+
+class TestCopyFilesLinkModes:
+
+    def test_strategies_are_counted_per_origin(self, temp_dir):
+        create_directory_structure(temp_dir, {"source": {"a.txt": "aaa", "b.txt": "bb"}})
+        copies = [
+            FileCopy(temp_dir / "source" / name, temp_dir / f"copy-{name}", copy, "/source")
+            for name in ["a.txt", "b.txt"]
+        ]
+
+        stats = copy_files(copies, link_mode="hardlink")
+
+        assert stats.strategies == {("/source", "hardlink"): 2}
+        assert stats.strategy_report() == ["/source: hardlink 2"]
+
+
+class TestCopyFilesSharedSources:
+
+    def test_shared_source_is_read_once_for_every_destination(self, temp_dir, monkeypatch):
+        import builtins
+        create_directory_structure(temp_dir, {"source": {"a.txt": "aaa"}, "one": {}, "two": {}})
+        source = temp_dir / "source" / "a.txt"
+        copies = [FileCopy(source, temp_dir / name / "a.txt", copy2) for name in ["one", "two"]]
+        reads = []
+        original_open = builtins.open
+        monkeypatch.setattr(
+            builtins, "open",
+            lambda file, mode="r", *args, **kwargs: (reads.append(file) if mode == "rb" else None)
+            or original_open(file, mode, *args, **kwargs)
+        )
+
+        stats = copy_files(copies)
+
+        assert reads.count(source) == 1
+        assert stats.files == 2
+        assert (temp_dir / "two" / "a.txt").read_text() == "aaa"
@@ -0,0 +1,84 @@
+import pytest
+
+from coursetools.excludes import ExcludeMatcher, walk
+from tests import create_directory_structure
+
+
+class TestExcludeMatcher:
+
+    @pytest.mark.parametrize("path, is_dir", [
+        ("node_modules", True),
+        ("examples/node_modules", True),
+        ("notes.old", False),
+        ("examples/deep/notes.old", False),
+    ])
+    def test_name_patterns_match_at_any_depth(self, path, is_dir):
+        matcher = ExcludeMatcher(["node_modules", "*.old"])
+
+        assert matcher.excludes(path, is_dir)
+
+    def test_name_patterns_match_whole_names(self):
+        matcher = ExcludeMatcher(["node_modules", "*.old"])
+
+        assert not matcher.excludes("node_modules_backup", True)
+        assert not matcher.excludes("notes.old.txt")
+
+    def test_leading_slash_anchors_to_root(self):
+        matcher = ExcludeMatcher(["/archive"])
+
+        assert matcher.excludes("archive", True)
+        assert not matcher.excludes("examples/archive", True)
+
+    def test_double_star_matches_any_directories(self):
+        matcher = ExcludeMatcher(["docs/**/*.md"])
+
+        assert matcher.excludes("docs/readme.md")
+        assert matcher.excludes("docs/a/b/readme.md")
+        assert not matcher.excludes("src/docs/readme.md")
+
+    def test_trailing_slash_matches_only_directories(self):
+        matcher = ExcludeMatcher(["build/"])
+
+        assert matcher.excludes("build", is_dir=True)
+        assert not matcher.excludes("build", is_dir=False)
+
+    def test_character_classes(self):
+        matcher = ExcludeMatcher(["[!a]b.txt"])
+
+        assert matcher.excludes("bb.txt")
+        assert not matcher.excludes("ab.txt")
+
+    def test_match_returns_the_matching_pattern(self):
+        matcher = ExcludeMatcher(["node_modules", "*.old"])
+
+        assert matcher.match("x/y.old") == "*.old"
+        assert matcher.match("x/y.py") is None
+
+    def test_no_patterns_excludes_nothing(self):
+        assert not ExcludeMatcher([]).excludes("anything")
+
+
+class TestWalk:
+
+    def test_walk_yields_kept_entries_with_directories_first(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "a.py": "",
+            "sub": {"b.py": "", "c.old": ""},
+            "node_modules": {"d.js": ""}
+        })
+
+        found = [(relative, is_dir) for relative, _, is_dir in walk(temp_dir, ExcludeMatcher(["node_modules", "*.old"]))]
+
+        assert sorted(found) == [("a.py", False), ("sub", True), ("sub/b.py", False)]
+        assert found.index(("sub", True)) < found.index(("sub/b.py", False))
+
+    def test_walk_never_opens_excluded_directories(self, temp_dir, monkeypatch):
+        import os
+        create_directory_structure(temp_dir, {"keep": {"a.py": ""}, "node_modules": {"b.js": ""}})
+        opened = []
+        original_scandir = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda path: opened.append(str(path)) or original_scandir(path))
+
+        list(walk(temp_dir, ExcludeMatcher(["node_modules"])))
+
+        assert not any("node_modules" in path for path in opened)
@@ -0,0 +1,100 @@
+import os
+import subprocess
+from collections import Counter
+
+import pytest
+
+from coursetools.excludes import ExcludeMatcher
+from coursetools.gitfiles import GitFiles
+from tests import create_directory_structure
+
+
+def git(repo, *arguments):
+    subprocess.run(["git", "-C", str(repo), *arguments], check=True, capture_output=True)
+
+
+@pytest.fixture
+def git_repo(temp_dir):
+    repo = temp_dir / "training-repo"
+    create_directory_structure(repo, {
+        "examples": {
+            "one.py": "print(1)",
+            "notes.old": "old",
+            "package": {"two.py": "print(2)"},
+            "build": {"tracked.txt": "tracked"},
+        },
+        "README.md": "readme",
+    })
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    create_directory_structure(repo, {
+        "examples": {"node_modules": {"left-pad.js": ""}, "untracked.py": ""}
+    })
+    return repo
+
+
+def entries(repo, source, excludes=(), excluded=None):
+    files = GitFiles(repo)
+    return list(files.entries(repo / source, ExcludeMatcher(list(excludes)), excluded))
+
+
+class TestGitFiles:
+
+    def test_lists_tracked_files_and_their_directories(self, git_repo):
+        listed = entries(git_repo, "examples")
+
+        assert [(relative, is_dir) for relative, _, is_dir, _ in listed] == [
+            ("build", True),
+            ("build/tracked.txt", False),
+            ("notes.old", False),
+            ("one.py", False),
+            ("package", True),
+            ("package/two.py", False),
+        ]
+
+    def test_names_that_are_not_utf8_are_listed(self, git_repo):
+        name = os.fsdecode(b"caf\xe9.py")
+        (git_repo / "examples" / name).write_text("")
+        git(git_repo, "add", "examples")
+
+        listed = entries(git_repo, "examples")
+
+        assert (name, False) in [(relative, is_dir) for relative, _, is_dir, _ in listed]
+
+    def test_untracked_files_are_never_seen(self, git_repo):
+        names = [relative for relative, _, _, _ in entries(git_repo, "examples")]
+
+        assert "untracked.py" not in names
+        assert not any(name.startswith("node_modules") for name in names)
+
+    def test_entries_have_full_paths_and_sizes(self, git_repo):
+        listed = {relative: (path, size) for relative, path, _, size in entries(git_repo, "examples")}
+
+        assert listed["one.py"] == (str(git_repo / "examples" / "one.py"), 8)
+
+    def test_excludes_apply_to_tracked_files(self, git_repo):
+        excluded = Counter()
+
+        listed = entries(git_repo, "examples", ["*.old", "build"], excluded)
+
+        assert [relative for relative, _, _, _ in listed] == ["one.py", "package", "package/two.py"]
+        assert excluded == {"*.old": 1, "build": 1}
+
+    def test_deleted_files_are_skipped(self, git_repo):
+        (git_repo / "examples" / "one.py").unlink()
+
+        names = [relative for relative, _, _, _ in entries(git_repo, "examples")]
+
+        assert "one.py" not in names
+
+    def test_covers_paths_inside_a_checkout(self, git_repo, temp_dir):
+        files = GitFiles(git_repo)
+
+        assert files.covers(git_repo / "examples")
+        assert not files.covers(temp_dir / "elsewhere")
+
+    def test_a_directory_that_is_not_a_checkout_is_walked(self, temp_dir, capsys):
+        (temp_dir / "plain").mkdir()
+
+        assert not GitFiles(temp_dir / "plain").covers(temp_dir / "plain")
+        assert "is not a git checkout" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import subprocess
+from shutil import copy, copy2
+
+import pytest
+
+from coursetools.copier import DirectoryCopy, FileCopy
+from coursetools.gitinit import GitInitError, init_repository, quote_path
+from coursetools.plan import CopyPlan
+from tests import create_directory_structure
+
+
+def git(repo, *arguments):
+    result = subprocess.run(["git", "-C", str(repo), *arguments], capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def make_plan(temp_dir):
+    create_directory_structure(temp_dir, {
+        "training-repo": {
+            "src": {"a.py": "aaa", "run.sh": "#!/bin/sh\n", "empty": {}},
+            "requirements.txt": "pytest",
+        }
+    })
+    source = temp_dir / "training-repo"
+    (source / "src" / "run.sh").chmod(0o755)
+    out = temp_dir / "out"
+    plan = CopyPlan("test")
+    plan.add_directory(DirectoryCopy(source / "src", out / "examples", ""))
+    plan.add_directory(DirectoryCopy(source / "src" / "empty", out / "examples" / "empty", "empty/"))
+    for name, size in [("a.py", 3), ("run.sh", 10)]:
+        plan.add_file(FileCopy(source / "src" / name, out / "examples" / name, copy2, "/src", size))
+    plan.add_file(FileCopy(source / "requirements.txt", out / "requirements.txt", copy, "/requirements.txt", 6))
+    return plan, out
+
+
+class TestInitRepository:
+
+    def test_commits_every_planned_file(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+
+        stats = init_repository(plan, out)
+
+        assert git(out, "ls-tree", "-r", "--name-only", "HEAD").split() == [
+            "examples/a.py", "examples/run.sh", "requirements.txt"
+        ]
+        assert git(out, "rev-list", "--count", "HEAD").strip() == "1"
+        assert "test course" in git(out, "log", "--format=%s")
+        assert stats.files == 3
+        assert stats.size == 19
+
+    def test_checks_out_a_clean_working_tree(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+
+        init_repository(plan, out)
+
+        assert (out / "examples" / "a.py").read_text() == "aaa"
+        assert (out / "requirements.txt").read_text() == "pytest"
+        assert git(out, "status", "--porcelain") == ""
+
+    def test_keeps_executable_bits_and_empty_directories(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+
+        init_repository(plan, out)
+
+        assert "100755" in git(out, "ls-tree", "HEAD", "examples/run.sh")
+        assert (out / "examples" / "empty").is_dir()
+
+    def test_refuses_an_existing_repository(self, temp_dir):
+        plan, out = make_plan(temp_dir)
+        out.mkdir()
+        git(out, "init", "-q")
+
+        with pytest.raises(GitInitError, match="already a git repository"):
+            init_repository(plan, out)
+
+    def test_unusual_file_names(self, temp_dir):
+        create_directory_structure(temp_dir, {"training-repo": {'say "hi".txt': "hi"}})
+        out = temp_dir / "out"
+        plan = CopyPlan("test")
+        plan.add_file(FileCopy(temp_dir / "training-repo" / 'say "hi".txt', out / 'say "hi".txt', copy, "/", 2))
+
+        init_repository(plan, out)
+
+        assert (out / 'say "hi".txt').read_text() == "hi"
+        assert git(out, "status", "--porcelain") == ""
+
+
+class TestQuotePath:
+
+    def test_plain_names_are_unquoted(self):
+        assert quote_path("examples/a b.py") == b"examples/a b.py"
+
+    def test_quotes_and_backslashes_are_escaped(self):
+        assert quote_path('a"b\\c') == b'"a\\"b\\\\c"'
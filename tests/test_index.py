@@ -0,0 +1,154 @@
+import os
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from coursetools.excludes import ExcludeMatcher
+from coursetools.index import FileIndex, index_path, open_index
+from coursetools.sync import file_digest
+from tests import create_directory_structure
+
+
+@pytest.fixture
+def repo(temp_dir):
+    create_directory_structure(temp_dir, {
+        "repo": {
+            "Python": {
+                "examples": {"a.py": "aaa", "node_modules": {"x.js": ""}, "sub": {"b.py": "bb"}},
+                "notes.old": ""
+            },
+            "Java": {"Main.java": ""}
+        }
+    })
+    return temp_dir / "repo"
+
+
+@pytest.fixture
+def index(temp_dir, repo):
+    file_index = FileIndex(temp_dir / "index.sqlite3", repo)
+    yield file_index
+    file_index.close()
+
+
+def listed(index, source, excludes=()):
+    return [
+        (relative, is_dir, size)
+        for relative, _, is_dir, size in index.entries(source, ExcludeMatcher(excludes))
+    ]
+
+
+class TestFileIndex:
+
+    def test_entries_list_a_subtree_parents_first(self, index, repo):
+        assert listed(index, repo / "Python") == [
+            ("examples", True, 0),
+            ("examples/a.py", False, 3),
+            ("examples/node_modules", True, 0),
+            ("examples/node_modules/x.js", False, 0),
+            ("examples/sub", True, 0),
+            ("examples/sub/b.py", False, 2),
+            ("notes.old", False, 0),
+        ]
+
+    def test_entries_apply_excludes_and_prune_excluded_directories(self, index, repo):
+        excluded = Counter()
+
+        entries = list(index.entries(repo / "Python", ExcludeMatcher(["node_modules", "*.old"]), excluded))
+
+        assert [relative for relative, *_ in entries] == ["examples", "examples/a.py", "examples/sub", "examples/sub/b.py"]
+        assert excluded == {"node_modules": 1, "*.old": 1}
+
+    def test_refresh_picks_up_added_and_removed_files(self, index, repo):
+        index.refresh()
+        (repo / "Java" / "Added.java").write_text("")
+        (repo / "Java" / "Main.java").unlink()
+
+        assert listed(index, repo / "Java") == [("Added.java", False, 0)]
+
+    def test_refresh_forgets_removed_directories(self, index, repo):
+        index.refresh()
+        (repo / "Python" / "examples" / "sub" / "b.py").unlink()
+        (repo / "Python" / "examples" / "sub").rmdir()
+
+        assert ("examples/sub", True, 0) not in listed(index, repo / "Python")
+
+    def test_refresh_only_lists_changed_directories(self, index, repo, monkeypatch):
+        import coursetools.index as index_module
+        index.refresh()
+        (repo / "Java" / "Added.java").write_text("")
+        scanned = []
+        original = index_module.scan_directory
+        monkeypatch.setattr(index_module, "scan_directory", lambda path: scanned.append(Path(path)) or original(path))
+
+        index.refresh()
+
+        assert scanned == [repo / "Java"]
+
+    def test_cached_index_does_not_touch_the_filesystem(self, temp_dir, repo, monkeypatch):
+        FileIndex(temp_dir / "index.sqlite3", repo).refresh()
+        cached = FileIndex(temp_dir / "index.sqlite3", repo, refresh=False)
+        monkeypatch.setattr(os, "stat", None)
+        monkeypatch.setattr(os, "scandir", None)
+
+        assert listed(cached, repo / "Java") == [("Main.java", False, 0)]
+
+    def test_cached_index_scans_a_source_it_has_never_seen(self, temp_dir, repo):
+        cached = FileIndex(temp_dir / "index.sqlite3", repo, refresh=False)
+
+        assert listed(cached, repo / "Java") == [("Main.java", False, 0)]
+
+    def test_cached_index_scans_directories_left_unscanned(self, temp_dir, repo):
+        from coursetools.index import UNSCANNED
+
+        index = FileIndex(temp_dir / "index.sqlite3", repo)
+        index.refresh()
+        index.forget("Python/examples")
+        index.save_directory("Python/examples", "Python", UNSCANNED)
+        index.connection.commit()
+        cached = FileIndex(temp_dir / "index.sqlite3", repo, refresh=False)
+
+        assert ("examples/sub/b.py", False, 2) in listed(cached, repo / "Python")
+
+    def test_hashes_are_recorded_when_asked_for(self, temp_dir, repo):
+        index = FileIndex(temp_dir / "index.sqlite3", repo, hash_files=True)
+        index.refresh()
+
+        (digest,) = index.connection.execute("SELECT digest FROM files WHERE path = 'Python/examples/a.py'").fetchone()
+        assert len(digest) == 128
+
+    def test_recorded_digests_are_returned_while_the_file_is_unchanged(self, temp_dir, repo):
+        index = FileIndex(temp_dir / "index.sqlite3", repo, hash_files=True)
+        index.refresh()
+        a, b = repo / "Python" / "examples" / "a.py", repo / "Python" / "examples" / "sub" / "b.py"
+        b.write_text("edited in place")
+
+        assert index.digests([a, b, repo / "Java" / "Main.java"]) == {
+            a: file_digest(a),
+            repo / "Java" / "Main.java": file_digest(repo / "Java" / "Main.java"),
+        }
+
+    def test_files_indexed_without_digests_are_hashed_once_asked_for(self, temp_dir, repo):
+        FileIndex(temp_dir / "index.sqlite3", repo).refresh()
+        index = FileIndex(temp_dir / "index.sqlite3", repo, hash_files=True)
+
+        index.refresh()
+
+        assert repo / "Java" / "Main.java" in index.digests([repo / "Java" / "Main.java"])
+
+    def test_sources_outside_the_root_are_not_covered(self, index, temp_dir):
+        assert not index.covers(temp_dir / "elsewhere")
+
+
+class TestOpenIndex:
+
+    def test_index_lives_under_the_home_directory(self, temp_dir, repo, monkeypatch):
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+
+        open_index(repo).close()
+
+        assert index_path(repo).exists()
+        assert index_path(repo).parent == temp_dir / ".coursetools" / "index"
+
+    def test_each_repo_root_gets_its_own_index(self, temp_dir):
+        assert index_path(temp_dir / "one") != index_path(temp_dir / "two")
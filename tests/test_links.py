@@ -0,0 +1,145 @@
+import errno
+import os
+from shutil import copy, copy2
+
+import pytest
+
+from coursetools.copier import FileCopy
+from coursetools.links import UnsupportedLink, link_file, probe_link_mode
+
+
+def make_copy(temp_dir, copy_function=copy2):
+    source = temp_dir / "source.txt"
+    source.write_text("content")
+    return FileCopy(source, temp_dir / "dest.txt", copy_function)
+
+
+class TestLinkFile:
+
+    def test_copy_mode_copies(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+
+        assert link_file(file_copy, "copy") == "copy"
+        assert (temp_dir / "dest.txt").read_text() == "content"
+        assert not os.path.samefile(file_copy.source, file_copy.destination)
+
+    def test_hardlink_mode_links(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+
+        assert link_file(file_copy, "hardlink") == "hardlink"
+        assert os.path.samefile(file_copy.source, file_copy.destination)
+
+    def test_hardlink_replaces_existing_destination(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+        (temp_dir / "dest.txt").write_text("old")
+
+        link_file(file_copy, "hardlink")
+
+        assert (temp_dir / "dest.txt").read_text() == "content"
+
+    def test_auto_mode_falls_back_to_a_working_strategy(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+
+        strategy = link_file(file_copy, "auto")
+
+        assert strategy in ["reflink", "copy_file_range", "copy"]
+        assert (temp_dir / "dest.txt").read_text() == "content"
+
+    def test_auto_mode_keeps_copy2_metadata(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+        os.utime(file_copy.source, (1000, 1000))
+
+        link_file(file_copy, "auto")
+
+        assert os.stat(file_copy.destination).st_mtime == 1000
+
+    def test_copying_over_a_hardlink_leaves_the_source_intact(self, temp_dir):
+        file_copy = make_copy(temp_dir, copy)
+        link_file(file_copy, "hardlink")
+
+        link_file(file_copy, "auto")
+
+        assert file_copy.source.read_text() == "content"
+        assert not os.path.samefile(file_copy.source, file_copy.destination)
+
+    def test_reflink_without_filesystem_support_is_unsupported(self, temp_dir, monkeypatch):
+        import fcntl
+
+        def ioctl(*args):
+            raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+        monkeypatch.setattr(fcntl, "ioctl", ioctl)
+        file_copy = make_copy(temp_dir)
+
+        with pytest.raises(UnsupportedLink, match="reflink is not supported on this filesystem"):
+            link_file(file_copy, "reflink")
+        assert not file_copy.destination.exists()
+
+    def test_unknown_mode_is_rejected(self, temp_dir):
+        with pytest.raises(KeyError):
+            link_file(make_copy(temp_dir), "symlink")
+
+
+class TestProbeLinkMode:
+
+    def test_a_supported_mode_leaves_nothing_behind(self, temp_dir):
+        file_copy = make_copy(temp_dir)
+        file_copy = file_copy._replace(destination=temp_dir / "new" / "dest.txt")
+
+        probe_link_mode("hardlink", file_copy)
+
+        assert sorted(os.listdir(temp_dir)) == ["source.txt"]
+
+    def test_an_unsupported_mode_is_raised(self, temp_dir, monkeypatch):
+        def link(source, destination):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(os, "link", link)
+
+        with pytest.raises(UnsupportedLink, match="hardlink is not supported"):
+            probe_link_mode("hardlink", make_copy(temp_dir))
+
+    def test_modes_that_fall_back_are_not_probed(self, temp_dir):
+        probe_link_mode("auto", make_copy(temp_dir)._replace(source=temp_dir / "missing"))
+
+
+class TestChunkedCopy:
+
+    def make_large_copy(self, temp_dir, size):
+        source = temp_dir / "large.bin"
+        source.write_bytes(os.urandom(size))
+        return FileCopy(source, temp_dir / "copy.bin", copy2, "/", size)
+
+    def test_large_files_are_copied_in_chunks(self, temp_dir, monkeypatch):
+        import coursetools.links as links_module
+
+        monkeypatch.setattr(links_module, "LARGE_FILE_SIZE", 1000)
+        file_copy = self.make_large_copy(temp_dir, 5000)
+
+        assert link_file(file_copy, "copy", buffer_size=1024) == "chunked"
+        assert file_copy.destination.read_bytes() == file_copy.source.read_bytes()
+        assert os.stat(file_copy.destination).st_mtime == os.stat(file_copy.source).st_mtime
+
+    def test_small_files_use_a_plain_copy(self, temp_dir):
+        file_copy = self.make_large_copy(temp_dir, 100)
+
+        assert link_file(file_copy, "copy") == "copy"
+
+    def test_falls_back_to_a_reused_buffer_without_sendfile(self, temp_dir, monkeypatch):
+        from coursetools.links import chunked_copy
+
+        monkeypatch.delattr(os, "sendfile")
+        file_copy = self.make_large_copy(temp_dir, 5000)
+
+        chunked_copy(file_copy, buffer_size=1024)
+
+        assert file_copy.destination.read_bytes() == file_copy.source.read_bytes()
+
+    def test_empty_files(self, temp_dir):
+        from coursetools.links import chunked_copy
+
+        file_copy = self.make_large_copy(temp_dir, 0)
+
+        chunked_copy(file_copy)
+
+        assert file_copy.destination.read_bytes() == b""
@@ -0,0 +1,155 @@
+import json
+from pathlib import Path
+from shutil import copy2
+
+import pytest
+
+from coursetools.copier import FileCopy
+from coursetools.manifest import (
+    ExpectedFile,
+    hash_files,
+    load_manifest,
+    verify_directory,
+    verify_template,
+    write_manifest,
+)
+from coursetools.sync import file_digest
+from tests import create_directory_structure, create_mock_template
+
+
+@pytest.fixture
+def course(temp_dir):
+    create_directory_structure(temp_dir, {
+        "course": {"a.py": "aaa", "docs": {"b.md": "bb"}, ".git": {"HEAD": "ref"}, "c.old": "old"}
+    })
+    return temp_dir / "course"
+
+
+@pytest.fixture
+def training_files():
+    return {"examples": {"a.py": "aaa", "docs": {"b.md": "bb"}, "skip.old": "old"}}
+
+
+@pytest.fixture
+def training_repo(training_repo, temp_dir, monkeypatch):
+    create_mock_template(temp_dir, monkeypatch, "verified", paths={"/examples": "."}, excludes={"*.old": ""})
+    return training_repo
+
+
+class TestHashFiles:
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_digests_come_back_in_order(self, course, jobs):
+        paths = [course / "a.py", course / "docs" / "b.md", course / "c.old"]
+
+        assert hash_files(paths, jobs) == [file_digest(path) for path in paths]
+
+    def test_no_files_need_no_pool(self):
+        assert hash_files([]) == []
+
+
+class TestManifest:
+
+    def test_records_path_size_and_digest_relative_to_the_root(self, course, temp_dir):
+        copies = [FileCopy(Path("/source"), course / "docs" / "b.md", copy2), FileCopy(Path("/source"), course / "a.py", copy2)]
+
+        stats = write_manifest(temp_dir / "manifest.json", copies, root=course, jobs=1)
+
+        data = json.loads((temp_dir / "manifest.json").read_text())
+        assert data["algorithm"] == "blake2b"
+        assert data["files"] == {
+            "a.py": [3, file_digest(course / "a.py")],
+            "docs/b.md": [2, file_digest(course / "docs" / "b.md")],
+        }
+        assert stats.files == 2
+        assert stats.size == 5
+        assert "hashed 2 files" in str(stats)
+
+    def test_loads_what_it_wrote(self, course, temp_dir):
+        write_manifest(temp_dir / "manifest.json", [FileCopy(Path("/source"), course / "a.py", copy2)], root=course)
+
+        assert load_manifest(temp_dir / "manifest.json") == {
+            "a.py": ExpectedFile(3, file_digest(course / "a.py"))
+        }
+
+    def test_other_algorithms_are_refused(self, temp_dir):
+        (temp_dir / "manifest.json").write_text(json.dumps({"algorithm": "md5", "files": {}}))
+
+        with pytest.raises(ValueError, match="not a blake2b manifest"):
+            load_manifest(temp_dir / "manifest.json")
+
+
+class TestVerifyDirectory:
+
+    def test_reports_missing_extra_and_modified_files(self, course):
+        expected = {
+            "a.py": ExpectedFile(3, file_digest(course / "a.py")),
+            "docs/b.md": ExpectedFile(2, "0" * 128),
+            "gone.py": ExpectedFile(1, "0" * 128),
+        }
+
+        result = verify_directory(expected, course, excludes=["*.old"], jobs=1)
+
+        assert result.missing == ["gone.py"]
+        assert result.extra == []
+        assert result.modified == ["docs/b.md"]
+        assert not result.ok
+
+    def test_files_of_a_different_size_are_modified_without_hashing(self, course):
+        result = verify_directory({"a.py": ExpectedFile(10, "0" * 128)}, course, excludes=["*.old", "docs"])
+
+        assert result.modified == ["a.py"]
+        assert result.stats.files == 0
+
+    def test_git_and_ignored_files_are_never_extra(self, course):
+        expected = {"a.py": ExpectedFile(3, source=course / "a.py")}
+
+        result = verify_directory(expected, course, excludes=["docs"], ignore={course / "c.old"})
+
+        assert result.ok
+        assert result.stats.files == 2
+
+
+class TestVerifyTemplate:
+
+    def test_a_matching_course_passes(self, training_repo, temp_dir, capsys):
+        create_directory_structure(temp_dir, {"out": {"a.py": "aaa", "docs": {"b.md": "bb"}}})
+
+        assert verify_template("verified", temp_dir / "out")
+
+        output = capsys.readouterr().out
+        assert "0 missing, 0 extra, 0 modified" in output
+        assert "hashed 4 files" in output
+
+    def test_drift_is_reported(self, training_repo, temp_dir, capsys):
+        create_directory_structure(temp_dir, {"out": {"a.py": "abc", "new.py": "", "local.old": ""}})
+
+        assert not verify_template("verified", temp_dir / "out")
+
+        output = capsys.readouterr().out
+        assert "missing docs/b.md" in output
+        assert "extra new.py" in output
+        assert "modified a.py" in output
+        assert "local.old" not in output
+
+    def test_digests_recorded_in_the_index_spare_hashing_the_sources(self, training_repo, temp_dir, capsys):
+        from coursetools.index import FileIndex
+
+        create_directory_structure(temp_dir, {"out": {"a.py": "aaa", "docs": {"b.md": "bb"}}})
+        index = FileIndex(temp_dir / "index.sqlite3", training_repo, hash_files=True)
+
+        assert verify_template("verified", temp_dir / "out", index=index)
+
+        assert "hashed 2 files" in capsys.readouterr().out
+
+    def test_checks_against_a_manifest_inside_the_course(self, training_repo, temp_dir, capsys):
+        create_directory_structure(temp_dir, {"out": {"a.py": "aaa"}})
+        manifest = temp_dir / "out" / "manifest.json"
+        write_manifest(manifest, [FileCopy(Path("/source"), temp_dir / "out" / "a.py", copy2)], root=temp_dir / "out")
+        (temp_dir / "out" / "a.py").write_text("bbb")
+
+        assert not verify_template("verified", temp_dir / "out", manifest=manifest)
+
+        output = capsys.readouterr().out
+        assert "modified a.py" in output
+        assert "0 missing, 0 extra, 1 modified" in output
@@ -0,0 +1,91 @@
+import io
+import json
+from collections import Counter
+
+from coursetools.copier import MEGABYTE, CopyResult, CopyStats
+from coursetools.metrics import ProgressLine, build_metrics, progress_line, write_metrics
+from coursetools.plan import CopyPlan
+
+
+def make_run():
+    plan = CopyPlan("test")
+    plan.scan_seconds = {"/src": 0.5, "/README.md": 0.25}
+    plan.excluded = Counter({"*.pyc": 3})
+    results = (
+        CopyResult(100, "/src", "copy", 0.25, "/repo/src"),
+        CopyResult(50, "/src", "copy", 1.0, "/repo/src/slow"),
+        CopyResult(10, "/README.md", "copy", 0.125, "/repo"),
+    )
+    return plan, CopyStats(3, 160, 2.0, 1, results)
+
+
+class TestBuildMetrics:
+
+    def test_totals_and_timings(self):
+        plan, stats = make_run()
+
+        metrics = build_metrics([plan], stats)
+
+        assert metrics["templates"] == ["test"]
+        assert (metrics["files"], metrics["bytes"], metrics["skipped"]) == (3, 160, 1)
+        assert metrics["seconds"] == {"scan": 0.75, "copy": 2.0, "total": 2.75}
+
+    def test_per_path_files_bytes_and_seconds(self):
+        plan, stats = make_run()
+
+        paths = build_metrics([plan], stats)["paths"]
+
+        assert paths["/src"] == {"files": 2, "bytes": 150, "scan_seconds": 0.5, "copy_seconds": 1.25}
+        assert paths["/README.md"] == {
+            "files": 1, "bytes": 10, "scan_seconds": 0.25, "copy_seconds": 0.125
+        }
+
+    def test_excluded_counts_are_summed_across_plans(self):
+        plan, stats = make_run()
+        other = CopyPlan("other", excluded=Counter({"*.pyc": 1, "build": 2}))
+
+        metrics = build_metrics([plan, other], stats)
+
+        assert metrics["excluded"] == {"*.pyc": 4, "build": 2}
+
+    def test_slowest_directories_come_first(self):
+        plan, stats = make_run()
+
+        slowest = build_metrics([plan], stats)["slowest_directories"]
+
+        assert [entry["directory"] for entry in slowest] == ["/repo/src/slow", "/repo/src", "/repo"]
+        assert slowest[0] == {"directory": "/repo/src/slow", "files": 1, "seconds": 1.0}
+
+    def test_write_metrics_writes_json(self, temp_dir):
+        plan, stats = make_run()
+        path = temp_dir / "metrics.json"
+
+        write_metrics(path, build_metrics([plan], stats))
+
+        assert json.loads(path.read_text())["files"] == 3
+
+
+class TestProgressLine:
+
+    def test_rewrites_one_line_and_ends_it(self):
+        stream = io.StringIO()
+        progress = ProgressLine(2, stream, interval=0)
+
+        progress([CopyResult(MEGABYTE, "/src", "copy", 0.1, "/repo")])
+        progress([None])
+        progress.close()
+
+        assert stream.getvalue() == "\r1/2 files, 1.0 MB\r2/2 files, 1.0 MB\n"
+
+    def test_updates_are_throttled(self):
+        stream = io.StringIO()
+        progress = ProgressLine(3, stream, interval=60)
+
+        progress([None])
+        progress([None])
+        progress([None])
+
+        assert stream.getvalue() == "\r1/3 files, 0.0 MB\r3/3 files, 0.0 MB"
+
+    def test_no_progress_line_when_not_a_terminal(self):
+        assert progress_line(10, io.StringIO()) is None
@@ -0,0 +1,245 @@
+from pathlib import Path
+from shutil import copy, copy2
+
+import pytest
+
+from coursetools.copier import FileCopy
+from coursetools.plan import CopyPlan, plan_template
+from tests import create_directory_structure
+
+
+def make_template(paths, excludes):
+    return {"paths": paths, "excludes": excludes}
+
+
+@pytest.fixture
+def training_repo(training_repo, temp_dir, monkeypatch):
+    monkeypatch.chdir(temp_dir)
+    return training_repo
+
+
+@pytest.mark.usefixtures("training_repo")
+class TestPlanTemplate:
+
+    def test_plan_lists_files_and_total_bytes(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"src": {"a.py": "aaa", "sub": {"b.py": "bb"}}}
+        })
+
+        plan = plan_template("test", make_template({"/src": "out"}, {}))
+
+        assert sorted(f.destination.relative_to(temp_dir) for f in plan.files) == [
+            Path("out/a.py"), Path("out/sub/b.py")
+        ]
+        assert plan.total_bytes() == 5
+
+    def test_plan_does_not_touch_the_destination(self, temp_dir):
+        create_directory_structure(temp_dir, {"training-repo": {"src": {"sub": {"b.py": ""}}}})
+
+        plan_template("test", make_template({"/src": "out"}, {}))
+
+        assert not (temp_dir / "out").exists()
+
+    def test_plan_counts_excluded_entries_per_pattern(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {
+                "src": {"a.old": "", "b.old": "", "node_modules": {"x.js": ""}},
+                "c.old": ""
+            }
+        })
+
+        plan = plan_template("test", make_template(
+            {"/src": "out", "/c.old": "out"}, {"*.old": "", "node_modules": ""}
+        ))
+
+        assert plan.excluded == {"*.old": 3, "node_modules": 1}
+        assert plan.files == []
+
+    def test_plan_records_conflicting_destinations(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"one": {"a.py": "1"}, "two": {"a.py": "2"}}
+        })
+
+        plan = plan_template("test", make_template({"/one": "out", "/two": "out"}, {}))
+
+        [file_copy] = plan.files
+        assert file_copy.source == temp_dir / "training-repo" / "two" / "a.py"
+        assert list(plan.conflicts) == [temp_dir / "out" / "a.py"]
+
+    def test_plan_puts_single_files_into_planned_directories(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"src": {"a.py": ""}, "requirements.txt": "pytest"}
+        })
+
+        plan = plan_template("test", make_template({"/src": "out", "/requirements.txt": "out"}, {}))
+
+        assert temp_dir / "out" / "requirements.txt" in plan.copies
+
+    def test_plan_records_missing_sources(self, temp_dir):
+
+        plan = plan_template("test", make_template({"/missing": "out"}, {}))
+
+        assert plan.missing == ["/missing"]
+
+
+@pytest.mark.usefixtures("training_repo")
+class TestOverlappingPaths:
+
+    def test_nested_path_copied_to_the_same_place_is_merged(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"src": {"a.py": "", "testing": {"b.py": ""}, "req.txt": ""}}
+        })
+
+        plan = plan_template("test", make_template(
+            {"/src": "out", "/src/testing": "out/testing", "/src/req.txt": "out"}, {}
+        ))
+
+        assert plan.merged == {"/src/testing": "/src", "/src/req.txt": "/src"}
+        assert list(plan.scan_seconds) == ["/src"]
+        assert len(plan.files) == 3
+        assert plan.conflicts == {}
+
+    def test_nested_path_copied_elsewhere_is_kept(self, temp_dir):
+        create_directory_structure(temp_dir, {"training-repo": {"src": {"testing": {"b.py": ""}}}})
+
+        plan = plan_template("test", make_template({"/src": "out", "/src/testing": "tests"}, {}))
+
+        assert plan.merged == {}
+        assert temp_dir / "out" / "testing" / "b.py" in plan.copies
+        assert temp_dir / "tests" / "b.py" in plan.copies
+
+    def test_overlapping_directories_are_listed_once(self, temp_dir, monkeypatch):
+        import coursetools.excludes as excludes_module
+
+        create_directory_structure(temp_dir, {"training-repo": {"src": {"testing": {"b.py": ""}}}})
+        listed = []
+        scan_directory = excludes_module.scan_directory
+        monkeypatch.setattr(excludes_module, "scan_directory", lambda path: listed.append(path) or scan_directory(path))
+
+        plan_template("test", make_template({"/src": "out", "/src/testing": "tests"}, {}))
+
+        assert len(listed) == len(set(listed)) == 2
+
+    def test_nested_path_under_an_excluded_directory_is_kept(self, temp_dir):
+        create_directory_structure(temp_dir, {"training-repo": {"src": {"archive": {"keep.py": ""}}}})
+
+        plan = plan_template("test", make_template(
+            {"/src": "out", "/src/archive": "out/archive"}, {"archive": ""}
+        ))
+
+        assert plan.merged == {}
+        assert temp_dir / "out" / "archive" / "keep.py" in plan.copies
+
+    def test_anchored_excludes_are_never_merged(self, temp_dir):
+        create_directory_structure(temp_dir, {"training-repo": {"src": {"testing": {"build": {"x": ""}}}}})
+
+        plan = plan_template("test", make_template(
+            {"/src": "out", "/src/testing": "out/testing"}, {"/build": ""}
+        ))
+
+        assert plan.merged == {}
+        assert temp_dir / "out" / "testing" / "build" / "x" in plan.copies
+
+    def test_files_replacing_directories_are_clashes(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"notes.md": "a file", "src": {"docs": {"a.md": ""}}}
+        })
+
+        plan = plan_template("test", make_template({"/notes.md": "out/docs", "/src": "out"}, {}))
+
+        assert plan.clashes() == [(
+            temp_dir / "out" / "docs",
+            temp_dir / "training-repo" / "notes.md",
+            temp_dir / "training-repo" / "src" / "docs",
+        )]
+        assert "would be both the file" in plan.collisions()[0]
+
+
+class TestCopyPlan:
+
+    def make_plan(self, temp_dir):
+        plan = CopyPlan("test", ["*.old"])
+        plan.add_file(FileCopy(temp_dir / "a.py", temp_dir / "out" / "a.py", copy2, "/src", 10))
+        plan.add_file(FileCopy(temp_dir / "b.txt", temp_dir / "out" / "b.txt", copy, "/b.txt", 5))
+        plan.excluded["*.old"] = 2
+        return plan
+
+    def test_plan_round_trips_through_json(self, temp_dir):
+        plan = self.make_plan(temp_dir)
+
+        plan.save(temp_dir / "plan.json")
+        loaded = CopyPlan.load(temp_dir / "plan.json")
+
+        assert loaded == plan
+
+    def test_describe_summarises_the_plan(self, temp_dir):
+        lines = self.make_plan(temp_dir).describe()
+
+        assert lines[0].startswith("plan for test: 2 files")
+        assert "  /src: 1 files" in lines
+        assert "  excluded *.old: 2" in lines
+
+    def test_collisions_report_conflicting_sources(self, temp_dir):
+        plan = self.make_plan(temp_dir)
+        plan.add_file(FileCopy(temp_dir / "c.py", temp_dir / "out" / "a.py", copy2, "/other", 1))
+
+        assert plan.collisions() == [
+            f"{temp_dir / 'out' / 'a.py'} is written by {temp_dir / 'a.py'}, {temp_dir / 'c.py'}, keeping the last"
+        ]
+
+    def test_merged_paths_round_trip_and_are_described(self, temp_dir):
+        plan = self.make_plan(temp_dir)
+        plan.merged = {"/src/testing": "/src"}
+
+        plan.save(temp_dir / "plan.json")
+
+        assert CopyPlan.load(temp_dir / "plan.json").merged == {"/src/testing": "/src"}
+        assert "  /src/testing copied with /src" in plan.describe()
+
+
+@pytest.mark.usefixtures("training_repo")
+class TestFileLimits:
+
+    def test_oversized_files_are_skipped_during_the_walk(self, temp_dir, capsys):
+        create_directory_structure(temp_dir, {
+            "training-repo": {"src": {"small.txt": "x" * 10, "big.jar": "x" * 2048}}
+        })
+        template = make_template({"/src": "out"}, {})
+        template["limits"] = {"max_file_size": "1K"}
+
+        plan = plan_template("test", template)
+
+        assert [f.source.name for f in plan.files] == ["small.txt"]
+        assert plan.oversized == [(temp_dir / "training-repo" / "src" / "big.jar", 2048)]
+        assert "big.jar is 0.0 MB, over the 0.0 MB limit, skipping" in capsys.readouterr().out
+
+    def test_oversized_files_can_be_copied_with_a_warning(self, temp_dir, capsys):
+        create_directory_structure(temp_dir, {"training-repo": {"big.jar": "x" * 2048}})
+        template = make_template({"/big.jar": "out.jar"}, {})
+        template["limits"] = {"max_file_size": "1K", "oversized": "warn"}
+
+        plan = plan_template("test", template)
+
+        assert len(plan.files) == 1
+        assert len(plan.oversized) == 1
+        assert "copying anyway" in capsys.readouterr().out
+
+    def test_no_limits_section(self):
+        from coursetools.plan import file_limit
+
+        assert file_limit(make_template({}, {})) is None
+
+    def test_sizes_take_units(self):
+        from coursetools.plan import parse_size
+
+        assert parse_size("512") == 512
+        assert parse_size("10K") == 10 * 1024
+        assert parse_size("100MB") == 100 * 1024 * 1024
+        assert parse_size("1.5g") == int(1.5 * 1024 ** 3)
+
+    def test_bad_sizes_are_reported(self):
+        import pytest
+        from coursetools.plan import parse_size
+
+        with pytest.raises(ValueError, match="not a size"):
+            parse_size("lots")
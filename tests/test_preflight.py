@@ -0,0 +1,143 @@
+from collections import namedtuple
+from pathlib import Path
+from shutil import copy2
+
+import pytest
+
+from coursetools.copier import FileCopy
+from coursetools.plan import CopyPlan
+from coursetools.preflight import (
+    Preflight,
+    SpaceCheck,
+    missing_sources,
+    preflight_templates,
+    space_checks,
+)
+from tests import create_mock_template
+
+Usage = namedtuple("Usage", "total used free")
+
+
+@pytest.fixture
+def training_files():
+    return {"examples": {"a.py": "a" * 100}, "setup.cfg": "[tool]"}
+
+
+def plan_of(temp_dir, *sizes):
+    plan = CopyPlan("test")
+    for number, size in enumerate(sizes):
+        plan.add_file(FileCopy(Path(f"/source/{number}"), temp_dir / "out" / str(number), copy2, "/", size))
+    return plan
+
+
+class TestMissingSources:
+
+    def test_reports_paths_that_are_neither_file_nor_directory(self, training_repo):
+        paths = {"/examples": "examples", "/setup.cfg": ".", "/gone": "gone", "/also-gone.txt": "."}
+
+        assert missing_sources(paths) == ["/gone", "/also-gone.txt"]
+
+    def test_nothing_is_missing_from_an_empty_template(self, training_repo):
+        assert missing_sources({}) == []
+
+
+class TestSpaceChecks:
+
+    def test_counts_the_bytes_of_every_planned_file(self, temp_dir):
+        checks = space_checks([plan_of(temp_dir, 100, 200)], [temp_dir / "out"])
+
+        assert len(checks) == 1
+        assert checks[0].required == 300
+        assert checks[0].directory == temp_dir.resolve()
+
+    def test_files_already_in_the_destination_only_count_their_growth_in_place(self, temp_dir):
+        (temp_dir / "out").mkdir()
+        (temp_dir / "out" / "0").write_bytes(b"x" * 80)
+        (temp_dir / "out" / "1").write_bytes(b"x" * 500)
+
+        staged = space_checks([plan_of(temp_dir, 100, 200)], [temp_dir / "out"])
+        in_place = space_checks([plan_of(temp_dir, 100, 200)], [temp_dir / "out"], in_place=True)
+
+        assert staged[0].required == 300
+        assert in_place[0].required == 20
+
+    def test_plans_on_one_filesystem_are_added_together(self, temp_dir):
+        plans = [plan_of(temp_dir, 100), plan_of(temp_dir / "other", 50)]
+
+        checks = space_checks(plans, [temp_dir / "out", temp_dir / "other" / "out"])
+
+        assert [check.required for check in checks] == [150]
+
+    def test_hard_links_need_no_space(self, temp_dir):
+        checks = space_checks([plan_of(temp_dir, 100)], [temp_dir], link_mode="hardlink")
+
+        assert checks[0].required == 0
+
+    def test_a_check_fails_when_the_files_do_not_fit(self, temp_dir, monkeypatch):
+        import coursetools.preflight as preflight_module
+        monkeypatch.setattr(preflight_module, "disk_usage", lambda path: Usage(1000, 990, 10))
+
+        check = space_checks([plan_of(temp_dir, 100)], [temp_dir])[0]
+
+        assert not check.ok
+        assert "free in" in str(check)
+
+
+class TestPreflight:
+
+    def test_describes_missing_paths_and_space(self, temp_dir):
+        result = Preflight("python", ["/gone"], 3, (SpaceCheck(temp_dir, 2 * 1024 * 1024, 1024 * 1024),))
+
+        assert not result.ok
+        assert result.describe() == [
+            f"python: 3 files, 2.0 MB needed, 1.0 MB free in {temp_dir}",
+            "  /gone is neither file or directory",
+            f"  not enough space: 2.0 MB needed, 1.0 MB free in {temp_dir}",
+        ]
+
+    def test_checks_every_bundled_template(self, training_repo, temp_dir, monkeypatch, capsys):
+        create_mock_template(temp_dir, monkeypatch, "good", paths={"/examples": "examples"}, excludes={})
+        create_mock_template(temp_dir, monkeypatch, "broken", paths={"/gone": "gone"}, excludes={})
+
+        assert not preflight_templates(output=str(temp_dir))
+
+        output = capsys.readouterr().out
+        assert "good: 1 files" in output
+        assert "broken: 0 files\n  /gone is neither file or directory\n" in output
+        assert output.count("/gone") == 1
+        assert "1 of 2 templates passed preflight" in output
+        assert "failed: broken" in output
+
+    def test_passes_when_every_path_exists(self, training_repo, temp_dir, monkeypatch, capsys):
+        create_mock_template(temp_dir, monkeypatch, "good", paths={"/examples": "examples"}, excludes={})
+
+        assert preflight_templates(["good"], output=str(temp_dir))
+        assert not (temp_dir / "examples").exists()
+
+    def test_planning_messages_are_printed_with_their_template(self, training_repo, temp_dir, monkeypatch, capsys):
+        paths = {"/examples": "examples", "/examples/a.py": "examples/a.py"}
+        create_mock_template(temp_dir, monkeypatch, "merged", paths=paths, excludes={})
+        create_mock_template(temp_dir, monkeypatch, "good", paths={"/examples": "examples"}, excludes={})
+
+        assert preflight_templates(["merged", "good"], output=str(temp_dir))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith("merged: 1 files")
+        assert lines[1] == "  /examples/a.py is copied with /examples, skipping"
+        assert lines[2].startswith("good: 1 files")
+
+    def test_an_unreadable_size_limit_fails(self, training_repo, temp_dir, monkeypatch, capsys):
+        create_mock_template(temp_dir, monkeypatch, "lim", paths={"/examples": "examples"}, excludes={})
+        with open(temp_dir / "templates" / "lim.ini", "a") as file:
+            file.write("[limits]\nmax_file_size = lots\n")
+
+        assert not preflight_templates(["lim"], output=str(temp_dir))
+
+        output = capsys.readouterr().out
+        assert "  lots is not a size such as 500K, 100M or 2G in the [limits] section" in output
+        assert "failed: lim" in output
+
+    def test_unknown_templates_fail(self, training_repo, capsys):
+        assert not preflight_templates(["nonexistent-template"])
+
+        assert "nonexistent-template is not a valid template" in capsys.readouterr().out
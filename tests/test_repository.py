@@ -3,7 +3,7 @@ from pathlib import Path
 import configparser
 import pytest
 from unittest.mock import patch, MagicMock
-from coursetools.repository import make_repo
+from coursetools.repository import make_repo, make_repos
 from tests import run_in_temporary_directory, create_directory_structure, create_mock_template
 
 
@@ -21,8 +21,7 @@ class TestMakeRepo:
         
         # Setup mocks
         monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
-        monkeypatch.setattr(templates_module, "template_dir", mock_template_dir)
-        monkeypatch.setattr(templates_module, "templates", ["test-template", "another-template"])
+        monkeypatch.setattr(templates_module, "registry", templates_module.TemplateRegistry([mock_template_dir]))
         config_module.CONFIG = None
         
         # This will fail because the paths don't exist, but we can check the message
@@ -174,3 +173,803 @@ class TestMakeRepoFileOperations:
             assert "neither file or directory" in captured.out
         
         run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoParallelCopy:
+
+    def setup_training_repo(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {
+                "examples": {
+                    "one.py": "print(1)",
+                    "nested": {"two.py": "print(2)", "skip.old": "old"},
+                    "empty": {},
+                    "node_modules": {"package.json": "{}"}
+                },
+                "requirements.txt": "pytest"
+            }
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-parallel",
+            paths={"/examples": "out/examples", "/requirements.txt": "out"},
+            excludes={"*.old": "", "node_modules": ""}
+        )
+
+    def test_make_repo_output_matches_sequential_copy(self, temp_dir, mock_config_dir, monkeypatch):
+        from shutil import copytree, ignore_patterns
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+        expected = temp_dir / "expected"
+        copytree(
+            temp_dir / "training-repo" / "examples", expected,
+            ignore=ignore_patterns("*.old", "node_modules")
+        )
+
+        def act_and_assert():
+            make_repo("test-parallel", jobs=4)
+
+            actual = temp_dir / "out" / "examples"
+            assert sorted(p.relative_to(actual) for p in actual.rglob("*")) == \
+                sorted(p.relative_to(expected) for p in expected.rglob("*"))
+            for path in expected.rglob("*.py"):
+                assert (actual / path.relative_to(expected)).read_bytes() == path.read_bytes()
+            assert (temp_dir / "out" / "requirements.txt").read_text() == "pytest"
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repo_reports_throughput(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-parallel", jobs=1)
+
+            captured = capsys.readouterr()
+            assert "copied 3 files" in captured.out
+            assert "files/sec" in captured.out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoSync:
+
+    def setup_training_repo(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "two.py": "print(2)"}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-sync",
+            paths={"/examples": "out"},
+            excludes={}
+        )
+
+    def test_sync_skips_unchanged_files(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-sync")
+            (temp_dir / "training-repo" / "examples" / "two.py").write_text("print('two')")
+            capsys.readouterr()
+
+            make_repo("test-sync", sync=True)
+
+            captured = capsys.readouterr()
+            assert "copied 1 files" in captured.out
+            assert "skipped 1 unchanged" in captured.out
+            assert (temp_dir / "out" / "two.py").read_text() == "print('two')"
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_sync_with_delete_removes_files_without_source(self, temp_dir, mock_config_dir, monkeypatch):
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-sync")
+            (temp_dir / "training-repo" / "examples" / "one.py").unlink()
+
+            make_repo("test-sync", sync=True, delete=True)
+
+            assert not (temp_dir / "out" / "one.py").exists()
+            assert (temp_dir / "out" / "two.py").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoExcludes:
+
+    def test_make_repo_excludes_single_file_paths(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {"training-repo": {"notes.old": "old"}})
+        create_mock_template(
+            temp_dir, monkeypatch, "test-file-exclusion",
+            paths={"/notes.old": "notes.old"},
+            excludes={"*.old": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-file-exclusion")
+
+            assert not (temp_dir / "notes.old").exists()
+            assert "/notes.old is excluded, skipping" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repo_supports_anchored_excludes(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"src": {"build": {"a.txt": ""}, "lib": {"build": {"b.txt": ""}}}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-anchored",
+            paths={"/src": "out"},
+            excludes={"/build": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-anchored")
+
+            assert not (temp_dir / "out" / "build").exists()
+            assert (temp_dir / "out" / "lib" / "build" / "b.txt").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoPlan:
+
+    def setup_training_repo(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {"training-repo": {"examples": {"one.py": "print(1)"}}})
+        create_mock_template(
+            temp_dir, monkeypatch, "test-plan",
+            paths={"/examples": "out"},
+            excludes={}
+        )
+
+    def test_dry_run_prints_the_plan_without_copying(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-plan", dry_run=True)
+
+            assert "plan for test-plan: 1 files" in capsys.readouterr().out
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_saved_plan_can_be_replayed(self, temp_dir, mock_config_dir, monkeypatch):
+        from coursetools.plan import CopyPlan
+        from coursetools.repository import run_plan
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-plan", dry_run=True, save_plan=temp_dir / "plan.json")
+
+            run_plan(CopyPlan.load(temp_dir / "plan.json"))
+
+            assert (temp_dir / "out" / "one.py").read_text() == "print(1)"
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_replaying_a_plan_whose_sources_are_gone_copies_nothing(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from coursetools.app import parse_and_execute
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-plan", dry_run=True, save_plan=temp_dir / "plan.json")
+            gone = next((temp_dir / "training-repo").rglob("*.py"))
+            gone.unlink()
+
+            parse_and_execute(["--from-plan", str(temp_dir / "plan.json")])
+
+            output = capsys.readouterr().out
+            assert f"{gone} is no longer in the training repo" in output
+            assert "the test-plan plan has missing sources, not copying anything" in output
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepos:
+
+    def setup_training_repo(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"typescript": {"basics": {"a.ts": "a"}, "react": {"b.tsx": "b"}}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "typescript",
+            paths={"/typescript": "typescript"},
+            excludes={}
+        )
+        create_mock_template(
+            temp_dir, monkeypatch, "typescript-react",
+            paths={"/typescript/react": "react"},
+            excludes={}
+        )
+
+    def test_make_repos_builds_each_template_into_its_output(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from coursetools.repository import make_repos
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repos([("typescript", "ts"), ("typescript-react", "tsr")], jobs=2)
+
+            assert (temp_dir / "ts" / "typescript" / "react" / "b.tsx").read_text() == "b"
+            assert (temp_dir / "tsr" / "react" / "b.tsx").read_text() == "b"
+            assert "copied 3 files" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repos_lists_shared_directories_once(self, temp_dir, mock_config_dir, monkeypatch):
+        import os
+        from coursetools.repository import make_repos
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+        react = str(temp_dir / "training-repo" / "typescript" / "react")
+        scanned = []
+        original_scandir = os.scandir
+
+        def scandir(path):
+            if not isinstance(path, int):
+                scanned.append(os.path.normpath(path))
+            return original_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", scandir)
+
+        def act_and_assert():
+            make_repos([("typescript", "ts"), ("typescript-react", "tsr")])
+
+            assert scanned.count(react) == 1
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repos_stops_before_copying_on_an_unknown_template(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from coursetools.repository import make_repos
+
+        self.setup_training_repo(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repos([("typescript", "ts"), ("nope", "nope")])
+
+            assert "nope is not a valid template" in capsys.readouterr().out
+            assert not (temp_dir / "ts").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoArchive:
+
+    def test_make_repo_streams_into_an_archive(self, temp_dir, mock_config_dir, monkeypatch):
+        import tarfile
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "skip.old": ""}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-archive",
+            paths={"/examples": "course/examples"},
+            excludes={"*.old": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-archive", archive="course.tar.gz")
+
+            assert not (temp_dir / "course").exists()
+            with tarfile.open(temp_dir / "course.tar.gz") as tar:
+                assert sorted(tar.getnames()) == ["course/examples", "course/examples/one.py"]
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoIndex:
+
+    def test_make_repo_lists_files_from_the_index(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+        from coursetools.index import FileIndex
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "node_modules": {"x.js": ""}}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-index",
+            paths={"/examples": "out"},
+            excludes={"node_modules": ""}
+        )
+        index = FileIndex(temp_dir / "index.sqlite3", temp_dir / "training-repo")
+
+        def act_and_assert():
+            make_repo("test-index", index=index)
+
+            assert (temp_dir / "out" / "one.py").read_text() == "print(1)"
+            assert not (temp_dir / "out" / "node_modules").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoGitSource:
+
+    def test_make_repo_copies_only_tracked_files(self, temp_dir, mock_config_dir, monkeypatch):
+        import subprocess
+        import coursetools.config as config_module
+        from coursetools.gitfiles import GitFiles
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        repo = temp_dir / "training-repo"
+        create_directory_structure(temp_dir, {"training-repo": {"examples": {"one.py": "print(1)"}}})
+        subprocess.run(["git", "-C", str(repo), "init", "-q"], check=True)
+        subprocess.run(["git", "-C", str(repo), "add", "."], check=True)
+        create_directory_structure(repo, {"examples": {"dist": {"bundle.js": ""}, "scratch.py": ""}})
+        create_mock_template(
+            temp_dir, monkeypatch, "test-git",
+            paths={"/examples": "out"},
+            excludes={"node_modules": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-git", index=GitFiles(repo))
+
+            assert sorted(path.name for path in (temp_dir / "out").iterdir()) == ["one.py"]
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoGitInit:
+
+    def test_make_repo_commits_the_course(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import subprocess
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "skip.old": ""}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-git-init",
+            paths={"/examples": "course/examples"},
+            excludes={"*.old": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-git-init", git_init=True)
+
+            files = subprocess.run(
+                ["git", "ls-files"], capture_output=True, text=True, check=True
+            ).stdout.split()
+            assert files == ["course/examples/one.py"]
+            assert "committed test-git-init" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repo_reports_an_existing_repository(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import subprocess
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {"training-repo": {"examples": {"one.py": ""}}})
+        create_mock_template(
+            temp_dir, monkeypatch, "test-git-init", paths={"/examples": "out"}, excludes={}
+        )
+        subprocess.run(["git", "init", "-q", str(temp_dir)], check=True)
+
+        def act_and_assert():
+            make_repo("test-git-init", git_init=True)
+
+            assert "already a git repository" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoCollisions:
+
+    def test_make_repo_copies_nothing_when_a_file_would_replace_a_directory(
+        self, temp_dir, mock_config_dir, monkeypatch, capsys
+    ):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"notes.md": "a file", "src": {"docs": {"a.md": ""}, "b.py": ""}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-clash",
+            paths={"/notes.md": "out/docs", "/src": "out"},
+            excludes={}
+        )
+
+        def act_and_assert():
+            make_repo("test-clash")
+
+            output = capsys.readouterr().out
+            assert "would be both the file" in output
+            assert "not copying anything" in output
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repo_reports_conflicts_before_copying(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"one": {"a.py": "1"}, "two": {"a.py": "2"}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-conflict", paths={"/one": "out", "/two": "out"}, excludes={}
+        )
+
+        def act_and_assert():
+            make_repo("test-conflict")
+
+            output = capsys.readouterr().out
+            assert output.index("keeping the last") < output.index("copied 1 files")
+            assert (temp_dir / "out" / "a.py").read_text() == "2"
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoMetrics:
+
+    def test_make_repo_writes_metrics_json(self, temp_dir, mock_config_dir, monkeypatch):
+        import json
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "skip.old": ""}}
+        })
+        create_mock_template(
+            temp_dir, monkeypatch, "test-metrics",
+            paths={"/examples": "out"},
+            excludes={"*.old": ""}
+        )
+
+        def act_and_assert():
+            make_repo("test-metrics", metrics_json="metrics.json")
+
+            metrics = json.loads((temp_dir / "metrics.json").read_text())
+            assert metrics["files"] == 1
+            assert metrics["bytes"] == 8
+            assert metrics["paths"]["/examples"]["files"] == 1
+            assert metrics["excluded"] == {"*.old": 1}
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+
+class TestMakeRepoPreflight:
+
+    def setup_template(self, temp_dir, mock_config_dir, monkeypatch, paths):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)"}}
+        })
+        create_mock_template(temp_dir, monkeypatch, "test-preflight", paths=paths, excludes={})
+
+    def test_a_missing_path_stops_the_run_before_copying(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out", "/gone": "gone"})
+
+        def act_and_assert():
+            make_repo("test-preflight")
+
+            output = capsys.readouterr().out
+            assert "/gone is neither file or directory" in output
+            assert "test-preflight has missing paths, not copying anything" in output
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_an_unreadable_size_limit_stops_the_run_before_copying(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out"})
+        with open(temp_dir / "templates" / "test-preflight.ini", "a") as file:
+            file.write("[limits]\nmax_file_size = lots\n")
+
+        def act_and_assert():
+            make_repo("test-preflight")
+            make_repo("test-preflight", dry_run=True)
+
+            output = capsys.readouterr().out
+            assert output.count("lots is not a size such as 500K, 100M or 2G in the [limits] section "
+                                "of test-preflight, not copying anything") == 2
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_a_dry_run_still_shows_the_plan(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out", "/gone": "gone"})
+
+        def act_and_assert():
+            make_repo("test-preflight", dry_run=True)
+
+            assert "missing /gone" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_running_out_of_space_stops_the_run_before_copying(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from collections import namedtuple
+        import coursetools.preflight as preflight_module
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out"})
+        monkeypatch.setattr(preflight_module, "disk_usage", lambda path: namedtuple("Usage", "free")(4))
+
+        def act_and_assert():
+            make_repo("test-preflight")
+
+            assert "not enough free space, not copying anything" in capsys.readouterr().out
+            assert not (temp_dir / "out").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_make_repos_checks_every_build(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from coursetools.repository import make_repos
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/gone": "gone"})
+
+        make_repos([("test-preflight", str(temp_dir / "a"))])
+
+        assert "not copying anything" in capsys.readouterr().out
+        assert not (temp_dir / "a").exists()
+
+
+class TestMakeRepoManifest:
+
+    def setup_template(self, temp_dir, mock_config_dir, monkeypatch, paths):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "two.py": "print(2)"}}
+        })
+        create_mock_template(temp_dir, monkeypatch, "test-manifest", paths=paths, excludes={})
+        (temp_dir / "course").mkdir()
+
+    def test_make_repo_writes_a_manifest_of_the_copied_files(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import json
+        from coursetools.manifest import verify_template
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out"})
+
+        def act_and_assert():
+            make_repo("test-manifest", manifest="manifest.json")
+
+            files = json.loads(Path("manifest.json").read_text())["files"]
+            assert sorted(files) == ["out/one.py", "out/two.py"]
+            assert "wrote manifest.json: hashed 2 files" in capsys.readouterr().out
+            assert verify_template("test-manifest", ".", manifest="manifest.json")
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_a_manifest_round_trips_through_verify(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        from coursetools.app import parse_and_execute
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "out"})
+
+        def act_and_assert():
+            parse_and_execute(["test-manifest", "--manifest", "manifest.json"])
+            parse_and_execute(["--verify", "test-manifest", ".", "--manifest", "manifest.json"])
+
+            assert "0 missing, 0 extra, 0 modified" in capsys.readouterr().out
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_destinations_outside_the_current_directory_copy_nothing(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch, {"/examples": "../outside"})
+
+        def act_and_assert():
+            make_repo("test-manifest", manifest="manifest.json")
+
+            assert "which manifest paths are relative to, not copying anything" in capsys.readouterr().out
+            assert not (temp_dir / "outside").exists()
+            assert not Path("manifest.json").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+
+class TestMakeRepoStaging:
+
+    def setup_template(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.config as config_module
+
+        monkeypatch.setattr(Path, "home", lambda: mock_config_dir.parent)
+        config_module.CONFIG = None
+        create_directory_structure(temp_dir, {
+            "training-repo": {"examples": {"one.py": "print(1)", "two.py": "print(2)"}},
+            "course": {"examples": {"one.py": "old", "stale.py": ""}, "notes.txt": "mine"},
+        })
+        create_mock_template(temp_dir, monkeypatch, "test-staging", paths={"/examples": "examples"}, excludes={})
+
+    def interrupt_after_first_file(self, monkeypatch):
+        import errno
+        import coursetools.copier as copier_module
+
+        original_copy_group = copier_module.copy_group
+        calls = []
+
+        def copy_group(file_copies, **kwargs):
+            calls.append(file_copies)
+            if len(calls) == 2:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            return original_copy_group(file_copies, **kwargs)
+
+        monkeypatch.setattr(copier_module, "copy_group", copy_group)
+
+    def test_a_build_merges_into_the_course_directories(self, temp_dir, mock_config_dir, monkeypatch):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        create_directory_structure(temp_dir / "course" / "examples", {".git": {"HEAD": "ref"}})
+
+        def act_and_assert():
+            make_repo("test-staging")
+
+            assert sorted(os.listdir("examples")) == [".git", "one.py", "stale.py", "two.py"]
+            assert Path("examples/one.py").read_text() == "print(1)"
+            assert Path("notes.txt").read_text() == "mine"
+            assert not Path(".coursetools-staging").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_an_interrupted_build_leaves_the_course_as_it_was(self, temp_dir, mock_config_dir, monkeypatch):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        self.interrupt_after_first_file(monkeypatch)
+
+        def act_and_assert():
+            with pytest.raises(OSError):
+                make_repo("test-staging", jobs=1)
+
+            assert sorted(os.listdir("examples")) == ["one.py", "stale.py"]
+            assert Path("examples/one.py").read_text() == "old"
+            assert Path(".coursetools-staging/.coursetools-journal").read_text().count("\n") == 1
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_resume_only_copies_what_is_left(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        self.interrupt_after_first_file(monkeypatch)
+
+        def act_and_assert():
+            with pytest.raises(OSError):
+                make_repo("test-staging", jobs=1)
+
+            make_repo("test-staging", resume=True)
+
+            output = capsys.readouterr().out
+            assert "1 files already copied" in output
+            assert "copied 1 files" in output
+            assert "skipped 1 unchanged" in output
+            assert sorted(os.listdir("examples")) == ["one.py", "stale.py", "two.py"]
+            assert not Path(".coursetools-staging").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_a_batch_keeps_the_git_history_of_every_course(self, temp_dir, mock_config_dir, monkeypatch):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        create_directory_structure(temp_dir, {
+            "courses": {"one": {".git": {"HEAD": "ref"}}, "two": {".git": {"HEAD": "ref"}}}
+        })
+
+        def act_and_assert():
+            make_repos([("test-staging", "courses/one"), ("test-staging", "courses/two")])
+
+            for course in ("one", "two"):
+                assert sorted(os.listdir(f"courses/{course}")) == [".git", "examples"]
+                assert Path(f"courses/{course}/.git/HEAD").read_text() == "ref"
+            assert sorted(os.listdir("courses")) == ["one", "two"]
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_a_batch_stages_each_course_inside_its_own_output(self, temp_dir, mock_config_dir, monkeypatch):
+        import tempfile
+        from coursetools.staging import Staging
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        started = []
+        start = Staging.start
+        monkeypatch.setattr(Staging, "start", lambda staging, resume=False: started.append(staging.root) or start(staging, resume))
+
+        with tempfile.TemporaryDirectory() as one, tempfile.TemporaryDirectory() as two:
+            outputs = [Path(one) / "course", Path(two) / "course"]
+
+            make_repos([("test-staging", str(output)) for output in outputs])
+
+            assert sorted(started) == sorted(output.resolve() for output in outputs)
+            for output in outputs:
+                assert sorted(os.listdir(output)) == ["examples"]
+                assert sorted(os.listdir(output / "examples")) == ["one.py", "two.py"]
+
+    def test_an_unsupported_link_mode_copies_nothing(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        import errno
+        import fcntl
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+
+        def ioctl(*args):
+            raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+        monkeypatch.setattr(fcntl, "ioctl", ioctl)
+
+        def act_and_assert():
+            make_repo("test-staging", link_mode="reflink")
+
+            assert "reflink is not supported on this filesystem, not copying anything" in capsys.readouterr().out
+            assert sorted(os.listdir(".")) == ["examples", "notes.txt"]
+            assert sorted(os.listdir("examples")) == ["one.py", "stale.py"]
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_checksum_sync_uses_digests_recorded_in_the_index(self, temp_dir, mock_config_dir, monkeypatch):
+        import coursetools.sync as sync_module
+        from coursetools.index import FileIndex
+
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        index = FileIndex(temp_dir / "index.sqlite3", temp_dir / "training-repo", hash_files=True)
+        hashed = []
+        file_digest = sync_module.file_digest
+
+        def act_and_assert():
+            make_repo("test-staging", index=index)
+            monkeypatch.setattr(sync_module, "file_digest", lambda path: hashed.append(path) or file_digest(path))
+
+            make_repo("test-staging", sync=True, checksum=True, index=index)
+
+            assert sorted(Path(path).name for path in hashed) == ["one.py", "two.py"]
+            assert all(str(temp_dir / "course") in str(path) for path in hashed)
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_destinations_outside_the_root_are_copied_in_place(self, temp_dir, mock_config_dir, monkeypatch, capsys):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+        create_mock_template(temp_dir, monkeypatch, "outside", paths={"/examples": "../elsewhere"}, excludes={})
+
+        def act_and_assert():
+            make_repo("outside", resume=True)
+
+            output = capsys.readouterr().out
+            assert f"is outside {(temp_dir / 'course').resolve()}, copying in place, ignoring --resume" in output
+            assert sorted(os.listdir(temp_dir / "elsewhere")) == ["one.py", "two.py"]
+            assert not Path(".coursetools-staging").exists()
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
+
+    def test_sync_copies_in_place(self, temp_dir, mock_config_dir, monkeypatch):
+        self.setup_template(temp_dir, mock_config_dir, monkeypatch)
+
+        def act_and_assert():
+            make_repo("test-staging", sync=True)
+
+            assert sorted(os.listdir("examples")) == ["one.py", "stale.py", "two.py"]
+
+        run_in_temporary_directory(act_and_assert, temp_dir / "course")
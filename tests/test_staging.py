@@ -0,0 +1,96 @@
+import os
+from shutil import copy2
+
+import pytest
+
+from coursetools.copier import CopyResult, FileCopy
+from coursetools.staging import JOURNAL_NAME, STAGING_NAME, SWAPPING_NAME, Staging, load_journal
+from tests import create_directory_structure
+
+
+@pytest.fixture
+def staging(temp_dir):
+    create_directory_structure(temp_dir, {"repo": {"a.py": "aaa", "b.py": "bb"}, "course": {}})
+    return Staging(temp_dir / "course")
+
+
+def staged_copy(staging, temp_dir, name):
+    return FileCopy(temp_dir / "repo" / name, staging.directory / "examples" / name, copy2, "/", 0)
+
+
+def record(staging, file_copy):
+    file_copy.destination.parent.mkdir(parents=True, exist_ok=True)
+    copy2(file_copy.source, file_copy.destination)
+    result = CopyResult(0, "/", "copy", 0.0, "", str(file_copy.destination))
+    staging.record({file_copy.destination: file_copy}, [result, None])
+
+
+class TestStaging:
+
+    def test_stages_destinations_inside_the_root(self, staging, temp_dir):
+        course = (temp_dir / "course").resolve()
+
+        assert staging.staged(course / "examples" / "a.py") == course / STAGING_NAME / "examples" / "a.py"
+        assert staging.covers(course / "examples")
+        assert not staging.covers(temp_dir.resolve() / "elsewhere")
+
+    def test_journaled_files_are_done_until_their_source_changes(self, staging, temp_dir):
+        file_copy = staged_copy(staging, temp_dir, "a.py")
+        staging.start()
+        record(staging, file_copy)
+        staging.close()
+
+        resumed = Staging(temp_dir / "course")
+        resumed.start(resume=True)
+        assert resumed.is_done(file_copy)
+        assert not resumed.is_done(staged_copy(staging, temp_dir, "b.py"))
+        (temp_dir / "repo" / "a.py").write_text("changed")
+        assert not resumed.is_done(file_copy)
+        resumed.close()
+
+    def test_starting_over_discards_an_interrupted_build(self, staging, temp_dir, capsys):
+        staging.start()
+        record(staging, staged_copy(staging, temp_dir, "a.py"))
+        staging.close()
+
+        fresh = Staging(temp_dir / "course")
+        fresh.start()
+        fresh.close()
+
+        assert "use --resume to continue it" in capsys.readouterr().out
+        assert sorted(os.listdir(fresh.directory)) == [JOURNAL_NAME]
+
+    def test_a_partly_written_journal_line_is_ignored(self, temp_dir):
+        (temp_dir / "journal").write_text('["a.py", 3, 10]\n["b.py", 2')
+
+        assert load_journal(temp_dir / "journal") == {"a.py": [3, 10]}
+
+    def test_swap_merges_staged_entries_into_the_course(self, staging, temp_dir):
+        course = temp_dir / "course"
+        create_directory_structure(course, {
+            "examples": {"a.py": "old", "my_notes.md": "mine", ".git": {"HEAD": "ref"}},
+            "setup.cfg": "old",
+            "notes.txt": "mine",
+        })
+        staging.start()
+        create_directory_structure(staging.directory, {"examples": {"a.py": "aaa", "new": {"b.py": ""}}, "setup.cfg": "new"})
+
+        staging.swap_in()
+
+        assert sorted(os.listdir(course / "examples")) == [".git", "a.py", "my_notes.md", "new"]
+        assert (course / "examples" / "a.py").read_text() == "aaa"
+        assert (course / "examples" / "new" / "b.py").exists()
+        assert (course / "setup.cfg").read_text() == "new"
+        assert (course / "notes.txt").read_text() == "mine"
+        assert not staging.directory.exists()
+
+    def test_an_interrupted_swap_is_finished_by_the_next_start(self, staging, temp_dir, capsys):
+        course = temp_dir / "course"
+        create_directory_structure(course, {"examples": {"a.py": "aaa"}})
+        create_directory_structure(staging.directory, {"examples": {"b.py": "bb"}, JOURNAL_NAME: "", SWAPPING_NAME: ""})
+
+        Staging(course).start()
+
+        assert sorted(os.listdir(course / "examples")) == ["a.py", "b.py"]
+        assert "finishing moving an interrupted build" in capsys.readouterr().out
+        assert sorted(os.listdir(staging.directory)) == [JOURNAL_NAME]
@@ -0,0 +1,100 @@
+import os
+from shutil import copy2
+
+from coursetools.copier import DirectoryCopy, FileCopy
+from coursetools.excludes import ExcludeMatcher
+from coursetools.sync import file_digest, is_unchanged, remove_stale
+from tests import create_directory_structure
+
+
+def make_copy(temp_dir):
+    return FileCopy(temp_dir / "source.txt", temp_dir / "dest.txt", copy2)
+
+
+class TestIsUnchanged:
+
+    def test_missing_destination_is_changed(self, temp_dir):
+        (temp_dir / "source.txt").write_text("content")
+
+        assert not is_unchanged(make_copy(temp_dir))
+
+    def test_copied_file_is_unchanged(self, temp_dir):
+        (temp_dir / "source.txt").write_text("content")
+        copy2(temp_dir / "source.txt", temp_dir / "dest.txt")
+
+        assert is_unchanged(make_copy(temp_dir))
+
+    def test_different_size_is_changed(self, temp_dir):
+        (temp_dir / "source.txt").write_text("new content")
+        copy2(temp_dir / "source.txt", temp_dir / "dest.txt")
+        (temp_dir / "dest.txt").write_text("old")
+
+        assert not is_unchanged(make_copy(temp_dir))
+
+    def test_newer_source_is_changed(self, temp_dir):
+        (temp_dir / "source.txt").write_text("content")
+        (temp_dir / "dest.txt").write_text("content")
+        os.utime(temp_dir / "dest.txt", (1000, 1000))
+
+        assert not is_unchanged(make_copy(temp_dir))
+
+    def test_checksum_compares_contents(self, temp_dir):
+        (temp_dir / "source.txt").write_text("content")
+        copy2(temp_dir / "source.txt", temp_dir / "dest.txt")
+        (temp_dir / "dest.txt").write_text("CONTENT")
+
+        assert is_unchanged(make_copy(temp_dir))
+        assert not is_unchanged(make_copy(temp_dir), checksum=True)
+
+    def test_checksum_uses_a_known_source_digest(self, temp_dir):
+        (temp_dir / "source.txt").write_text("content")
+        copy2(temp_dir / "source.txt", temp_dir / "dest.txt")
+        digests = {temp_dir / "source.txt": file_digest(temp_dir / "source.txt")}
+
+        assert is_unchanged(make_copy(temp_dir), checksum=True, digests=digests)
+        digests[temp_dir / "source.txt"] = "0" * 128
+        assert not is_unchanged(make_copy(temp_dir), checksum=True, digests=digests)
+
+
+class TestFileDigest:
+
+    def test_same_content_same_digest(self, temp_dir):
+        (temp_dir / "a").write_text("content")
+        (temp_dir / "b").write_text("content")
+
+        assert file_digest(temp_dir / "a") == file_digest(temp_dir / "b")
+
+
+class TestRemoveStale:
+
+    def test_removes_files_and_directories_without_a_source(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "dest": {"keep.txt": "", "gone.txt": "", "old-dir": {"file.txt": ""}}
+        })
+        dest = temp_dir / "dest"
+
+        removed = remove_stale([DirectoryCopy(None, dest, "")], [dest / "keep.txt"], ExcludeMatcher([]))
+
+        assert removed == 2
+        assert sorted(os.listdir(dest)) == ["keep.txt"]
+
+    def test_leaves_excluded_and_git_entries(self, temp_dir):
+        create_directory_structure(temp_dir, {
+            "dest": {".git": {"HEAD": ""}, "node_modules": {"x.js": ""}}
+        })
+        dest = temp_dir / "dest"
+
+        removed = remove_stale([DirectoryCopy(None, dest, "")], [], ExcludeMatcher(["node_modules"]))
+
+        assert removed == 0
+        assert sorted(os.listdir(dest)) == [".git", "node_modules"]
+
+    def test_keeps_directories_holding_targets(self, temp_dir):
+        create_directory_structure(temp_dir, {"dest": {"sub": {"file.txt": ""}}})
+        dest = temp_dir / "dest"
+
+        removed = remove_stale(
+            [DirectoryCopy(None, dest, "")], [dest / "sub" / "file.txt"], ExcludeMatcher([])
+        )
+
+        assert removed == 0
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 import pytest
-from coursetools.templates import load_templates, get_templates, load_template
+from coursetools.templates import load_templates, get_templates, load_template, TemplateRegistry
 
 
 class TestLoadTemplates:
@@ -49,9 +49,9 @@ class TestGetTemplates:
 class TestLoadTemplate:
     
     def test_load_template_returns_config(self, mock_template_dir, monkeypatch):
-        # Temporarily override template_dir
+        # Temporarily search only the mock template directory
         import coursetools.templates as templates_module
-        monkeypatch.setattr(templates_module, "template_dir", mock_template_dir)
+        monkeypatch.setattr(templates_module, "registry", TemplateRegistry([mock_template_dir]))
         
         config = load_template("test-template")
         assert config is not None
@@ -60,7 +60,7 @@ class TestLoadTemplate:
     
     def test_load_template_has_correct_sections(self, mock_template_dir, monkeypatch):
         import coursetools.templates as templates_module
-        monkeypatch.setattr(templates_module, "template_dir", mock_template_dir)
+        monkeypatch.setattr(templates_module, "registry", TemplateRegistry([mock_template_dir]))
         
         config = load_template("test-template")
         assert "/test/path1" in config["paths"]
@@ -69,8 +69,86 @@ class TestLoadTemplate:
     
     def test_load_template_reads_paths_correctly(self, mock_template_dir, monkeypatch):
         import coursetools.templates as templates_module
-        monkeypatch.setattr(templates_module, "template_dir", mock_template_dir)
+        monkeypatch.setattr(templates_module, "registry", TemplateRegistry([mock_template_dir]))
         
         config = load_template("test-template")
         assert config["paths"]["/test/path1"] == "dest1"
         assert config["paths"]["/test/path2"] == "dest2"
+
+
+class TestTemplateRegistry:
+
+    def test_registry_does_not_scan_until_used(self, mock_template_dir, monkeypatch):
+        import coursetools.templates as templates_module
+        scanned = []
+        monkeypatch.setattr(templates_module, "template_files", lambda directory: scanned.append(directory) or [])
+
+        registry = TemplateRegistry([mock_template_dir])
+        assert scanned == []
+
+        registry.names()
+        registry.names()
+        assert scanned == [mock_template_dir]
+
+    def test_registry_lists_names_sorted(self, mock_template_dir):
+        registry = TemplateRegistry([mock_template_dir])
+
+        assert registry.names() == ["another-template", "test-template"]
+
+    def test_registry_parses_each_template_once(self, mock_template_dir, monkeypatch):
+        import coursetools.templates as templates_module
+        parsed = []
+        original_parse = templates_module.parse_template
+        monkeypatch.setattr(templates_module, "parse_template", lambda path: parsed.append(path) or original_parse(path))
+        registry = TemplateRegistry([mock_template_dir])
+
+        first = registry.load("test-template")
+        second = registry.load("test-template")
+
+        assert first is second
+        assert len(parsed) == 1
+
+    def test_registry_reparses_when_the_file_changes(self, mock_template_dir):
+        registry = TemplateRegistry([mock_template_dir])
+        registry.load("another-template")
+        template_file = mock_template_dir / "another-template.ini"
+        template_file.write_text("[paths]\n/changed = out\n\n[excludes]\n")
+        os.utime(template_file, ns=(0, template_file.stat().st_mtime_ns + 1_000_000_000))
+
+        assert "/changed" in registry.load("another-template")["paths"]
+
+    def test_earlier_search_paths_take_precedence(self, mock_template_dir, temp_dir):
+        user_dir = temp_dir / "user-templates"
+        user_dir.mkdir()
+        (user_dir / "test-template.ini").write_text("[paths]\n/user = out\n\n[excludes]\n")
+        registry = TemplateRegistry([user_dir, mock_template_dir])
+
+        assert "/user" in registry.load("test-template")["paths"]
+        assert registry.names() == ["another-template", "test-template"]
+
+    def test_missing_search_paths_are_ignored(self, temp_dir, mock_template_dir):
+        registry = TemplateRegistry([temp_dir / "missing", mock_template_dir])
+
+        assert len(registry.names()) == 2
+
+    def test_find_returns_none_for_unknown_template(self, mock_template_dir):
+        assert TemplateRegistry([mock_template_dir]).find("nope") is None
+
+
+class TestSearchPaths:
+
+    def test_search_paths_include_user_and_builtin_directories(self, temp_dir, monkeypatch):
+        import coursetools.templates as templates_module
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+        monkeypatch.delenv("COURSETOOLS_TEMPLATE_PATH", raising=False)
+
+        assert templates_module.search_paths() == [
+            temp_dir / ".coursetools" / "templates",
+            templates_module.template_dir,
+        ]
+
+    def test_environment_adds_search_paths_first(self, temp_dir, monkeypatch):
+        import coursetools.templates as templates_module
+        monkeypatch.setenv("COURSETOOLS_TEMPLATE_PATH", str(temp_dir))
+
+        assert templates_module.search_paths()[0] == temp_dir
@@ -0,0 +1,239 @@
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import coursetools.watch as watch_module
+from coursetools.watch import (
+    IN_Q_OVERFLOW,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchedCourse,
+    load_inotify,
+    open_watcher,
+    watch_repo,
+)
+from tests import create_mock_template, run_in_temporary_directory
+
+
+@pytest.fixture
+def training_files():
+    return {
+        "examples": {"a.py": "a", "build": {"out.txt": "built"}, "basics": {"b.py": "b"}},
+        "setup.cfg": "[tool]",
+    }
+
+
+def make_course(temp_dir, excludes=()):
+    template = {
+        "paths": {"/examples": "examples", "/setup.cfg": "."},
+        "excludes": {pattern: "" for pattern in excludes},
+    }
+    return WatchedCourse("test", template, temp_dir / "out")
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestWatchedCourse:
+
+    def test_changed_files_map_to_their_destination(self, training_repo, temp_dir):
+        course = make_course(temp_dir)
+
+        plan, removed = course.plan_changes({training_repo / "examples" / "basics" / "b.py"})
+
+        assert [file_copy.destination for file_copy in plan.files] == [
+            temp_dir / "out" / "examples" / "basics" / "b.py"
+        ]
+        assert removed == []
+
+    def test_excluded_paths_are_ignored(self, training_repo, temp_dir):
+        course = make_course(temp_dir, excludes=["build/"])
+
+        plan, _ = course.plan_changes({training_repo / "examples" / "build" / "out.txt"})
+
+        assert plan.files == []
+
+    def test_a_new_directory_is_copied_with_its_contents(self, training_repo, temp_dir):
+        course = make_course(temp_dir, excludes=["basics/skip.py"])
+        (training_repo / "examples" / "basics" / "skip.py").write_text("skip")
+
+        plan, _ = course.plan_changes({training_repo / "examples" / "basics"})
+
+        assert [file_copy.source.name for file_copy in plan.files] == ["b.py"]
+
+    def test_file_roots_are_copied_into_their_directory(self, training_repo, temp_dir):
+        (temp_dir / "out").mkdir()
+        course = make_course(temp_dir)
+
+        plan, _ = course.plan_changes({training_repo / "setup.cfg"})
+
+        assert [file_copy.destination for file_copy in plan.files] == [temp_dir / "out" / "setup.cfg"]
+
+    def test_deleted_sources_are_removed_unless_they_could_be_excluded(self, training_repo, temp_dir):
+        course = make_course(temp_dir, excludes=["build/"])
+
+        _, removed = course.plan_changes({
+            training_repo / "examples" / "gone.py",
+            training_repo / "examples" / "build",
+        })
+
+        assert removed == [temp_dir / "out" / "examples" / "gone.py"]
+
+    def test_a_deleted_template_path_never_removes_its_destination(self, training_repo, temp_dir):
+        course = make_course(temp_dir)
+
+        _, removed = course.plan_changes({training_repo / "missing"})
+
+        assert removed == []
+
+
+class TestWatchers:
+
+    def test_polling_reports_added_changed_and_removed_files(self, training_repo, temp_dir):
+        watcher = PollingWatcher(make_course(temp_dir), interval=0, sleep=lambda seconds: None)
+        (training_repo / "examples" / "a.py").write_text("changed")
+        (training_repo / "examples" / "new.py").write_text("new")
+        (training_repo / "examples" / "basics" / "b.py").unlink()
+
+        assert watcher.read(0) == {
+            training_repo / "examples" / "a.py",
+            training_repo / "examples" / "new.py",
+            training_repo / "examples" / "basics" / "b.py",
+        }
+        assert watcher.read(0) == set()
+
+    @pytest.mark.skipif(load_inotify() is None, reason="needs inotify")
+    def test_inotify_watches_new_directories(self, training_repo, temp_dir):
+        watcher = open_watcher(make_course(temp_dir))
+        try:
+            (training_repo / "examples" / "new").mkdir()
+            assert training_repo / "examples" / "new" in watcher.read(1)
+            (training_repo / "examples" / "new" / "c.py").write_text("c")
+            assert training_repo / "examples" / "new" / "c.py" in watcher.read(1)
+        finally:
+            watcher.close()
+
+
+@pytest.mark.skipif(load_inotify() is None, reason="needs inotify")
+class TestInotifyWatcher:
+
+    @pytest.fixture
+    def watcher(self, training_repo, temp_dir):
+        watcher = InotifyWatcher(make_course(temp_dir, excludes=["build/"]), load_inotify())
+        yield watcher
+        watcher.close()
+
+    def test_directories_made_before_their_watch_is_added_are_watched(self, watcher, training_repo):
+        deeper = training_repo / "examples" / "new" / "deeper"
+        deeper.mkdir(parents=True)
+        watcher.read(1)
+
+        (deeper / "c.py").write_text("c")
+
+        assert deeper / "c.py" in watcher.read(1)
+
+    def test_excluded_directories_are_not_watched(self, watcher, training_repo):
+        (training_repo / "examples" / "new" / "build").mkdir(parents=True)
+        watcher.read(1)
+
+        assert training_repo / "examples" / "new" in watcher.directories.values()
+        assert training_repo / "examples" / "new" / "build" not in watcher.directories.values()
+
+    def test_removed_directories_are_forgotten(self, watcher, training_repo):
+        basics = training_repo / "examples" / "basics"
+
+        shutil.rmtree(basics)
+
+        assert basics in watcher.read(1)
+        assert basics not in watcher.directories.values()
+
+    def test_directories_moved_away_are_no_longer_watched(self, watcher, training_repo, temp_dir):
+        (training_repo / "examples" / "basics" / "deeper").mkdir()
+        watcher.read(1)
+
+        (training_repo / "examples" / "basics").rename(temp_dir / "basics")
+
+        assert training_repo / "examples" / "basics" in watcher.read(1)
+        assert not any("basics" in str(path) for path in watcher.directories.values())
+
+    def test_an_overflow_reports_every_template_path(self, watcher, training_repo, monkeypatch):
+        monkeypatch.setattr(watch_module, "read_events", lambda fd: [(-1, IN_Q_OVERFLOW, "")])
+        (training_repo / "examples" / "a.py").write_text("changed")
+
+        assert watcher.read(1) == {training_repo / "examples", training_repo / "setup.cfg"}
+
+    def test_nothing_is_reported_before_the_timeout(self, watcher):
+        assert watcher.read(0) == set()
+
+
+class TestOpenWatcher:
+
+    def test_falls_back_to_polling_when_inotify_fails(self, training_repo, temp_dir, monkeypatch, capsys):
+        class FailingLibc:
+            def inotify_init1(self, flags):
+                return -1
+
+        monkeypatch.setattr(watch_module, "load_inotify", FailingLibc)
+
+        assert isinstance(open_watcher(make_course(temp_dir)), PollingWatcher)
+        assert "polling instead" in capsys.readouterr().out
+
+    def test_polls_when_asked_to(self, training_repo, temp_dir):
+        assert isinstance(open_watcher(make_course(temp_dir), poll=True), PollingWatcher)
+
+
+class TestWatchRepo:
+
+    @pytest.mark.parametrize("poll", [False, True])
+    def test_copies_changes_until_stopped(self, training_repo, temp_dir, monkeypatch, poll):
+        create_mock_template(temp_dir, monkeypatch, "watched", paths={"/examples": "examples"}, excludes={"build": ""})
+        stop = threading.Event()
+
+        def act_and_assert():
+            thread = threading.Thread(target=watch_repo, args=("watched",), kwargs={"poll": poll, "stop": stop})
+            thread.start()
+            try:
+                assert wait_until(lambda: Path("examples/a.py").exists())
+                time.sleep(0.1)
+                (training_repo / "examples" / "a.py").write_text("edited")
+                (training_repo / "examples" / "basics" / "b.py").unlink()
+                (training_repo / "examples" / "build" / "new.txt").write_text("ignored")
+                assert wait_until(lambda: Path("examples/a.py").read_text() == "edited")
+                assert wait_until(lambda: not Path("examples/basics/b.py").exists())
+                assert not Path("examples/build").exists()
+            finally:
+                stop.set()
+                thread.join()
+
+        run_in_temporary_directory(act_and_assert, temp_dir)
+
+    def test_a_batch_that_fails_is_retried_with_the_next_one(self, training_repo, temp_dir, monkeypatch, capsys):
+        create_mock_template(temp_dir, monkeypatch, "watched", paths={"/examples": "examples"}, excludes={})
+        first, second = training_repo / "examples" / "a.py", training_repo / "setup.cfg"
+        batches = iter([({first}, 0.0), ({second}, 0.0), None])
+        synced = []
+
+        def sync_changes(course, paths, **options):
+            synced.append(paths)
+            if len(synced) == 1:
+                raise FileNotFoundError(2, "No such file or directory", str(first))
+            return 1, 0
+
+        monkeypatch.setattr(watch_module, "wait_for_changes", lambda *args: next(batches))
+        monkeypatch.setattr(watch_module, "sync_changes", sync_changes)
+
+        run_in_temporary_directory(lambda: watch_repo("watched", poll=True), temp_dir)
+
+        assert synced == [{first}, {first, second}]
+        output = capsys.readouterr().out
+        assert "couldn't update the course ([Errno 2] No such file or directory" in output
+        assert "updated 1 files and removed 0" in output